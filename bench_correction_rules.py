@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+訂正検出ルールエンジンのマイクロベンチマーク
+
+従来のハードコードされた判定（部分文字列の逐次チェック）と CorrectionRuleEngine を
+同じ本文で実行し、結果が一致することを確認したうえで1件あたりの処理時間を比較する。
+
+エンジンは従来判定より遅い（手元の計測で1件あたり約10〜20倍。従来判定の `in` は
+C実装の部分文字列検索で、エンジンは全キーワードの出現位置を正規表現で列挙するため）。
+エンジンの利点は速度ではなく、ルールを config.yaml で宣言でき、位置（抜粋・差分表示用）も
+同じ1パスで得られること。1件あたり十数µsなので、取得・再分類の処理時間への影響は小さい。
+
+使用方法:
+    python3 bench_correction_rules.py                    # data/articles.db の本文で計測
+    python3 bench_correction_rules.py --db other.db
+    python3 bench_correction_rules.py --synthetic 20000  # DBを使わず合成テキストで計測
+"""
+import random
+import sqlite3
+import argparse
+import timeit
+from pathlib import Path
+
+from correction_rules import get_engine
+
+
+def legacy_detect_correction(text):
+    """従来のArticleStorage.detect_correction（比較用）"""
+    if not text:
+        return False, []
+    if '※' not in text:
+        return False, []
+    found = ['※']
+    if '当初' in text and '掲載' in text:
+        found.extend(['当初', '掲載'])
+        return True, found
+    if '失礼しました' in text:
+        found.append('失礼しました')
+        return True, found
+    return False, []
+
+
+def load_texts(db_path):
+    """記事本文と変更後の値を取得"""
+    conn = sqlite3.connect(db_path)
+    texts = [row[0] for row in conn.execute('SELECT description FROM articles')]
+    texts += [row[0] for row in conn.execute(
+        "SELECT new_value FROM changes WHERE change_type IN ('description_changed', 'description_added')"
+    )]
+    conn.close()
+    return [t for t in texts if t]
+
+
+def synthetic_texts(n, seed=0):
+    """訂正あり・マーカーのみ・訂正なしを混ぜた合成テキスト"""
+    rng = random.Random(seed)
+    body = '政府は今日、新たな経済対策を発表しました。関係者によりますと、対策の規模は過去最大となる見通しです。'
+    notices = [
+        '',
+        '※当初、日付を誤って掲載していました。',
+        '※記事の一部を修正しました。',
+        '※先ほどの記事で名前に誤りがありました。失礼しました。',
+    ]
+    return [body * rng.randint(1, 4) + rng.choice(notices) for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='訂正検出ルールエンジンのベンチマーク')
+    parser.add_argument('--db', type=str, default='data/articles.db', help='本文を読み込むDB')
+    parser.add_argument('--synthetic', type=int, help='合成テキストの件数（指定時はDBを使わない）')
+    parser.add_argument('--repeat', type=int, default=5, help='計測の繰り返し回数（最小値を採用）')
+    args = parser.parse_args()
+
+    if args.synthetic or not Path(args.db).exists():
+        texts = synthetic_texts(args.synthetic or 20000)
+        source = '合成テキスト'
+    else:
+        texts = load_texts(args.db)
+        source = args.db
+
+    engine = get_engine()
+
+    print("="*60)
+    print("訂正検出ルールエンジン ベンチマーク")
+    print("="*60)
+    print(f"\n対象: {source} ({len(texts)}件, 平均{sum(map(len, texts)) / max(len(texts), 1):.0f}文字)")
+    print(f"ルール: {[rule_id for rule_id, _ in engine.rules]}")
+
+    mismatches = [t for t in texts if legacy_detect_correction(t) != engine.detect(t)]
+    detected = sum(1 for t in texts if engine.detect(t)[0])
+    print(f"訂正検出: {detected}件, 従来判定との不一致: {len(mismatches)}件")
+
+    candidates = [
+        ('従来判定', lambda: [legacy_detect_correction(t) for t in texts]),
+        ('engine.detect', lambda: [engine.detect(t) for t in texts]),
+        ('engine.scan', lambda: [engine.scan(t) for t in texts]),
+    ]
+    print()
+    for name, func in candidates:
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f"  {name:<14} {best * 1000:8.2f} ms  ({best / max(len(texts), 1) * 1e6:6.2f} µs/件)")
+
+    print("\n" + "="*60)
+    if mismatches:
+        print(f"⚠️  不一致の例: {mismatches[0][:80]}...")
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
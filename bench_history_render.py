@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+変更履歴ページのカード描画ベンチマーク
+
+generate_history.render_change_cards をキャッシュなし（コールドリビルド相当）で
+ワーカー数を変えて実行し、所要時間・直列に対する速度向上を表示する。
+各ワーカー数の出力が直列の出力とバイト単位で一致することも確認する。
+
+使用方法:
+    python3 bench_history_render.py                      # data/articles.db, ワーカー 1,2,4,...,CPU数
+    python3 bench_history_render.py --db other.db --workers 1 2 8
+"""
+import os
+import time
+import argparse
+
+from generate_history import RENDER_CHUNK_SIZE, get_all_changes, render_change_cards
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    default_workers = sorted({1, *[n for n in (2, 4, 8, 16) if n <= cpu_count], cpu_count})
+
+    parser = argparse.ArgumentParser(description='変更履歴ページのカード描画ベンチマーク')
+    parser.add_argument('--db', type=str, default='data/articles.db', help='読み込むDB')
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers, help='計測するワーカー数')
+    parser.add_argument('--chunk-size', type=int, default=RENDER_CHUNK_SIZE, help='1チャンクあたりの変更数')
+    args = parser.parse_args()
+
+    changes = get_all_changes(args.db)
+
+    print("="*60)
+    print("変更履歴ページ カード描画ベンチマーク")
+    print("="*60)
+    print(f"\n対象: {args.db} ({len(changes)}件の変更, CPU数 {cpu_count}, チャンク {args.chunk_size}件)\n")
+
+    baseline_time = None
+    baseline_output = None
+    for workers in args.workers:
+        started_at = time.perf_counter()
+        output = ''.join(render_change_cards(changes, workers=workers, chunk_size=args.chunk_size))
+        elapsed = time.perf_counter() - started_at
+
+        if baseline_time is None:
+            baseline_time, baseline_output = elapsed, output
+        identical = '一致' if output == baseline_output else '⚠️ 不一致'
+        print(f"  ワーカー{workers:3d}: {elapsed:7.3f}秒  速度向上 x{baseline_time / elapsed:5.2f}  出力: {identical}")
+
+    print("\n" + "="*60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+ページ書き出しのベンチマーク
+
+変更履歴・アーカイブの月別ページとおことわり記事ページを、DBの行を繰り返して
+指定件数にしたデータで生成し、所要時間・メモリ使用量のピーク（tracemalloc）・出力サイズを表示する。
+変更履歴のカード（差分HTML）は事前に1回だけ描画し、ページの組み立てと書き出しだけを計測する。
+
+使用方法:
+    python3 bench_page_writer.py                          # data/articles.db, 1000 / 10000 / 50000件
+    python3 bench_page_writer.py --db other.db --rows 5000 100000
+"""
+import time
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import generate_archive
+import generate_corrections
+import generate_history
+from pagination import Shard
+
+
+def repeat_rows(rows, count):
+    """行を繰り返して count 件にする"""
+    return [rows[index % len(rows)] for index in range(count)] if rows else []
+
+
+def measure(generate):
+    """generate() の所要時間とメモリ使用量のピーク"""
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    generate()
+    elapsed = time.perf_counter() - started_at
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ページ書き出しのベンチマーク')
+    parser.add_argument('--db', type=str, default='data/articles.db', help='読み込むDB')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000], help='1ページの件数')
+    args = parser.parse_args()
+
+    changes = generate_history.get_all_changes(args.db)
+    cards = generate_history.render_change_cards(changes)
+    articles = generate_archive.get_all_articles(args.db)
+    archive_stats = generate_archive.get_source_stats(args.db)
+    corrections = generate_corrections.get_correction_articles(args.db)
+    correction_stats = generate_corrections.get_correction_stats(args.db)
+
+    print("="*60)
+    print("ページ書き出しベンチマーク")
+    print("="*60)
+    print(f"\n対象: {args.db} (変更{len(changes)}件 / 記事{len(articles)}件 / おことわり{len(corrections)}件を繰り返して使用)\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        for count in args.rows:
+            page_changes = repeat_rows(changes, count)
+            page_cards = repeat_rows(cards, count)
+            page_articles = repeat_rows(articles, count)
+            page_corrections = repeat_rows(corrections, count)
+
+            cases = [
+                ('変更履歴', output_dir / 'history.html', lambda path: generate_history.generate_html(
+                    page_changes, path, cards=page_cards,
+                    shard=Shard('history/bench.html', '2025-08', 1, 1, page_changes))),
+                ('アーカイブ', output_dir / 'archive.html', lambda path: generate_archive.generate_html(
+                    page_articles, archive_stats, path,
+                    shard=Shard('archive/bench.html', '2025-08', 1, 1, page_articles))),
+                ('おことわり', output_dir / 'corrections.html', lambda path: generate_corrections.generate_html(
+                    page_corrections, correction_stats, path)),
+            ]
+
+            print(f"--- {count}件 ---")
+            for name, path, generate in cases:
+                if not page_changes and name == '変更履歴' or not page_corrections and name == 'おことわり':
+                    continue
+                elapsed, peak = measure(lambda: generate(path))
+                size = path.stat().st_size
+                print(f"  {name:　<6}: {elapsed:7.3f}秒  ピークメモリ {peak / 1024 / 1024:7.1f}MB  "
+                      f"出力 {size / 1024 / 1024:7.1f}MB")
+
+    print("\n" + "="*60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+文字単位差分エンジンのベンチマーク
+
+保存済みの説明文の変更（変更前・変更後の組）を対象に、従来の difflib.SequenceMatcher と
+text_diff の Myers 差分（文字単位のみ / 文字種トークン単位）を比較する。処理時間に加えて、
+変更として表示される文字数（小さいほど変更箇所を正確に捉えている）、ハイライト区間の数と
+描画したHTMLのサイズ（小さいほど細切れでない）、時間予算超過で文単位に切り替えた件数を表示する。
+
+使用方法:
+    python3 bench_text_diff.py                   # data/articles.db の変更履歴で計測
+    python3 bench_text_diff.py --db other.db
+    python3 bench_text_diff.py --synthetic 200   # DBを使わず長文の合成テキストで計測
+"""
+import random
+import sqlite3
+import argparse
+import difflib
+import time
+from pathlib import Path
+
+from text_diff import (
+    DIFF_ALGORITHM_FALLBACK, DIFF_TIME_BUDGET, ChangeDiff, compute_opcodes_with_algorithm, render_char_level_diff,
+)
+
+
+def load_pairs(db_path):
+    """説明文の変更（変更前・変更後）の組を取得"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('''
+        SELECT old_value, new_value FROM changes
+        WHERE change_type IN ('description_changed', 'correction_removed')
+          AND old_value IS NOT NULL AND old_value != ''
+    ''').fetchall()
+    conn.close()
+    return [(old or '', new or '') for old, new in rows]
+
+
+# 言い換え（語句単位の書き換え）の例
+REWORDINGS = {
+    '男は容疑を認めている': '男は調べに対し容疑を否認している',
+    '過去最大となる見通しです': 'これまでで最も大きくなる見込みです',
+    '平年の2倍に達しました': '平年の3倍近くに達したということです',
+    '対応を進めたい': 'できるかぎりの対策を講じたい',
+    '説明しました': '詳しく述べました',
+    '雨の量': '降水量',
+    '住民の安全': '地域住民の命と安全',
+}
+
+
+def synthetic_pairs(n, seed=0):
+    """句読点や「の」が頻出する長い本文に、追記・語句の修正・言い換え・おことわりを加えた合成データ"""
+    rng = random.Random(seed)
+    sentences = [
+        '政府の関係者によりますと、今回の対策の規模は過去最大となる見通しです。',
+        '警察の調べによりますと、男は容疑を認めているということです。',
+        '気象庁の発表では、この地域の雨の量は平年の2倍に達しました。',
+        '市の担当者は「住民の安全を最優先に対応を進めたい」と話していました。',
+        '会見の中で知事は、県の支援の在り方について説明しました。',
+    ]
+    pairs = []
+    for _ in range(n):
+        old = ''.join(rng.choice(sentences) for _ in range(rng.randint(10, 60)))
+        new = list(old)
+        for _ in range(rng.randint(1, 5)):
+            pos = rng.randrange(len(new))
+            new[pos:pos + rng.randint(0, 4)] = list(rng.choice(['2倍', '3倍', '県', '市の', '']))
+        new = ''.join(new)
+        for phrase in rng.sample(list(REWORDINGS), 3):
+            new = new.replace(phrase, REWORDINGS[phrase], 1)
+        if rng.random() < 0.3:
+            new += '※当初、数字を誤って掲載していました。失礼しました。'
+        pairs.append((old, new))
+    return pairs
+
+
+def difflib_opcodes(old, new):
+    matcher = difflib.SequenceMatcher(None, old, new)
+    return [(i1, i2, j1, j2) for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != 'equal']
+
+
+def edit_size(opcodes):
+    return sum((i2 - i1) + (j2 - j1) for i1, i2, j1, j2 in opcodes)
+
+
+def render_stats(old, new, opcodes):
+    """変更前・変更後の差分HTMLのハイライト区間数と合計サイズ（バイト）"""
+    old_html, new_html = render_char_level_diff(ChangeDiff(old, new, opcodes, False, ''))
+    spans = old_html.count('<span') + new_html.count('<span')
+    return spans, len(old_html.encode('utf-8')) + len(new_html.encode('utf-8'))
+
+
+def run(name, pairs, func):
+    """各組の処理時間を計測し、集計を表示"""
+    timings = []
+    edits = 0
+    spans = 0
+    size = 0
+    extra = 0
+    for old, new in pairs:
+        started_at = time.perf_counter()
+        opcodes, fallback = func(old, new)
+        timings.append(time.perf_counter() - started_at)
+        edits += edit_size(opcodes)
+        pair_spans, pair_size = render_stats(old, new, opcodes)
+        spans += pair_spans
+        size += pair_size
+        extra += fallback
+    timings.sort()
+    total = sum(timings)
+    p50 = timings[len(timings) // 2] if timings else 0
+    worst = timings[-1] if timings else 0
+    print(f"  {name:<14} 合計{total * 1000:9.1f} ms  中央値{p50 * 1000:7.2f} ms  最大{worst * 1000:8.2f} ms  "
+          f"変更文字数{edits:8d}  区間{spans:7d}  HTML{size / 1024:9.1f} KB  文単位へ切替{extra:4d}件")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文字単位差分エンジンのベンチマーク')
+    parser.add_argument('--db', type=str, default='data/articles.db', help='変更履歴を読み込むDB')
+    parser.add_argument('--synthetic', type=int, help='合成データの件数（指定時はDBを使わない）')
+    parser.add_argument('--budget', type=float, default=DIFF_TIME_BUDGET, help='Myersの時間予算（秒）')
+    args = parser.parse_args()
+
+    if args.synthetic or not Path(args.db).exists():
+        pairs = synthetic_pairs(args.synthetic or 200)
+        source = '合成データ'
+    else:
+        pairs = load_pairs(args.db)
+        source = args.db
+
+    print("="*60)
+    print("文字単位差分エンジン ベンチマーク")
+    print("="*60)
+    lengths = [len(old) + len(new) for old, new in pairs]
+    print(f"\n対象: {source} ({len(pairs)}組, 平均{sum(lengths) / max(len(pairs), 1):.0f}文字, "
+          f"最長{max(lengths, default=0)}文字)")
+    print(f"時間予算: {args.budget}秒\n")
+
+    run('difflib', pairs, lambda old, new: (difflib_opcodes(old, new), 0))
+
+    def myers(segmented):
+        def func(old, new):
+            opcodes, algorithm = compute_opcodes_with_algorithm(old, new, args.budget, segmented=segmented)
+            return opcodes, 1 if algorithm == DIFF_ALGORITHM_FALLBACK else 0
+        return func
+    run('myers-char', pairs, myers(False))
+    run('myers-segment', pairs, myers(True))
+
+    print("\n" + "="*60)
+
+
+if __name__ == '__main__':
+    main()
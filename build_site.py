@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+サイト一括生成
+
+変更履歴・アーカイブ・おことわり・ポータルの各ページを1プロセスで生成する。
+DBへの接続（月別アーカイブDBを含む）と記事・変更履歴の読み込みは1回だけ行い、
+各ページの生成で共有する（おことわり記事・ソース別統計は読み込んだ記事から集計する）。
+ページごとの所要時間を表示する。
+
+生成は増分で行う。ページごとに、生成に使った入力（データの高水位マーク・月別アーカイブDB・
+訂正ルール・生成スクリプトとテンプレートのハッシュ）をビルドマニフェスト（data/build_manifest.json）に記録し、
+入力が前回と同じで出力ファイルも残っているページは生成を省略する。
+変更履歴・アーカイブの月別ページは、ページごとに項目のハッシュを記録し、
+そのページの項目（または前後のページ）が変わった時だけ生成する。
+さらに、前回の全ページ生成から新着記事・変更がなければ（最大ID等の高水位マークが同じなら）、
+アーカイブDBの結合やデータの読み込みも行わずに終了する。このとき終了コードは NOOP_EXIT_CODE（3）で、
+run_and_deploy.sh はデプロイを省略する。
+
+生成の後、reports/ のHTML・CSS・JavaScriptを最小化し、圧縮版（.gz / .br）を書き出す（precompress.py）。
+
+使用方法:
+    python3 build_site.py                          # data/articles.db から変更のあったページを生成
+    python3 build_site.py --db data/snapshots/articles_20250801_120000.db
+    python3 build_site.py --pages history archive  # 指定したページのみ
+    python3 build_site.py --force                  # 入力に変更がなくても全ページを生成
+    python3 build_site.py --no-compress            # 最小化・事前圧縮をしない
+"""
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+from datetime import datetime
+from functools import cached_property
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cold_storage import connect_with_archives, default_archive_dir, list_archives
+from correction_rules import get_engine
+from fragment_cache import FragmentCache
+from precompress import precompress, print_report
+from site_templates import ASSETS_DIR_NAME, precompile, prune_assets, publish_assets
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).parent
+REPORTS_DIR = PROJECT_ROOT / 'reports'
+
+# 生成順（ポータルはreports/内の他のレポートを一覧するので最後）
+PAGES = ('history', 'archive', 'corrections', 'portal')
+
+PAGE_LABELS = {
+    'history': '変更履歴ページ',
+    'archive': 'アーカイブページ',
+    'corrections': 'おことわりページ',
+    'portal': 'ポータルページ',
+}
+
+PAGE_OUTPUTS = {
+    'history': 'history.html',
+    'archive': 'archive.html',
+    'corrections': 'corrections.html',
+    'portal': 'index.html',
+}
+
+DEFAULT_MANIFEST_PATH = PROJECT_ROOT / 'data' / 'build_manifest.json'
+
+# 全ページが生成済みで、何も生成しなかった場合の終了コード（デプロイ不要）
+NOOP_EXIT_CODE = 3
+
+# 無変更の判定に使わない高水位マーク
+# 記事の最終確認日時は取得のたびに更新される（新着・変更がなくても変わる）ため
+VOLATILE_MARKS = ('articles_last_seen',)
+
+# 月別ページに分けて出力するページと、その出力先（generate_history.SHARD_DIR / generate_archive.SHARD_DIR）
+SHARD_DIRS = {
+    'history': 'history',
+    'archive': 'archive',
+}
+
+# マニフェストの形式（変えたら上げる。古いマニフェストは無視して全ページを生成）
+MANIFEST_VERSION = 2
+
+# 全ページ共通のテンプレート（site_templates.py と templates/partials/ の共通部品・templates/assets/ の共通アセット）
+SHARED_TEMPLATES = (
+    'site_templates.py', 'templates/partials/head.html', 'templates/partials/global_nav.html',
+    'templates/partials/tracking.html', 'templates/partials/cards.html',
+    'templates/assets/global_nav.css', 'templates/assets/tracking.js',
+)
+
+# ページごとの入力
+# marks: 参照するデータの高水位マーク（data_marks()のキー）
+# sources: 出力に影響するスクリプト・テンプレート（内容のハッシュをテンプレートのバージョンとして使う）
+PAGE_INPUTS = {
+    'history': {
+        'marks': ('changes_max_id', 'change_diffs_max_id', 'article_revisions_max_id'),
+        'sources': ('generate_history.py', 'text_diff.py', 'pagination.py', 'data_api.py',
+                    'templates/history.html', 'templates/partials/header.html', 'templates/partials/pager.html',
+                    'templates/assets/history.css', 'templates/assets/history.js', 'templates/assets/history_api.js',
+                    'templates/assets/pager.css', 'templates/assets/api_client.js') + SHARED_TEMPLATES,
+    },
+    'archive': {
+        'marks': ('articles_max_id', 'articles_last_seen', 'changes_max_id'),
+        'sources': ('generate_archive.py', 'pagination.py', 'data_api.py', 'search_index.py',
+                    'templates/archive.html', 'templates/partials/header.html', 'templates/partials/pager.html',
+                    'templates/assets/archive.css', 'templates/assets/archive.js', 'templates/assets/archive_api.js',
+                    'templates/assets/pager.css', 'templates/assets/api_client.js',
+                    'templates/assets/search_client.js') + SHARED_TEMPLATES,
+    },
+    'corrections': {
+        'marks': ('articles_max_id', 'articles_last_seen', 'changes_max_id'),
+        'sources': ('generate_corrections.py', 'data_api.py', 'templates/corrections.html',
+                    'templates/partials/header.html', 'templates/assets/corrections.css',
+                    'templates/assets/corrections.js', 'templates/assets/corrections_api.js',
+                    'templates/assets/api_client.js') + SHARED_TEMPLATES,
+    },
+    'portal': {
+        'marks': ('articles_max_id', 'articles_last_seen', 'changes_max_id',
+                  'correction_events_max_id', 'correction_events_removed_at'),
+        'sources': ('generate_portal.py', 'templates/portal.html', 'templates/assets/portal.css') + SHARED_TEMPLATES,
+    },
+}
+
+
+def data_marks(conn: sqlite3.Connection) -> Dict:
+    """
+    ホットDBの高水位マーク
+
+    記事・変更・版・訂正イベントのIDは単調増加（AUTOINCREMENT）なので、最大IDが同じなら行は追加されていない。
+    行の更新は、更新されるカラム（記事の最終確認日時・訂正の削除日時）の最大値で検出する。
+    いずれもインデックスまたは sqlite_sequence の参照のみで、全件走査はしない。
+    """
+    sequences = dict(conn.execute('SELECT name, seq FROM main.sqlite_sequence').fetchall())
+    marks = {
+        'articles_max_id': sequences.get('articles', 0),
+        'changes_max_id': sequences.get('changes', 0),
+        'article_revisions_max_id': sequences.get('article_revisions', 0),
+        'correction_events_max_id': sequences.get('correction_events', 0),
+    }
+    marks['articles_last_seen'] = conn.execute('SELECT MAX(last_seen) FROM main.articles').fetchone()[0]
+    marks['change_diffs_max_id'] = conn.execute('SELECT MAX(change_id) FROM main.change_diffs').fetchone()[0]
+    marks['correction_events_removed_at'] = conn.execute(
+        'SELECT MAX(removed_at) FROM main.correction_events'
+    ).fetchone()[0]
+    return marks
+
+
+def _file_stamp(path: Path) -> List:
+    """ファイルの (名前, サイズ, 更新時刻) - 内容を読まずに変更を検出する"""
+    stat = path.stat()
+    return [path.name, stat.st_size, stat.st_mtime_ns]
+
+
+def _archive_stamps(conn: sqlite3.Connection, db_path: Path) -> List[List]:
+    """月別アーカイブDBの (名前, サイズ, 更新時刻)（スナップショットは記録された元DBのアーカイブ）"""
+    try:
+        row = conn.execute("SELECT value FROM main.snapshot_meta WHERE key = 'archive_dir'").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    archive_dir = row[0] if row else default_archive_dir(db_path)
+    return [_file_stamp(path) for path in list_archives(archive_dir)]
+
+
+def _report_stamps() -> List[List]:
+    """ポータルに表示する変更レポート（最新5件）と最新の週次レポート"""
+    reports = sorted(REPORTS_DIR.glob('changes_*.html'), reverse=True)[:5]
+    weekly = sorted((REPORTS_DIR / 'weekly').glob('weekly_report_*.html'), reverse=True)[:1]
+    return [_file_stamp(path) for path in reports + weekly]
+
+
+def _source_digest(filenames) -> str:
+    """スクリプトの内容のハッシュ"""
+    digest = hashlib.sha256()
+    for filename in filenames:
+        digest.update((PROJECT_ROOT / filename).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def build_signature(db_path) -> Dict:
+    """
+    サイト全体の入力の要約（無変更の判定用）
+
+    アーカイブDBをATTACHせず、ホットDBの高水位マークとファイルの更新情報だけから作る。
+    """
+    db_path = Path(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        marks = data_marks(conn)
+        archives = _archive_stamps(conn, db_path)
+    finally:
+        conn.close()
+    return {
+        'data': {key: value for key, value in marks.items() if key not in VOLATILE_MARKS},
+        'archives': archives,
+        'template': _source_digest(sorted({source for spec in PAGE_INPUTS.values() for source in spec['sources']})),
+        'rules': get_engine().fingerprint,
+        'reports': _report_stamps(),
+    }
+
+
+class BuildManifest:
+    """ページごとの生成時の入力を記録し、入力が変わったページだけを生成対象にする"""
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        self.path = Path(path)
+        self.outputs: Dict[str, Dict] = {}
+        self.last_build: Optional[Dict] = None
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('version') == MANIFEST_VERSION:
+                self.outputs = saved.get('outputs', {})
+                self.last_build = saved.get('last_build')
+
+    def is_fresh(self, output: str, inputs: Dict) -> bool:
+        """前回と同じ入力で生成済み、かつ出力ファイルが残っているか"""
+        entry = self.outputs.get(output)
+        return entry is not None and entry['inputs'] == inputs and (REPORTS_DIR / output).exists()
+
+    def is_noop(self, signature: Dict) -> bool:
+        """前回の全ページ生成から入力が変わっておらず、全出力ファイルが残っているか"""
+        return (self.last_build is not None and self.last_build['signature'] == signature
+                and all((REPORTS_DIR / output).exists() for output in PAGE_OUTPUTS.values()))
+
+    def record(self, output: str, inputs: Dict, save: bool = True):
+        """生成した出力の入力を記録して保存（save=Falseなら記録のみ。月別ページはまとめて保存する）"""
+        self.outputs[output] = {'inputs': inputs, 'built_at': datetime.now().isoformat()}
+        if save:
+            self._save()
+
+    def prune(self, directory: str):
+        """出力ファイルが残っていない月別ページの記録を削除"""
+        for output in [output for output in self.outputs if output.startswith(f'{directory}/')]:
+            if not (REPORTS_DIR / output).exists():
+                del self.outputs[output]
+
+    def record_build(self, signature: Dict):
+        """全ページの生成に成功した時点の入力の要約を記録して保存"""
+        self.last_build = {'signature': signature, 'built_at': datetime.now().isoformat()}
+        self._save()
+
+    def _save(self):
+        """一時ファイル経由で置き換え"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'outputs': self.outputs, 'last_build': self.last_build},
+                      f, ensure_ascii=False, indent=1)
+        tmp_path.replace(self.path)
+
+
+def is_noop(db_path, manifest_path=DEFAULT_MANIFEST_PATH) -> bool:
+    """前回の全ページ生成から新着記事・変更などがなく、生成もデプロイも不要か"""
+    return BuildManifest(manifest_path).is_noop(build_signature(db_path))
+
+
+class SiteData:
+    """各ページで共有するデータ（最初に参照された時に1回だけDBから読み込む）"""
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.conn = connect_with_archives(self.db_path)
+
+    def close(self):
+        self.conn.close()
+
+    @cached_property
+    def changes(self) -> List[sqlite3.Row]:
+        """全変更履歴（新しい順）"""
+        import generate_history
+        return generate_history.fetch_all_changes(self.conn)
+
+    @cached_property
+    def articles(self) -> List[sqlite3.Row]:
+        """全記事（最終確認の新しい順、変更数つき）"""
+        import generate_archive
+        return generate_archive.fetch_all_articles(self.conn)
+
+    @cached_property
+    def correction_articles(self) -> List[sqlite3.Row]:
+        """おことわり記事（全記事と同じ順）"""
+        return [article for article in self.articles if article['has_correction'] == 1]
+
+    @cached_property
+    def source_stats(self) -> List[tuple]:
+        """ソース別の (ソース, 記事数, 最初の取得日時, 最後の確認日時)"""
+        return self._aggregate_by_source(self.articles)
+
+    @cached_property
+    def correction_stats(self) -> List[tuple]:
+        """おことわり記事のソース別の (ソース, 記事数, 最初の取得日時, 最後の確認日時)"""
+        return self._aggregate_by_source(self.correction_articles)
+
+    @cached_property
+    def portal_stats(self) -> dict:
+        """ポータルページの統計（ホットDBの集計）"""
+        import generate_portal
+        return generate_portal.fetch_database_stats(self.conn)
+
+    @cached_property
+    def marks(self) -> Dict:
+        """ホットDBの高水位マーク"""
+        return data_marks(self.conn)
+
+    @cached_property
+    def archives(self) -> List[List]:
+        """月別アーカイブDBの (名前, サイズ, 更新時刻)"""
+        return _archive_stamps(self.conn, self.db_path)
+
+    def page_inputs(self, page: str) -> Dict:
+        """ページの入力（マニフェストに記録・比較する値）"""
+        import generate_history
+        spec = PAGE_INPUTS[page]
+        inputs = {
+            'data': {key: self.marks[key] for key in spec['marks']},
+            'archives': self.archives,
+            'template': _source_digest(spec['sources']),
+            # 訂正判定（reclassify.pyの再分類を含む）・差分の描画
+            'rules': generate_history.renderer_version() if page == 'history' else get_engine().fingerprint,
+        }
+        if page == 'portal':
+            # ポータルはreports/内の変更レポートと週次レポートも表示する
+            inputs['reports'] = _report_stamps()
+        return inputs
+
+    @staticmethod
+    def _aggregate_by_source(articles) -> List[tuple]:
+        """ソース別に件数・first_seenの最小・last_seenの最大を集計（ソース順）"""
+        by_source: Dict[str, list] = {}
+        for article in articles:
+            entry = by_source.get(article['source'])
+            if entry is None:
+                by_source[article['source']] = [1, article['first_seen'], article['last_seen']]
+                continue
+            entry[0] += 1
+            if article['first_seen'] is not None and (entry[1] is None or article['first_seen'] < entry[1]):
+                entry[1] = article['first_seen']
+            if article['last_seen'] is not None and (entry[2] is None or article['last_seen'] > entry[2]):
+                entry[2] = article['last_seen']
+        return [(source, *by_source[source]) for source in sorted(by_source)]
+
+
+def build_page(page: str, data: SiteData, use_cache: bool = True, workers: Optional[int] = None,
+               is_fresh: Optional[Callable[[str, Dict], bool]] = None) -> List[Tuple[str, Dict]]:
+    """
+    1ページを生成（生成スクリプトは無変更時の終了を速くするため必要になってから読み込む）
+
+    is_fresh: 月別ページの (相対パス, 入力) → 生成済みで入力が同じならTrue（生成を省略）
+
+    Returns:
+        生成した月別ページの [(相対パス, 入力)]
+    """
+    import generate_archive
+    import generate_corrections
+    import generate_history
+    import generate_portal
+
+    if page == 'history':
+        if use_cache:
+            with FragmentCache(version=generate_history.renderer_version()) as cache:
+                written = generate_history.generate_pages(data.changes, REPORTS_DIR, cache, workers, is_fresh=is_fresh)
+            print(f"🗃️  差分キャッシュ: {cache.summary()}")
+        else:
+            written = generate_history.generate_pages(data.changes, REPORTS_DIR, workers=workers, is_fresh=is_fresh)
+        return written
+    elif page == 'archive':
+        return generate_archive.generate_pages(data.articles, data.source_stats, REPORTS_DIR, is_fresh=is_fresh)
+    elif page == 'corrections':
+        generate_corrections.generate_pages(data.correction_articles, data.correction_stats, REPORTS_DIR)
+    elif page == 'portal':
+        generate_portal.generate_portal_html(str(data.db_path), str(REPORTS_DIR), str(REPORTS_DIR / 'index.html'),
+                                             stats=data.portal_stats)
+    else:
+        raise ValueError(f"不明なページ: {page}")
+    return []
+
+
+def build_site(db_path=None, pages=None, use_cache: bool = True, workers: Optional[int] = None,
+               force: bool = False, manifest_path=DEFAULT_MANIFEST_PATH, compress: bool = True) -> Dict[str, Dict]:
+    """
+    サイトを生成（入力に変更のないページは省略）
+
+    Args:
+        db_path: 読み込むDB（スナップショット）のパス
+        pages: 生成するページ（既定: 全ページ）
+        use_cache: 変更履歴ページで差分HTMLの断片キャッシュを使うか
+        workers: 変更履歴ページのカード描画のプロセス数（既定: generate_history.DEFAULT_RENDER_WORKERS）
+        force: Trueならマニフェストにかかわらず全ページを生成
+        manifest_path: ビルドマニフェストのパス
+        compress: Trueなら生成後に reports/ を最小化し、圧縮版（.gz / .br）を書き出す
+
+    Returns:
+        {ページ名: {'ok': 成功したか, 'skipped': 省略したか, 'elapsed_sec': 所要時間}}
+    """
+    import generate_history
+    db_path = Path(db_path) if db_path else PROJECT_ROOT / 'data' / 'articles.db'
+    full_build = pages is None
+    pages = [page for page in PAGES if pages is None or page in pages]
+    workers = workers or generate_history.DEFAULT_RENDER_WORKERS
+    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = BuildManifest(manifest_path)
+
+    # 前回の全ページ生成から何も変わっていなければ、アーカイブDBの結合もせずに終了
+    signature = build_signature(db_path) if full_build else None
+    if signature is not None and not force and manifest.is_noop(signature):
+        print("\n⏭️  前回の生成から新着記事・変更がないため、サイト生成を省略")
+        return {page: {'ok': True, 'skipped': True, 'elapsed_sec': 0.0} for page in pages}
+
+    # テンプレートをまとめてコンパイル（バイトコードが保存済みなら読み込むだけ。カード描画のワーカーも共有する）
+    started_at = time.perf_counter()
+    template_count = precompile()
+    logger.info(f"テンプレート {template_count}個を読み込み: {time.perf_counter() - started_at:.3f}秒")
+
+    # 共通のスタイル・スクリプト（内容が変わったものだけ、新しいハッシュ付きの名前で書き出す）
+    assets = publish_assets(REPORTS_DIR / ASSETS_DIR_NAME)
+    print(f"\n🎨 アセット: {assets['assets']}個（書き出し{assets['written']}個）")
+
+    results = {}
+    data = SiteData(db_path)
+    try:
+        for page in pages:
+            started_at = time.perf_counter()
+            inputs = data.page_inputs(page)
+            if not force and manifest.is_fresh(PAGE_OUTPUTS[page], inputs):
+                print(f"\n⏭️  {PAGE_LABELS[page]}: 入力に変更がないため省略")
+                results[page] = {'ok': True, 'skipped': True, 'elapsed_sec': time.perf_counter() - started_at}
+                continue
+
+            # 月別ページの入力: ページの項目・前後のページ＋テンプレート・訂正ルール（データの高水位マークは含めない）
+            versions = {'template': inputs['template'], 'rules': inputs['rules']}
+
+            def is_fresh(output, shard_inputs):
+                return not force and manifest.is_fresh(output, {**versions, 'shard': shard_inputs})
+
+            print(f"\n🎨 {PAGE_LABELS[page]}を生成中...")
+            try:
+                written = build_page(page, data, use_cache, workers, is_fresh)
+                for output, shard_inputs in written:
+                    manifest.record(output, {**versions, 'shard': shard_inputs}, save=False)
+                if page in SHARD_DIRS:
+                    manifest.prune(SHARD_DIRS[page])
+                manifest.record(PAGE_OUTPUTS[page], inputs)
+                ok = True
+            except Exception as e:
+                # 1ページの失敗で他のページの生成を止めない（マニフェストは更新しないので次回再生成される）
+                print(f"❌ {PAGE_LABELS[page]}生成エラー: {e}")
+                logger.warning(f"{PAGE_LABELS[page]}生成失敗: {e}", exc_info=True)
+                ok = False
+            results[page] = {'ok': ok, 'skipped': False, 'elapsed_sec': time.perf_counter() - started_at}
+    finally:
+        data.close()
+
+    succeeded = all(result['ok'] for result in results.values())
+    if signature is not None and succeeded:
+        # どのページからも参照されなくなった古い版のアセットを削除（圧縮版は次の最小化・事前圧縮で削除）
+        pruned = prune_assets(REPORTS_DIR)
+        if pruned:
+            print(f"🧹 古いアセットを削除: {pruned}個")
+
+    if compress:
+        # 生成し直したファイルだけ最小化・圧縮する（内容が前回の処理後と同じファイルは省略）
+        print_report(precompress(REPORTS_DIR))
+
+    if signature is not None and succeeded:
+        if compress:
+            # 変更レポート・週次レポートも最小化でサイズ・更新時刻が変わるので取り直す
+            signature['reports'] = _report_stamps()
+        manifest.record_build(signature)
+    return results
+
+
+def is_noop_build(results: Dict[str, Dict]) -> bool:
+    """どのページも生成しなかったか（出力に変更がないのでデプロイ不要）"""
+    return all(result['skipped'] for result in results.values())
+
+
+def print_timings(results: Dict[str, Dict]):
+    """ページごとの所要時間を表示（データの読み込みは最初に参照したページに含まれる）"""
+    print(f"\n⏱️  ページ別の所要時間:")
+    for page, result in results.items():
+        status = '✅' if result['ok'] else '❌'
+        skipped = '（省略）' if result.get('skipped') else ''
+        print(f"  {status} {PAGE_LABELS[page]}: {result['elapsed_sec']:.2f}秒{skipped}")
+    print(f"  合計: {sum(result['elapsed_sec'] for result in results.values()):.2f}秒")
+
+
+def main():
+    import argparse
+    arg_parser = argparse.ArgumentParser(description='サイトの全ページを1プロセスで生成')
+    arg_parser.add_argument('--db', type=str, help='読み込むDB（スナップショット）のパス')
+    arg_parser.add_argument('--pages', nargs='+', choices=PAGES, help='生成するページ（既定: 全ページ）')
+    arg_parser.add_argument('--no-cache', action='store_true', help='差分HTMLの断片キャッシュを使わない')
+    arg_parser.add_argument('--workers', type=int, help='カード描画のプロセス数（既定: 1 = 直列）')
+    arg_parser.add_argument('--force', action='store_true', help='入力に変更がなくても全ページを生成')
+    arg_parser.add_argument('--manifest', type=str, default=str(DEFAULT_MANIFEST_PATH), help='ビルドマニフェストのパス')
+    arg_parser.add_argument('--no-compress', action='store_true', help='生成後の最小化・事前圧縮（.gz / .br）をしない')
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    print("NHK記事追跡システム - サイト生成")
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+
+    results = build_site(args.db, args.pages, use_cache=not args.no_cache, workers=args.workers,
+                         force=args.force, manifest_path=args.manifest, compress=not args.no_compress)
+    print_timings(results)
+
+    print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    if not all(result['ok'] for result in results.values()):
+        return 1
+    return NOOP_EXIT_CODE if is_noop_build(results) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
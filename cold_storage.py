@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+コールドストレージ（月別アーカイブDB）
+
+最終確認から一定期間が過ぎた記事とその変更履歴を、ホットDB（data/articles.db）から
+月別のSQLiteファイル（data/archive/articles_YYYYMM.db）へ退避する。
+全期間を表示するページ（history.html, archive.html 等）は connect_with_archives() で
+月別DBをATTACHし、all_articles / all_changes ビュー経由で読む。
+
+使用方法:
+    python3 cold_storage.py                # config.yamlのhorizon_daysで退避
+    python3 cold_storage.py --days 60      # 60日より古い記事を退避
+    python3 cold_storage.py --vacuum       # 退避後にホットDBをVACUUM
+"""
+import re
+import sqlite3
+import argparse
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+# 退避対象テーブルと、退避する行の条件（temp.archive_idsは退避する記事IDの一覧）
+# 依存するテーブルを先に並べる（削除はこの順で行う）
+ARCHIVED_TABLES = {
+    'article_revisions': 'article_id IN (SELECT id FROM temp.archive_ids)',
+    'change_diffs': 'article_id IN (SELECT id FROM temp.archive_ids)',
+    'correction_events': 'article_id IN (SELECT id FROM temp.archive_ids)',
+    'changes': 'article_id IN (SELECT id FROM temp.archive_ids)',
+    'articles': 'id IN (SELECT id FROM temp.archive_ids)',
+}
+
+# SQLiteのATTACH上限（SQLITE_MAX_ATTACHEDの既定値）
+MAX_ATTACHED = 10
+
+ARCHIVE_FILE_PATTERN = re.compile(r'^articles_(\d{6})\.db$')
+
+
+def default_archive_dir(db_path) -> Path:
+    """ホットDBと同じディレクトリのarchive/を既定の退避先とする"""
+    return Path(db_path).parent / 'archive'
+
+
+def list_archives(archive_dir) -> List[Path]:
+    """月別アーカイブDBの一覧（古い順）"""
+    archive_dir = Path(archive_dir)
+    if not archive_dir.exists():
+        return []
+    return sorted(p for p in archive_dir.iterdir() if ARCHIVE_FILE_PATTERN.match(p.name))
+
+
+def _table_columns(conn: sqlite3.Connection, schema: str, table: str) -> List[str]:
+    """テーブルのカラム名一覧（存在しない場合は空）"""
+    return [row[1] for row in conn.execute(f'PRAGMA {schema}.table_info({table})')]
+
+
+def _primary_key(conn: sqlite3.Connection, schema: str, table: str) -> str:
+    """テーブルの主キーのカラム名（アーカイブとホットDBの重複除外に使う）"""
+    for col in conn.execute(f'PRAGMA {schema}.table_info({table})'):
+        if col[5] == 1:
+            return col[1]
+    return 'rowid'
+
+
+def _sync_schema(conn: sqlite3.Connection, schema: str, table: str):
+    """
+    アタッチしたDBにホットDBと同じテーブル・インデックスを用意する
+
+    後からマイグレーションで追加されたカラムはALTER TABLEで補う。
+    """
+    row = conn.execute(
+        "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    if row is None:
+        return
+
+    cold_columns = _table_columns(conn, schema, table)
+    if not cold_columns:
+        ddl = re.sub(rf'^CREATE TABLE "?{table}"?', f'CREATE TABLE IF NOT EXISTS {schema}.{table}', row[0])
+        conn.execute(ddl)
+    else:
+        for col in conn.execute(f'PRAGMA main.table_info({table})'):
+            if col[1] not in cold_columns:
+                col_type = f' {col[2]}' if col[2] else ''
+                conn.execute(f'ALTER TABLE {schema}.{table} ADD COLUMN {col[1]}{col_type}')
+
+    for (index_sql,) in conn.execute(
+        "SELECT sql FROM main.sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,)
+    ).fetchall():
+        conn.execute(re.sub(r'^CREATE INDEX (\w+)', rf'CREATE INDEX IF NOT EXISTS {schema}.\1', index_sql))
+
+
+class ColdStorage:
+    """古い記事を月別アーカイブDBへ退避する"""
+
+    def __init__(self, db_path: str = 'data/articles.db', archive_dir: Optional[str] = None,
+                 horizon_days: int = 30):
+        self.db_path = Path(db_path)
+        self.archive_dir = Path(archive_dir) if archive_dir else default_archive_dir(db_path)
+        self.horizon_days = horizon_days
+
+    def archive_path(self, month: str) -> Path:
+        """月（YYYYMM）に対応するアーカイブDBのパス"""
+        return self.archive_dir / f'articles_{month}.db'
+
+    def archive_old_articles(self, vacuum: bool = False) -> Dict:
+        """
+        最終確認がhorizon_daysより古い記事を、最終確認月のアーカイブDBへ移動
+
+        Returns:
+            {'articles': 移動した記事数, 'changes': 移動した変更数, 'months': [YYYYMM, ...]}
+        """
+        cutoff = (datetime.now() - timedelta(days=self.horizon_days)).isoformat()
+        stats = {'articles': 0, 'changes': 0, 'months': []}
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT substr(last_seen, 1, 4) || substr(last_seen, 6, 2) AS month, id
+            FROM articles
+            WHERE last_seen < ?
+            ORDER BY month
+        ''', (cutoff,))
+        by_month: Dict[str, List[int]] = {}
+        for month, article_id in cursor.fetchall():
+            by_month.setdefault(month, []).append(article_id)
+
+        if not by_month:
+            conn.close()
+            logger.info(f"コールドストレージ: 退避対象なし（基準: {cutoff}）")
+            return stats
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS archive_ids (id INTEGER PRIMARY KEY)')
+
+        for month, article_ids in by_month.items():
+            cursor.execute('ATTACH DATABASE ? AS cold', (str(self.archive_path(month)),))
+            try:
+                cursor.execute('DELETE FROM temp.archive_ids')
+                cursor.executemany('INSERT INTO temp.archive_ids (id) VALUES (?)',
+                                   [(article_id,) for article_id in article_ids])
+
+                for table in ARCHIVED_TABLES:
+                    _sync_schema(conn, 'cold', table)
+                conn.commit()
+
+                # 先にアーカイブDBへ書き込み、成功してからホットDBから削除する
+                # （途中で失敗しても再実行すればINSERT OR REPLACEで重複なく揃う）
+                moved = {}
+                for table, condition in ARCHIVED_TABLES.items():
+                    columns = ', '.join(_table_columns(conn, 'main', table))
+                    cursor.execute(f'''
+                        INSERT OR REPLACE INTO cold.{table} ({columns})
+                        SELECT {columns} FROM main.{table} WHERE {condition}
+                    ''')
+                    moved[table] = cursor.rowcount
+                conn.commit()
+
+                for table, condition in ARCHIVED_TABLES.items():
+                    cursor.execute(f'DELETE FROM main.{table} WHERE {condition}')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.execute('DETACH DATABASE cold')
+
+            stats['articles'] += moved['articles']
+            stats['changes'] += moved['changes']
+            stats['months'].append(month)
+            logger.info(f"コールドストレージ: {month} へ記事{moved['articles']}件, 変更{moved['changes']}件を退避")
+
+        if vacuum:
+            conn.execute('VACUUM')
+
+        conn.close()
+        return stats
+
+
+def connect_with_archives(db_path, archive_dir=None) -> sqlite3.Connection:
+    """
+    ホットDBに月別アーカイブDBをATTACHした接続を返す
+
+    テーブルごとに全期間を結合した一時ビュー all_<table>（例: all_articles, all_changes）を作成する。
+    アーカイブ数がATTACH上限を超える場合、古い月は一時テーブルへ読み込んでから結合する。
+    スナップショット（snapshot.py）の場合は、記録された元DBのアーカイブを使う。
+    ホットDBに残っている行（退避の途中など）はアーカイブ側から除外する。
+    """
+    conn = sqlite3.connect(db_path)
+    if archive_dir is None:
+        try:
+            row = conn.execute("SELECT value FROM snapshot_meta WHERE key = 'archive_dir'").fetchone()
+        except sqlite3.OperationalError:
+            row = None
+        archive_dir = row[0] if row else default_archive_dir(db_path)
+    archives = list_archives(archive_dir)
+
+    # 新しい月を優先してATTACHし、残りは一時テーブルへ読み込む
+    attached = archives[-MAX_ATTACHED:] if len(archives) > MAX_ATTACHED else archives
+    overflow = archives[:len(archives) - len(attached)]
+
+    schemas = []
+    for path in overflow:
+        conn.execute('ATTACH DATABASE ? AS overflow', (str(path),))
+        for table in ARCHIVED_TABLES:
+            columns = _table_columns(conn, 'main', table)
+            cold_columns = _table_columns(conn, 'overflow', table)
+            if not columns or not cold_columns:
+                continue
+            select_list = ', '.join(col if col in cold_columns else f'NULL AS {col}' for col in columns)
+            conn.execute(f'CREATE TEMP TABLE IF NOT EXISTS overflow_{table} AS SELECT * FROM main.{table} WHERE 0')
+            conn.execute(f'INSERT INTO temp.overflow_{table} SELECT {select_list} FROM overflow.{table}')
+        conn.commit()
+        conn.execute('DETACH DATABASE overflow')
+
+    for path in attached:
+        schema = f'cold_{ARCHIVE_FILE_PATTERN.match(path.name).group(1)}'
+        conn.execute('ATTACH DATABASE ? AS ' + schema, (str(path),))
+        schemas.append(schema)
+
+    for table in ARCHIVED_TABLES:
+        columns = _table_columns(conn, 'main', table)
+        if not columns:
+            # ホットDBが未マイグレーションのテーブルはビューを作らない
+            continue
+        selects = [f'SELECT {", ".join(columns)} FROM main.{table}']
+        pk = _primary_key(conn, 'main', table)
+        not_in_hot = f'{pk} NOT IN (SELECT {pk} FROM main.{table})'
+        if _table_columns(conn, 'temp', f'overflow_{table}'):
+            selects.append(f'SELECT {", ".join(columns)} FROM temp.overflow_{table} WHERE {not_in_hot}')
+        for schema in schemas:
+            cold_columns = _table_columns(conn, schema, table)
+            if not cold_columns:
+                continue
+            select_list = ', '.join(col if col in cold_columns else f'NULL AS {col}' for col in columns)
+            selects.append(f'SELECT {select_list} FROM {schema}.{table} WHERE {not_in_hot}')
+        conn.execute(f'CREATE TEMP VIEW all_{table} AS ' + ' UNION ALL '.join(selects))
+
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description='古い記事を月別アーカイブDBへ退避')
+    parser.add_argument('--days', type=int, help='最終確認からN日より古い記事を退避（既定: config.yaml）')
+    parser.add_argument('--db', type=str, help='ホットDBのパス（既定: config.yaml）')
+    parser.add_argument('--vacuum', action='store_true', help='退避後にホットDBをVACUUM')
+    args = parser.parse_args()
+
+    import yaml
+    with open('config.yaml', 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+
+    db_path = args.db or config['database']['path']
+    horizon_days = args.days or config.get('cold_storage', {}).get('horizon_days', 30)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    print("="*60)
+    print("NHK記事データ コールドストレージ退避")
+    print("="*60)
+    print(f"\n対象: 最終確認から{horizon_days}日より古い記事")
+
+    stats = ColdStorage(db_path, horizon_days=horizon_days).archive_old_articles(vacuum=args.vacuum)
+
+    print(f"✅ 記事{stats['articles']}件, 変更{stats['changes']}件を退避しました")
+    if stats['months']:
+        print(f"退避先: {', '.join(stats['months'])}")
+    print("\n" + "="*60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+訂正検出ルールエンジン
+
+config.yaml の correction_rules で宣言したルール（キーワードの組み合わせ）を
+起動時に一度だけコンパイルし、本文を1パスで走査してルールIDとキーワード位置を返す。
+検出（storage）、抜粋・差分表示（generate_*）、NHK ONE検索、週次レポートの
+訂正判定はすべてこのエンジンを経由する。
+"""
+import re
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = Path(__file__).parent / 'config.yaml'
+
+# config.yamlにcorrection_rulesがない場合の既定ルール（従来のdetect_correctionと同じ判定）
+DEFAULT_RULES_CONFIG = {
+    'notice_marker': '※',
+    'apology_marker': '失礼しました',
+    'rules': [
+        {'id': 'initially_published', 'keywords': ['※', '当初', '掲載']},
+        {'id': 'apology', 'keywords': ['※', '失礼しました']},
+    ],
+}
+
+
+class RuleMatch(NamedTuple):
+    """成立したルール"""
+    rule_id: str
+    keywords: List[str]
+    offsets: Dict[str, List[int]]  # キーワード -> 出現位置（文字オフセット）
+
+
+class CorrectionRuleEngine:
+    """訂正ルールをまとめて1パスで照合するエンジン"""
+
+    def __init__(self, rules: List[Dict], notice_marker: str = '※', apology_marker: str = '失礼しました'):
+        """
+        Args:
+            rules: [{'id': ルールID, 'keywords': [すべて含まれると成立するキーワード, ...]}, ...]
+                   （上から順に評価し、detectは最初に成立したルールを採用）
+            notice_marker: おことわり文の開始記号
+            apology_marker: おことわりの定型文
+        """
+        if not rules:
+            raise ValueError("correction_rulesにルールが1件もありません")
+
+        self.rules = [(rule['id'], list(rule['keywords'])) for rule in rules]
+        self.notice_marker = notice_marker
+        self.apology_marker = apology_marker
+        self.markers = (notice_marker, apology_marker)
+
+        # ルール定義のフィンガープリント（再分類のチェックポイントがどのルールで作られたかの識別に使う）
+        self.fingerprint = hashlib.sha256(
+            json.dumps({'rules': self.rules, 'markers': self.markers}, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()[:16]
+
+        keywords = []
+        for _, rule_keywords in self.rules:
+            for keyword in rule_keywords:
+                if keyword not in keywords:
+                    keywords.append(keyword)
+        self.keywords = keywords
+
+        # 全キーワードを1つの正規表現にまとめ、先読みで重なりも含めて全位置を1パスで列挙する
+        # 同じ位置からは最長のキーワードが返るので、その接頭辞になっているキーワードも補う
+        by_length = sorted(keywords, key=len, reverse=True)
+        self._pattern = re.compile('(?=(' + '|'.join(re.escape(kw) for kw in by_length) + '))')
+        self._prefixes = {
+            kw: [other for other in keywords if other != kw and kw.startswith(other)]
+            for kw in keywords
+        }
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'CorrectionRuleEngine':
+        """config.yamlのcorrection_rulesセクションからエンジンを作成"""
+        rules_config = (config or {}).get('correction_rules') or DEFAULT_RULES_CONFIG
+        return cls(
+            rules_config['rules'],
+            notice_marker=rules_config.get('notice_marker', DEFAULT_RULES_CONFIG['notice_marker']),
+            apology_marker=rules_config.get('apology_marker', DEFAULT_RULES_CONFIG['apology_marker']),
+        )
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        """
+        全キーワードの出現位置を1パスで取得
+
+        Returns:
+            {キーワード: [開始オフセット, ...]}（出現したキーワードのみ）
+        """
+        offsets: Dict[str, List[int]] = {}
+        if not text:
+            return offsets
+
+        for m in self._pattern.finditer(text):
+            keyword = m.group(1)
+            offsets.setdefault(keyword, []).append(m.start())
+            for prefix in self._prefixes[keyword]:
+                offsets.setdefault(prefix, []).append(m.start())
+        return offsets
+
+    def match(self, text: str) -> List[RuleMatch]:
+        """成立したルールをすべて返す（ルールの宣言順）"""
+        if not text:
+            return []
+
+        offsets = self.scan(text)
+        return [
+            RuleMatch(rule_id, rule_keywords, {kw: offsets[kw] for kw in rule_keywords})
+            for rule_id, rule_keywords in self.rules
+            if all(kw in offsets for kw in rule_keywords)
+        ]
+
+    def detect(self, text: str) -> Tuple[bool, List[str]]:
+        """
+        訂正を検出（ArticleStorage.detect_correctionと同じ形式）
+
+        Returns:
+            (has_correction, found_keywords): 最初に成立したルールのキーワード
+        """
+        matches = self.match(text)
+        if not matches:
+            return False, []
+        return True, list(matches[0].keywords)
+
+    def has_marker(self, text: str) -> bool:
+        """おことわりの目印（※ または 失礼しました）を含むか"""
+        if not text:
+            return False
+        return self.notice_marker in text or self.apology_marker in text
+
+    def excerpt(self, text: str, max_length: int = 200) -> Optional[str]:
+        """おことわりの目印を含む文を抜き出す（correction_events.excerpt用）"""
+        if not text:
+            return None
+        sentences = text.replace('。', '。\n').split('\n')
+        found = [sentence.strip() for sentence in sentences if self.has_marker(sentence)]
+        if not found:
+            return None
+        return '\n'.join(found)[:max_length]
+
+    def rules_for_keywords(self, keywords: Optional[str]) -> List[str]:
+        """
+        保存済みのcorrection_keywords（カンマ区切り）で成立するルールID
+
+        DBに記録されたキーワードから、現在のルールで訂正とみなせるかを判定する。
+        """
+        if not keywords:
+            return []
+        stored = set(keywords.split(','))
+        return [rule_id for rule_id, rule_keywords in self.rules if stored.issuperset(rule_keywords)]
+
+
+_default_engine: Optional[CorrectionRuleEngine] = None
+
+
+def get_engine() -> CorrectionRuleEngine:
+    """config.yamlから作成した共有エンジン（初回呼び出し時に一度だけコンパイル）"""
+    global _default_engine
+    if _default_engine is None:
+        config = None
+        if CONFIG_PATH.exists():
+            import yaml
+            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+                config = yaml.safe_load(f)
+        _default_engine = CorrectionRuleEngine.from_config(config)
+        logger.debug(f"訂正ルール: {[rule_id for rule_id, _ in _default_engine.rules]}")
+    return _default_engine
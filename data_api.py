@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+静的JSONデータAPI
+
+各ページの記事・変更をHTMLに埋め込まず、小さなJSONファイル（シャード）に分けて reports/api/ に出力する。
+ページ（history.html, archive.html, corrections.html）は読者が必要なシャードだけを取得して表示する。
+
+    api/changes/index.json              変更履歴（日ごと: api/changes/YYYY-MM-DD.json）
+    api/articles/index.json             記事（ソース・初回確認の月ごと: api/articles/<ソース>/YYYY-MM.json）
+    api/corrections/index.json          おことわり記事（api/corrections/all.json）
+
+index.json はシャードの一覧（キー・件数・内容のハッシュ）。ページは index.json?v=<ハッシュ>、
+各シャードは <キー>.json?v=<ハッシュ> で取得するので、内容が変わったファイルだけがキャッシュから外れる。
+シャードの内容のハッシュが前回の index.json と同じで、ファイルも残っていれば書き出さない。
+シャードを読み込むページ共通のスクリプトは templates/assets/api_client.js。
+"""
+import json
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+from urllib.parse import urlparse
+
+from pagination import shard_digest
+
+logger = logging.getLogger(__name__)
+
+API_DIR = 'api'
+
+# JSONの形式（変えたら上げる。全シャードを書き直す）
+API_VERSION = 1
+
+
+def source_slug(source: str, base_url: str = '') -> str:
+    """ソースのパス用の名前（'https://www.nhk.or.jp/sapporo-news/' → 'sapporo'）"""
+    path = urlparse(base_url).path.strip('/') if base_url else ''
+    if path:
+        return path.split('/')[0].replace('-news', '')
+    return 'source-' + hashlib.sha256(source.encode('utf-8')).hexdigest()[:8]
+
+
+def code_version(*parts, files=()) -> str:
+    """シャードの内容に影響するコードのバージョン（描画バージョン・スクリプトの内容のハッシュ）"""
+    digest = hashlib.sha256(json.dumps([API_VERSION, *parts]).encode('utf-8'))
+    for path in files:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _dump(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+class ShardWriter:
+    """1つのセクション（api/<section>/）のシャードと index.json を書き出す"""
+
+    def __init__(self, reports_dir, section: str, version: str):
+        """
+        Args:
+            reports_dir: 出力先（reports/）
+            section: セクション名（changes / articles / corrections）
+            version: code_version() の値（前回と違えば全シャードを書き直す）
+        """
+        self.reports_dir = Path(reports_dir)
+        self.section = section
+        self.directory = self.reports_dir / API_DIR / section
+        self.version = version
+        self.entries: List[Dict] = []
+        self.written = 0
+
+        self.previous: Dict[str, Dict] = {}
+        index_path = self.directory / 'index.json'
+        if index_path.exists():
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"{index_path} を読み込めないため全シャードを書き直します: {e}")
+                saved = {}
+            if saved.get('code') == version:
+                self.previous = {entry['key']: entry for entry in saved.get('shards', [])}
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}.json'
+
+    def is_fresh(self, key: str, rows: list) -> bool:
+        """前回と同じ内容で書き出し済みか"""
+        entry = self.previous.get(key)
+        return entry is not None and entry['digest'] == shard_digest(rows) and self._path(key).exists()
+
+    def add(self, key: str, rows: list, serialize: Callable[[list], list], **fields):
+        """
+        シャードを追加（内容が前回と同じなら書き出さずに前回の一覧の値を使う）
+
+        Args:
+            key: シャードのキー（ファイル名。'/'でサブディレクトリ）
+            rows: シャードの元データ（ハッシュの計算に使う）
+            serialize: rows → JSONに書き出すレコードの一覧（書き出す時だけ呼ぶ）
+            fields: 一覧に載せる付加情報（ソース・月など）
+        """
+        if self.is_fresh(key, rows):
+            self.entries.append(self.previous[key])
+            return
+        records = serialize(rows)
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(_dump(records))
+        self.entries.append({'key': key, 'count': len(records), 'digest': shard_digest(rows), **fields})
+        self.written += 1
+
+    def finish(self, **meta) -> str:
+        """
+        index.json を書き出し、一覧にないシャードのファイルを削除
+
+        Returns:
+            ページから参照する index.json のURL（reports/ からの相対、?v=内容のハッシュ）
+        """
+        keep = {self._path(entry['key']) for entry in self.entries}
+        removed = 0
+        if self.directory.exists():
+            for path in self.directory.rglob('*.json'):
+                if path.name != 'index.json' and path not in keep:
+                    path.unlink()
+                    removed += 1
+
+        index = {
+            'version': API_VERSION,
+            'code': self.version,
+            'generated_at': datetime.now().isoformat(),
+            'total': sum(entry['count'] for entry in self.entries),
+            'shards': self.entries,
+            **meta,
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        body = _dump(index)
+        with open(self.directory / 'index.json', 'w', encoding='utf-8') as f:
+            f.write(body)
+
+        print(f"🧩 データAPI（{self.section}）: {len(self.entries)}シャード中{self.written}シャードを書き出し"
+              + (f"、{removed}シャードを削除" if removed else ''))
+        digest = hashlib.sha256(_dump([index['code'], self.entries, meta]).encode('utf-8')).hexdigest()[:12]
+        return f'{API_DIR}/{self.section}/index.json?v={digest}'
+
+
+def group_rows(rows: list, key: Callable) -> Dict[str, list]:
+    """元の順序を保ってキーごとにまとめる"""
+    groups: Dict[str, list] = {}
+    for row in rows:
+        groups.setdefault(key(row), []).append(row)
+    return groups
+
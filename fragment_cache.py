@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+描画済みHTML断片のディスクキャッシュ
+
+generate_history.py が変更ごとに描画する差分HTMLを、入力（変更前・変更後・タイトル）と
+描画バージョンのハッシュをキーにSQLiteファイルへ保存する。
+合計サイズが上限を超えたら最終利用が古いものから削除する（LRU）。
+描画バージョンが変わった場合はキャッシュ全体を自動的に破棄する。
+"""
+import time
+import json
+import sqlite3
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(__file__).parent / 'data' / 'cache' / 'fragments.db'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# 「描画結果がNone（変更なしで表示しない）」を表す値
+_NONE = '\x00none'
+
+
+class FragmentCache:
+    """サイズ上限付きLRUのHTML断片キャッシュ"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, version: str = '', max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            path: キャッシュDBのパス
+            version: 描画バージョン（変わるとキャッシュ全体を破棄）
+            max_bytes: 保存する断片の合計サイズ上限
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.version = version
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+        self._touched: Dict[str, float] = {}
+
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS fragments (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_fragments_last_used ON fragments(last_used)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS cache_meta (key TEXT PRIMARY KEY, value TEXT)')
+
+        row = self.conn.execute("SELECT value FROM cache_meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != version:
+            if row is not None:
+                logger.info(f"描画バージョン変更のためキャッシュを破棄: {row[0]} → {version}")
+            self.conn.execute('DELETE FROM fragments')
+            self.conn.execute("INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('version', ?)", (version,))
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def make_key(self, kind: str, *parts) -> str:
+        """断片の種類と入力からキーを作成（描画バージョンを含む）"""
+        payload = json.dumps([self.version, kind, *parts], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Optional[str]]:
+        """
+        キャッシュを参照
+
+        Returns:
+            (ヒットしたか, 断片HTML（描画結果がNoneだった場合はNone）)
+        """
+        row = self.conn.execute('SELECT value FROM fragments WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.stats['misses'] += 1
+            return False, None
+        self.stats['hits'] += 1
+        # 最終利用時刻はまとめて書き込む（読み取りごとの書き込みを避ける）
+        self._touched[key] = time.time()
+        return True, None if row[0] == _NONE else row[0]
+
+    def put(self, key: str, value: Optional[str]):
+        """断片を保存（commit / 上限超過の削除はclose時にまとめて行う）"""
+        stored = _NONE if value is None else value
+        self.conn.execute(
+            'INSERT OR REPLACE INTO fragments (key, value, size, last_used) VALUES (?, ?, ?, ?)',
+            (key, stored, len(stored.encode('utf-8')), time.time())
+        )
+        self.stats['stored'] += 1
+
+    def _evict(self):
+        """合計サイズが上限を超えた分を、最終利用が古い順に削除"""
+        total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM fragments').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        removed = 0
+        keys = []
+        for key, size in self.conn.execute('SELECT key, size FROM fragments ORDER BY last_used'):
+            if removed >= excess:
+                break
+            keys.append((key,))
+            removed += size
+        self.conn.executemany('DELETE FROM fragments WHERE key = ?', keys)
+        self.stats['evicted'] += len(keys)
+
+    def close(self):
+        """最終利用時刻の反映・上限超過分の削除を行って閉じる"""
+        if self.conn is None:
+            return
+        self.conn.executemany('UPDATE fragments SET last_used = ? WHERE key = ?',
+                              [(used, key) for key, used in self._touched.items()])
+        self._touched.clear()
+        self._evict()
+        self.conn.commit()
+        self.conn.close()
+        self.conn = None
+
+    def hit_rate(self) -> float:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        """ヒット率などの集計（ログ表示用）"""
+        return (f"ヒット{self.stats['hits']}件 / ミス{self.stats['misses']}件 "
+                f"(ヒット率{self.hit_rate() * 100:.1f}%), 保存{self.stats['stored']}件, 削除{self.stats['evicted']}件")
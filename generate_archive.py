@@ -6,12 +6,27 @@ NHK記事アーカイブビューアー
 
 import sqlite3
 import re
-from datetime import datetime
 from pathlib import Path
+from urllib.parse import quote
+
+from cold_storage import connect_with_archives
+from correction_rules import get_engine
+from data_api import ShardWriter, code_version, group_rows, source_slug
+from search_index import write_search_index
+from pagination import (
+    DEFAULT_PAGE_SIZE, month_of, plan_shards, remove_stale_shards, render_month_index, render_pager,
+    shard_digest, shard_title,
+)
+from site_templates import render_page
 
 # プロジェクトルート
 PROJECT_ROOT = Path(__file__).parent
 
+# 月別ページ（記事の初回確認の月ごと）の出力先（reports/ からの相対）と1ページの最大件数
+# archive.html には最終確認の新しい記事1ページ分と月別一覧を表示する
+SHARD_DIR = 'archive'
+PAGE_SIZE = DEFAULT_PAGE_SIZE
+
 def highlight_correction_notice(text: str) -> str:
     """※から始まる文（訂正のおことわり）をハイライト"""
     if not text:
@@ -31,13 +46,15 @@ def extract_correction_summary(text, max_length=150):
     if not text:
         return ''
 
+    correction_rules = get_engine()
+
     # 文を分割
     sentences = text.replace('。', '。\n').split('\n')
 
     # ※を含む文と「失礼しました」を含む文を抽出
     correction_sentences = []
     for sentence in sentences:
-        if '※' in sentence or '失礼しました' in sentence:
+        if correction_rules.has_marker(sentence):
             correction_sentences.append(sentence.strip())
 
     if correction_sentences:
@@ -48,12 +65,12 @@ def extract_correction_summary(text, max_length=150):
         if len(result) > max_length:
             shortened = []
             for sent in correction_sentences:
-                if '失礼しました' in sent:
+                if correction_rules.apology_marker in sent:
                     # 訂正のおことわり文は全文表示
                     shortened.append(sent)
-                elif '※' in sent:
+                elif correction_rules.notice_marker in sent:
                     # ※を含む文は前後を含めて表示
-                    idx = sent.find('※')
+                    idx = sent.find(correction_rules.notice_marker)
                     start = max(0, idx - 30)
                     end = min(len(sent), idx + 50)
                     excerpt = sent[start:end]
@@ -103,7 +120,7 @@ def get_full_url(source, relative_path):
         return base_url + relative_path
     return relative_path
 
-def get_article_latest_change(db_path, link):
+def get_article_latest_change(db_path, article_id):
     """記事の最新変更を取得"""
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
@@ -112,26 +129,36 @@ def get_article_latest_change(db_path, link):
     cursor.execute("""
         SELECT old_value, new_value, change_type, detected_at
         FROM changes
-        WHERE link = ?
+        WHERE article_id = ?
         ORDER BY detected_at DESC
         LIMIT 1
-    """, (link,))
+    """, (article_id,))
 
     result = cursor.fetchone()
     conn.close()
     return result
 
 def get_all_articles(db_path, limit=None):
-    """全記事を取得（新しい順）"""
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    """全記事を取得（新しい順）- 月別アーカイブDBを含む全期間"""
+    conn = connect_with_archives(db_path)
+    articles = fetch_all_articles(conn, limit)
+    conn.close()
+
+    return articles
+
+def fetch_all_articles(conn, limit=None):
+    """全記事を取得（connはconnect_with_archivesの接続。build_site.pyと共有）"""
     cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
 
     query = """
     SELECT
-        *,
-        (SELECT COUNT(*) FROM changes WHERE changes.link = articles.link) as change_count
-    FROM articles
+        a.*,
+        COALESCE(cc.change_count, 0) as change_count
+    FROM all_articles a
+    LEFT JOIN (
+        SELECT article_id, COUNT(*) as change_count FROM all_changes GROUP BY article_id
+    ) cc ON cc.article_id = a.id
     ORDER BY last_seen DESC
     """
 
@@ -139,14 +166,11 @@ def get_all_articles(db_path, limit=None):
         query += f" LIMIT {limit}"
 
     cursor.execute(query)
-    articles = cursor.fetchall()
-    conn.close()
-
-    return articles
+    return cursor.fetchall()
 
 def get_source_stats(db_path):
     """ソース別統計を取得"""
-    conn = sqlite3.connect(db_path)
+    conn = connect_with_archives(db_path)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -155,7 +179,7 @@ def get_source_stats(db_path):
         COUNT(*) as count,
         MIN(first_seen) as oldest,
         MAX(last_seen) as newest
-    FROM articles
+    FROM all_articles
     GROUP BY source
     ORDER BY source
     """)
@@ -165,662 +189,146 @@ def get_source_stats(db_path):
 
     return stats
 
-def generate_html(articles, stats, output_path):
-    """HTMLファイルを生成"""
-
-    # 全ソースのリスト
-    all_sources = sorted(SOURCE_BASE_URLS.keys())
-
-    html = f"""<!DOCTYPE html>
-<html lang="ja">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>NHK記事アーカイブ - 全記事</title>
-
-    <!-- Favicon -->
-    <link rel="icon" type="image/x-icon" href="favicon.ico">
-    <link rel="apple-touch-icon" href="apple-touch-icon.png">
-
-    <!-- OGP (Open Graph Protocol) -->
-    <meta property="og:title" content="NHK記事アーカイブ - 全記事" />
-    <meta property="og:description" content="NHK地方局ニュースの全記事アーカイブ。ソース別・訂正記事の検索が可能。" />
-    <meta property="og:image" content="https://nhk-news-tracker.netlify.app/ogp-image.png" />
-    <meta property="og:url" content="https://nhk-news-tracker.netlify.app/archive.html" />
-    <meta property="og:type" content="website" />
-
-    <!-- Twitter Card -->
-    <meta name="twitter:card" content="summary_large_image" />
-    <meta name="twitter:title" content="NHK記事アーカイブ - 全記事" />
-    <meta name="twitter:description" content="NHK地方局ニュースの全記事アーカイブ。ソース別・訂正記事の検索が可能。" />
-    <meta name="twitter:image" content="https://nhk-news-tracker.netlify.app/ogp-image.png" />
-
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Hiragino Sans', sans-serif;
-            background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-            padding: 0;
-            margin: 0;
-            line-height: 1.4;
-            padding-top: 60px; /* グローバルナビの高さ分 */
-        }}
-
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            padding: 15px;
-        }}
-
-        /* グローバルナビゲーション */
-        .global-nav {{
-            position: fixed;
-            top: 0;
-            left: 0;
-            right: 0;
-            background: rgba(255, 255, 255, 0.98);
-            backdrop-filter: blur(10px);
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            z-index: 1000;
-            border-bottom: 2px solid #667eea;
-        }}
-
-        .global-nav-content {{
-            max-width: 1400px;
-            margin: 0 auto;
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            padding: 12px 20px;
-        }}
-
-        .global-nav-logo {{
-            font-size: 1.3em;
-            font-weight: bold;
-            color: #2d3748;
-            text-decoration: none;
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }}
-
-        .global-nav-links {{
-            display: flex;
-            gap: 25px;
-            align-items: center;
-        }}
-
-        .global-nav-link {{
-            color: #4a5568;
-            text-decoration: none;
-            font-weight: 500;
-            font-size: 0.95em;
-            transition: color 0.2s;
-            padding: 8px 12px;
-            border-radius: 6px;
-        }}
-
-        .global-nav-link:hover {{
-            color: #667eea;
-            background: #f7fafc;
-        }}
-
-        .global-nav-link.active {{
-            color: #667eea;
-            background: #edf2f7;
-        }}
-
-        header {{
-            background: white;
-            padding: 30px;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-            margin-bottom: 30px;
-            text-align: center;
-        }}
-
-        h1 {{
-            color: #2d3748;
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }}
-
-        .subtitle {{
-            color: #718096;
-            font-size: 1.1em;
-        }}
-
-        .stats {{
-            display: flex;
-            justify-content: center;
-            gap: 30px;
-            margin-top: 20px;
-            flex-wrap: wrap;
-        }}
-
-        .stat-item {{
-            text-align: center;
-        }}
-
-        .stat-number {{
-            font-size: 2em;
-            font-weight: bold;
-            color: #4facfe;
-        }}
-
-        .stat-label {{
-            color: #718096;
-            font-size: 0.9em;
-        }}
-
-        .filter-bar {{
-            background: white;
-            padding: 20px;
-            border-radius: 15px;
-            margin-bottom: 20px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }}
-
-        .filter-section {{
-            margin-bottom: 15px;
-        }}
-
-        .filter-label {{
-            font-weight: bold;
-            color: #2d3748;
-            margin-bottom: 8px;
-            display: block;
-        }}
-
-        .search-box {{
-            width: 100%;
-            padding: 12px 20px;
-            border: 2px solid #e2e8f0;
-            border-radius: 10px;
-            font-size: 1em;
-            transition: border-color 0.2s;
-        }}
-
-        .search-box:focus {{
-            outline: none;
-            border-color: #4facfe;
-        }}
-
-        .filter-buttons {{
-            display: flex;
-            gap: 10px;
-            flex-wrap: wrap;
-        }}
-
-        .filter-btn {{
-            padding: 10px 20px;
-            border: 2px solid #e2e8f0;
-            background: white;
-            border-radius: 20px;
-            cursor: pointer;
-            transition: all 0.2s;
-            font-weight: bold;
-            font-size: 0.9em;
-        }}
-
-        .filter-btn:hover {{
-            background: #f7fafc;
-        }}
-
-        .filter-btn.active {{
-            background: #4facfe;
-            color: white;
-            border-color: #4facfe;
-        }}
-
-        .article-card {{
-            background: white;
-            border-radius: 15px;
-            padding: 25px;
-            margin-bottom: 15px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-            transition: transform 0.2s, box-shadow 0.2s;
-        }}
-
-        .article-card:hover {{
-            transform: translateY(-3px);
-            box-shadow: 0 10px 30px rgba(0,0,0,0.15);
-        }}
-
-        .article-header {{
-            display: flex;
-            justify-content: space-between;
-            align-items: flex-start;
-            margin-bottom: 12px;
-            padding-bottom: 12px;
-            border-bottom: 2px solid #e2e8f0;
-        }}
-
-        .article-source {{
-            display: inline-block;
-            padding: 6px 14px;
-            border-radius: 20px;
-            font-weight: bold;
-            font-size: 0.8em;
-            background: #e3f2fd;
-            color: #1976d2;
-        }}
-
-        .article-meta {{
-            text-align: right;
-            font-size: 0.8em;
-            color: #718096;
-        }}
-
-        .article-title {{
-            font-size: 1.3em;
-            font-weight: bold;
-            color: #2d3748;
-            margin-bottom: 12px;
-            line-height: 1.4;
-        }}
-
-        .article-link {{
-            color: #4facfe;
-            text-decoration: none;
-            font-size: 0.85em;
-            word-break: break-all;
-            display: inline-block;
-            margin-bottom: 10px;
-        }}
-
-        .article-link:hover {{
-            text-decoration: underline;
-        }}
-
-        .article-description {{
-            color: #4a5568;
-            line-height: 1.6;
-            margin-top: 10px;
-        }}
-
-        .article-badges {{
-            margin-top: 12px;
-            display: flex;
-            gap: 8px;
-            flex-wrap: wrap;
-        }}
-
-        .badge {{
-            display: inline-block;
-            padding: 4px 10px;
-            border-radius: 12px;
-            font-size: 0.75em;
-            font-weight: bold;
-        }}
-
-        .badge-changed {{
-            background: #fef3c7;
-            color: #92400e;
-        }}
-
-        .badge-correction {{
-            background: #fecaca;
-            color: #991b1b;
-        }}
-
-        .correction-notice {{
-            background: #ffeb3b;
-            border-left: 4px solid #d32f2f;
-            padding: 8px 12px;
-            margin: 8px 0;
-            display: inline-block;
-            border-radius: 4px;
-            font-weight: bold;
-            color: #d32f2f;
-        }}
-
-        .change-diff {{
-            margin-top: 15px;
-            font-size: 0.9em;
-        }}
-
-        .diff-old {{
-            background: #fee;
-            padding: 12px;
-            border-radius: 4px;
-            margin-bottom: 8px;
-            color: #c00;
-            white-space: pre-wrap;
-            word-wrap: break-word;
-            line-height: 1.8;
-        }}
-
-        .diff-new {{
-            background: #efe;
-            padding: 12px;
-            border-radius: 4px;
-            color: #0a0;
-            white-space: pre-wrap;
-            word-wrap: break-word;
-            line-height: 1.8;
-        }}
-
-        .no-results {{
-            text-align: center;
-            padding: 60px;
-            color: #718096;
-            font-size: 1.2em;
-            background: white;
-            border-radius: 15px;
-        }}
-
-        .results-info {{
-            background: white;
-            padding: 15px 20px;
-            border-radius: 10px;
-            margin-bottom: 15px;
-            font-weight: bold;
-            color: #2d3748;
-        }}
-
-        .nav-links {{
-            background: white;
-            padding: 15px;
-            border-radius: 15px;
-            margin-bottom: 20px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-            display: flex;
-            gap: 12px;
-            justify-content: center;
-            flex-wrap: wrap;
-        }}
-
-        .nav-link {{
-            padding: 10px 20px;
-            background: #4facfe;
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-weight: bold;
-            transition: background-color 0.2s;
-        }}
-
-        .nav-link:hover {{
-            background: #3d8fd9;
-        }}
-
-        .nav-link.secondary {{
-            background: #667eea;
-        }}
-
-        .nav-link.secondary:hover {{
-            background: #5568d3;
-        }}
-    </style>
-</head>
-<body>
-    <!-- グローバルナビゲーション -->
-    <nav class="global-nav">
-        <div class="global-nav-content">
-            <a href="index.html" class="global-nav-logo">📰 NHK記事追跡システム</a>
-            <div class="global-nav-links">
-                <a href="index.html" class="global-nav-link">ポータル</a>
-                <a href="history.html" class="global-nav-link">最近の変更</a>
-                <a href="corrections.html" class="global-nav-link">おことわり</a>
-                <a href="archive.html" class="global-nav-link active">アーカイブ</a>
-            </div>
-        </div>
-    </nav>
-
-    <div class="container">
-        <header>
-            <h1>🗂️ NHK記事アーカイブ</h1>
-            <p class="subtitle">取得した全ての記事を表示</p>
-            <div class="stats">
-                <div class="stat-item">
-                    <div class="stat-number">{len(articles)}</div>
-                    <div class="stat-label">総記事数</div>
-                </div>
-"""
-
-    # ソース別統計
-    for stat in stats:
-        source_name = stat[0]
-        count = stat[1]
-        html += f"""
-                <div class="stat-item">
-                    <div class="stat-number">{count}</div>
-                    <div class="stat-label">{source_name.replace('NHK', '')}</div>
-                </div>
-"""
-
-    html += """
-            </div>
-        </header>
-
-        <div class="filter-bar">
-            <div class="filter-section">
-                <label class="filter-label">🔍 検索</label>
-                <input type="text" id="searchBox" class="search-box" placeholder="タイトルや説明文で検索...">
-            </div>
-
-            <div class="filter-section">
-                <label class="filter-label">📰 ニュースソース</label>
-                <div class="filter-buttons">
-                    <button class="filter-btn source-filter active" data-source="all">すべて</button>
-"""
-
-    for source in all_sources:
-        html += f'                    <button class="filter-btn source-filter" data-source="{source}">{source.replace("NHK", "")}</button>\n'
-
-    html += """
-                </div>
-            </div>
-
-            <div class="filter-section">
-                <label class="filter-label">🏷️ フィルター</label>
-                <div class="filter-buttons">
-                    <button class="filter-btn type-filter active" data-type="all">すべて</button>
-                    <button class="filter-btn type-filter" data-type="changed">変更あり</button>
-                    <button class="filter-btn type-filter" data-type="correction">訂正関連</button>
-                </div>
-            </div>
-        </div>
-
-        <div class="results-info">
-            表示中: <span id="resultCount">0</span>件
-        </div>
-
-        <div id="articlesContainer">
-"""
+def generate_html(articles, stats, output_path, shown=None, shard=None, navigation='', api_index=None,
+                  search_index=None):
+    """
+    HTMLファイルを生成
 
-    if not articles:
-        html += """
-            <div class="no-results">
-                まだ記事が記録されていません。<br>
-                システムが1時間ごとに自動でチェックしています。
-            </div>
-"""
+    shown: 記事カードを表示する記事（省略時はarticlesの全件）
+    shard: 月別ページの場合はそのシャード（タイトル・リンクの基準ディレクトリに使う）
+    navigation: 統計の下と末尾に表示するページ送り・月別一覧
+    api_index: 指定すると記事を埋め込まず、データAPIから選択中の月・ソースのシャードだけを読み込むページにする
+    search_index: 検索インデックス（search_index.py）のURL。2文字以上の検索は全期間をインデックスで検索する
+    """
+    root = '../' if shard else ''
+    page_title = shard_title(shard) if shard else '全記事'
+    shown = [] if api_index else articles if shown is None else shown
+    if shard:
+        subtitle = f'{shard_title(shard)}に初めて取得した記事を表示'
+    elif api_index:
+        subtitle = '取得した全ての記事を初回確認の月ごとに表示'
+    elif len(shown) < len(articles):
+        subtitle = f'最近確認した{len(shown)}件の記事を表示（それ以前の記事は月別一覧から）'
     else:
-        for article in articles:
-            first_seen = datetime.fromisoformat(article['first_seen'])
-            last_seen = datetime.fromisoformat(article['last_seen'])
-
-            first_seen_str = first_seen.strftime('%Y年%m月%d日 %H:%M')
-            last_seen_str = last_seen.strftime('%Y年%m月%d日 %H:%M')
-
-            full_url = get_full_url(article['source'], article['link'])
-
-            # データ属性
-            data_attrs = f'data-source="{article["source"]}"'
-            data_attrs += f' data-changed="{1 if article["change_count"] > 0 else 0}"'
-            data_attrs += f' data-correction="{1 if article["has_correction"] else 0}"'
-            data_attrs += f' data-search="{article["title"]} {article["description"] or ""}"'
-
-            html += f"""
-            <div class="article-card" {data_attrs}>
-                <div class="article-header">
-                    <span class="article-source">{article['source']}</span>
-                    <div class="article-meta">
-                        <div>初回確認: {first_seen_str}</div>
-                        <div>最終確認: {last_seen_str}</div>
-                    </div>
-                </div>
-
-                <div class="article-title">{article['title']}</div>
-                <a href="{full_url}" class="article-link" target="_blank">→ 元記事を読む（NHK）</a>
-"""
-
-            # 訂正がある場合は差分表示（descriptionに※または失礼しましたが実際に含まれる場合のみ）
-            if article['has_correction'] and article['description'] and ('※' in article['description'] or '失礼しました' in article['description']):
-                html += f'                <div class="article-badges"><span class="badge badge-correction">🔴 おことわり: {article["correction_keywords"]}</span></div>\n'
-
-                # 記事のdescriptionから訂正部分を抽出
-                # 訂正部分を含む要約を抽出
-                correction_summary = extract_correction_summary(article['description'], 150)
-                highlighted_correction = highlight_correction_notice(correction_summary)
-
-                html += f"""                <div class="change-diff">
-                    <div class="diff-new">【引用】訂正部分:\n{highlighted_correction}</div>
-                    <div style="margin-top: 10px; text-align: right;">
-                        <a href="{full_url}" target="_blank" style="color: #667eea; text-decoration: none; font-weight: bold;">→ 元記事を読む（NHK）</a>
-                    </div>
-                </div>
-"""
-            else:
-                # 訂正がない場合は通常の引用表示
-                html += f"""                <div class="article-description" style="color: #718096; font-style: italic; font-size: 0.95em;">
-                    <strong>【引用】</strong> {(article['description'] or '')[:150]}{'...' if article['description'] and len(article['description']) > 150 else ''}
-                </div>
-
-                <div class="article-badges">
-"""
-
-                if article['change_count'] > 0:
-                    html += f'                    <span class="badge badge-changed">変更 {article["change_count"]}回</span>\n'
-
-                html += """
-                </div>
-"""
-
-            html += """
-            </div>
-"""
-
-    html += """
-        </div>
-    </div>
-
-    <script>
-        const searchBox = document.getElementById('searchBox');
-        const sourceFilters = document.querySelectorAll('.source-filter');
-        const typeFilters = document.querySelectorAll('.type-filter');
-        const articles = document.querySelectorAll('.article-card');
-        const resultCount = document.getElementById('resultCount');
-
-        let currentSource = 'all';
-        let currentType = 'all';
-        let currentSearch = '';
-
-        function filterArticles() {
-            let visibleCount = 0;
-
-            articles.forEach(article => {
-                const articleSource = article.getAttribute('data-source');
-                const hasChanged = article.getAttribute('data-changed') === '1';
-                const hasCorrection = article.getAttribute('data-correction') === '1';
-                const searchText = article.getAttribute('data-search').toLowerCase();
-
-                // ソースフィルター
-                const sourceMatch = currentSource === 'all' || articleSource === currentSource;
-
-                // タイプフィルター
-                let typeMatch = true;
-                if (currentType === 'changed') {
-                    typeMatch = hasChanged;
-                } else if (currentType === 'correction') {
-                    typeMatch = hasCorrection;
-                }
-
-                // 検索フィルター
-                const searchMatch = currentSearch === '' || searchText.includes(currentSearch);
-
-                // すべての条件を満たす場合のみ表示
-                if (sourceMatch && typeMatch && searchMatch) {
-                    article.style.display = 'block';
-                    visibleCount++;
-                } else {
-                    article.style.display = 'none';
-                }
-            });
-
-            resultCount.textContent = visibleCount;
-        }
-
-        // 検索ボックス
-        searchBox.addEventListener('input', (e) => {
-            currentSearch = e.target.value.toLowerCase();
-            filterArticles();
-        });
-
-        // ソースフィルター
-        sourceFilters.forEach(btn => {
-            btn.addEventListener('click', () => {
-                sourceFilters.forEach(b => b.classList.remove('active'));
-                btn.classList.add('active');
-                currentSource = btn.getAttribute('data-source');
-                filterArticles();
-            });
-        });
-
-        // タイプフィルター
-        typeFilters.forEach(btn => {
-            btn.addEventListener('click', () => {
-                typeFilters.forEach(b => b.classList.remove('active'));
-                btn.classList.add('active');
-                currentType = btn.getAttribute('data-type');
-                filterArticles();
-            });
-        });
-
-        // 初期表示
-        filterArticles();
-    </script>
-
-    <!-- NHKアクセストラッキング -->
-    <script>
-    (function() {
-        try {
-            var path = window.location.pathname + window.location.search;
-            fetch('/.netlify/functions/track-access?path=' + encodeURIComponent(path), {
-                method: 'GET',
-                headers: {
-                    'Content-Type': 'application/json'
-                }
-            }).catch(function(err) {
-                console.log('Tracking skipped:', err);
-            });
-        } catch(e) {
-            console.log('Tracking error:', e);
-        }
-    })();
-    </script>
-</body>
-</html>
-"""
+        subtitle = '取得した全ての記事を表示'
+
+    render_page('archive.html', output_path,
+                root=root,
+                page_title=page_title,
+                page_path=shard.path if shard else 'archive.html',
+                subtitle=subtitle,
+                stats=[(len(articles), '総記事数')] + [(stat[1], stat[0].replace('NHK', '')) for stat in stats],
+                all_sources=sorted(SOURCE_BASE_URLS.keys()),
+                shown=shown,
+                cards=(article_card(article) for article in shown),
+                shard=shard,
+                navigation=navigation,
+                api_index=api_index,
+                search_index=search_index)
+
+    if shard is None:
+        print(f"✅ アーカイブHTMLを生成しました: {output_path}")
+        print(f"📊 総記事数: {len(articles)}件")
+
+def count_by_source(articles):
+    """ソース別の (ソース, 記事数)（ソース順）"""
+    counts = {}
+    for article in articles:
+        counts[article['source']] = counts.get(article['source'], 0) + 1
+    return sorted(counts.items())
+
+def render_source_breakdown(articles, href):
+    """月別一覧のソース別件数（その月のページをソースで絞り込んで開くリンク）"""
+    links = ' '.join(
+        f'<a class="month-page" href="{href}#source={quote(source)}">{source.replace("NHK", "")} {count}</a>'
+        for source, count in count_by_source(articles)
+    )
+    return f'<span class="month-breakdown">{links}</span>'
+
+def correction_summary_html(article):
+    """カードに表示する訂正部分（descriptionに※または失礼しましたが実際に含まれる場合のみ。ハイライト済みのHTML）"""
+    if article['has_correction'] and get_engine().has_marker(article['description']):
+        return highlight_correction_notice(extract_correction_summary(article['description'], 150))
+    return None
+
+def article_card(article):
+    """記事カード（templates/partials/cards.html の article_card）の表示用の値"""
+    return {
+        'article': article,
+        'url': get_full_url(article['source'], article['link']),
+        'correction': correction_summary_html(article),
+    }
+
+def article_records(articles):
+    """記事のシャード（data_api）のレコード（訂正部分の要約はカードと同じ条件で抽出済みのHTML）"""
+    records = []
+    for article in articles:
+        records.append({
+            'id': article['id'],
+            'source': article['source'],
+            'title': article['title'],
+            'description': article['description'],
+            'url': get_full_url(article['source'], article['link']),
+            'first_seen': article['first_seen'],
+            'last_seen': article['last_seen'],
+            'change_count': article['change_count'],
+            'correction': 1 if article['has_correction'] else 0,
+            'keywords': article['correction_keywords'],
+            'summary': correction_summary_html(article),
+        })
+    return records
+
+def generate_pages(articles, stats, reports_dir, page_size=PAGE_SIZE, is_fresh=None):
+    """
+    archive.html（月別一覧＋データAPIから読み込む記事）と月別ページ、データAPIのソース・月ごとのシャードを生成
 
-    # HTMLファイルを書き込み
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
+    月別ページは記事の初回確認の月で分ける（初回確認日時は変わらないので記事のページは固定）。
 
-    print(f"✅ アーカイブHTMLを生成しました: {output_path}")
-    print(f"📊 総記事数: {len(articles)}件")
+    Args:
+        articles: 全記事（最終確認の新しい順）
+        stats: ソース別統計
+        reports_dir: 出力先（reports/）
+        is_fresh: (相対パス, 入力) → 生成済みで入力が同じならTrue（build_site.pyのマニフェスト）。
+                  Trueのページは生成しない
 
-def main():
-    """メイン処理"""
-    db_path = PROJECT_ROOT / 'data' / 'articles.db'
-    output_path = PROJECT_ROOT / 'reports' / 'archive.html'
+    Returns:
+        生成した月別ページの [(相対パス, 入力)]
+    """
+    reports_dir = Path(reports_dir)
+    shards = plan_shards(articles, SHARD_DIR, lambda a: month_of(a['first_seen']), lambda a: a['id'], page_size)
+
+    (reports_dir / SHARD_DIR).mkdir(parents=True, exist_ok=True)
+    written = []
+    for index, shard in enumerate(shards):
+        inputs = {'rows': shard_digest(shard.items), 'pager': render_pager(shards, index, 'archive.html')}
+        if is_fresh is not None and is_fresh(shard.path, inputs):
+            continue
+        generate_html(shard.items, count_by_source(shard.items), reports_dir / shard.path,
+                      shard=shard, navigation=inputs['pager'])
+        written.append((shard.path, inputs))
+    removed = remove_stale_shards(reports_dir, SHARD_DIR, shards)
+
+    # データAPIのシャード（ソース・初回確認の月ごと）。内容が前回と同じシャードは書き出さない
+    api = ShardWriter(reports_dir, 'articles', code_version(get_engine().fingerprint, files=[__file__]))
+    groups = group_rows(articles, lambda a: (a['source'], month_of(a['first_seen'])))
+    for (source, month), rows in sorted(groups.items(), key=lambda item: (item[0][1], item[0][0]), reverse=True):
+        key = f"{source_slug(source, SOURCE_BASE_URLS.get(source, ''))}/{month}"
+        api.add(key, rows, article_records, source=source, month=month)
+    api_index = api.finish()
+    search_index = write_search_index(reports_dir, articles, article_records)
+
+    navigation = render_month_index(shards, breakdown=render_source_breakdown) if shards else ''
+    generate_html(articles, stats, reports_dir / 'archive.html', navigation=navigation, api_index=api_index,
+                  search_index=search_index)
+    print(f"📅 月別ページ: {len(shards)}ページ中{len(written)}ページを生成"
+          + (f"、{len(removed)}ページを削除" if removed else ''))
+    return written
+
+def main(db_path=None):
+    """メイン処理（db_pathにスナップショットを渡すと、その時点のデータから生成）"""
+    db_path = Path(db_path) if db_path else PROJECT_ROOT / 'data' / 'articles.db'
+    reports_dir = PROJECT_ROOT / 'reports'
+    output_path = reports_dir / 'archive.html'
 
     print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
     print("NHK記事アーカイブビューアー")
@@ -837,15 +345,19 @@ def main():
 
     # HTMLを生成
     print("🎨 HTMLアーカイブを生成中...")
-    generate_html(articles, stats, output_path)
+    generate_pages(articles, stats, reports_dir)
 
     print()
     print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
     print(f"✅ 完了: {output_path}")
     print()
-    print("次のコマンドで開きます:")
-    print(f"  open {output_path}")
+    print("データAPIを読み込むため、HTTPで配信して開きます（file:// では表示されません）:")
+    print(f"  python3 -m http.server -d {output_path.parent}")
+    print(f"  open http://localhost:8000/{output_path.name}")
     print("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
 
 if __name__ == '__main__':
-    main()
+    import argparse
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--db', type=str, help='読み込むDB（スナップショット）のパス')
+    main(arg_parser.parse_args().db)
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import anthropic
 
+from site_templates import render_page
+
 # Claude API設定
 ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY')
 if not ANTHROPIC_API_KEY:
@@ -25,28 +27,24 @@ def get_weekly_corrections(db_path: str, days: int = 7) -> list:
     # N日前の日時を計算
     cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
 
-    # 訂正記事を取得（変更履歴と記事情報を結合）
+    # 期間内に現れた訂正を取得（訂正イベントと、訂正が現れた変更・記事情報を結合）
+    # 初回取得時から訂正があった記事は変更行がないため、変更種別は'new'とする
     cursor.execute('''
         SELECT
-            c.source,
-            COALESCE(a.link, c.link) as link,
+            a.source,
+            a.link,
             a.title,
-            c.change_type,
+            COALESCE(c.change_type, 'new'),
             c.old_value,
             c.new_value,
-            c.detected_at,
-            c.correction_keywords,
+            e.detected_at,
+            e.keywords,
             a.description
-        FROM changes c
-        LEFT JOIN articles a ON c.link = a.link AND c.source = a.source
-        WHERE (c.has_correction = 1 OR c.correction_keywords IS NOT NULL)
-          AND (
-            (c.correction_keywords LIKE '%当初%' AND c.correction_keywords LIKE '%掲載%')
-            OR
-            c.correction_keywords LIKE '%失礼しました%'
-          )
-          AND c.detected_at >= ?
-        ORDER BY c.detected_at DESC
+        FROM correction_events e
+        JOIN articles a ON a.id = e.article_id
+        LEFT JOIN changes c ON c.id = e.change_id
+        WHERE e.detected_at >= ?
+        ORDER BY e.detected_at DESC
     ''', (cutoff_date,))
 
     corrections = []
@@ -377,156 +375,15 @@ def main():
     # HTMLから余計なマークダウン記法を削除
     report_html = report_html.replace('```html', '').replace('```', '').strip()
 
-    # 完全なHTMLページを生成
+    # レポート保存（完全なHTMLページは templates/weekly_analysis.html）
     timestamp = datetime.now().strftime('%Y%m%d')
 
-    full_html = f"""<!DOCTYPE html>
-<html lang="ja">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>今週の誤情報レポート（{end_date}）</title>
-    <link rel="icon" type="image/x-icon" href="../favicon.ico">
-
-    <!-- OGP -->
-    <meta property="og:title" content="今週の誤情報レポート | NHK記事追跡システム" />
-    <meta property="og:description" content="直近1週間の訂正記事を分析。誤りの内容と深刻度を厳しく論評します。" />
-    <meta property="og:image" content="https://nhk-news-tracker.netlify.app/ogp-image.png" />
-
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Hiragino Sans', sans-serif;
-            line-height: 1.8;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            padding: 20px;
-            color: #333;
-        }}
-        .container {{
-            max-width: 900px;
-            margin: 0 auto;
-            background: white;
-            padding: 40px;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-        }}
-        h1 {{
-            color: #d32f2f;
-            border-bottom: 3px solid #d32f2f;
-            padding-bottom: 15px;
-            margin-bottom: 30px;
-            font-size: 2em;
-        }}
-        h2 {{
-            color: #1976d2;
-            margin-top: 40px;
-            margin-bottom: 20px;
-            font-size: 1.5em;
-            border-left: 5px solid #1976d2;
-            padding-left: 15px;
-        }}
-        h3 {{
-            color: #424242;
-            margin-top: 30px;
-            margin-bottom: 15px;
-            font-size: 1.3em;
-            background: #f5f5f5;
-            padding: 10px 15px;
-            border-radius: 5px;
-        }}
-        h4 {{
-            color: #616161;
-            margin-top: 20px;
-            margin-bottom: 10px;
-            font-size: 1.1em;
-        }}
-        p {{
-            margin-bottom: 15px;
-            color: #424242;
-        }}
-        ul, ol {{
-            margin-left: 25px;
-            margin-bottom: 15px;
-        }}
-        li {{
-            margin-bottom: 8px;
-        }}
-        a {{
-            color: #1976d2;
-            text-decoration: none;
-        }}
-        a:hover {{
-            text-decoration: underline;
-        }}
-        hr {{
-            border: none;
-            border-top: 2px solid #e0e0e0;
-            margin: 30px 0;
-        }}
-        strong {{
-            color: #d32f2f;
-            font-weight: bold;
-        }}
-        .abstract {{
-            background: #fff3e0;
-            padding: 20px;
-            border-left: 5px solid #ff9800;
-            margin: 20px 0;
-            border-radius: 5px;
-        }}
-        .correction-item {{
-            background: #fafafa;
-            padding: 20px;
-            margin: 20px 0;
-            border-radius: 8px;
-            border-left: 4px solid #d32f2f;
-        }}
-        .problems, .recommendations {{
-            background: #e3f2fd;
-            padding: 20px;
-            margin: 20px 0;
-            border-radius: 5px;
-        }}
-        .back-link {{
-            display: inline-block;
-            margin-top: 40px;
-            padding: 12px 30px;
-            background: #1976d2;
-            color: white !important;
-            border-radius: 8px;
-            text-decoration: none;
-            font-weight: bold;
-            transition: background 0.2s;
-        }}
-        .back-link:hover {{
-            background: #1565c0;
-            text-decoration: none;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-{report_html}
-        <p style="text-align: center; margin-top: 50px;">
-            <a href="../index.html" class="back-link">← ポータルに戻る</a>
-        </p>
-    </div>
-</body>
-</html>
-"""
-
-    # レポート保存
     output_dir = Path('reports/weekly')
     output_dir.mkdir(parents=True, exist_ok=True)
 
     html_output_path = output_dir / f'weekly_report_{timestamp}.html'
 
-    with open(html_output_path, 'w', encoding='utf-8') as f:
-        f.write(full_html)
+    render_page('weekly_analysis.html', html_output_path, root='../', end_date=end_date, report_html=report_html)
 
     print(f"\n✅ HTMLレポートを保存しました: {html_output_path}")
     print(f"📂 ファイルサイズ: {html_output_path.stat().st_size:,} bytes")
@@ -126,9 +126,17 @@ def main():
     print("データエクスポート中...")
     print(f"{'─'*60}")
 
-    export_path = f"data/export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    storage.export_to_json(export_path)
-    print(f"✅ JSONエクスポート: {Path(export_path).absolute()}")
+    export_config = config.get('export', {})
+    export_dir = export_config.get('dir', 'data/exports')
+    if export_config.get('mode', 'incremental') == 'full':
+        export_path = f"data/export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        storage.export_to_json(export_path)
+        print(f"✅ JSONエクスポート: {Path(export_path).absolute()}")
+    else:
+        export_stats = storage.export_incremental(export_dir)
+        print(f"✅ 増分エクスポート: {export_stats['path'].absolute()}"
+              f"（記事{export_stats['articles']}件, 変更{export_stats['changes']}件）")
+    ArticleStorage.cleanup_exports(export_dir, retention_days=export_config.get('retention_days', 30))
 
     print(f"\n{'='*60}")
     print(f"実行完了: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
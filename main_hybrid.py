@@ -15,6 +15,11 @@ load_dotenv()
 from scraper_hybrid import NhkRssScraperHybrid
 from parser import NhkXmlParser
 from storage import ArticleStorage
+from storage_writer import StorageWriter
+from cold_storage import ColdStorage
+from snapshot import create_snapshot
+from build_site import NOOP_EXIT_CODE, build_site, is_noop, is_noop_build, print_timings
+from correction_rules import get_engine
 from visualizer import ChangeVisualizer
 from gemini_analyzer import GeminiAnalyzer
 from notifier import MacNotifier
@@ -78,52 +83,71 @@ def main():
     print(f"一括取得開始: {len(sources_dict)}ソース")
     print(f"{'─'*60}\n")
 
+    # 保存は書き込みスレッドへ渡し、次のソースの取得・解析と並行させる
+    writer = StorageWriter(storage, max_pending=config['database'].get('writer_queue_size', 4))
+    pending = {}  # {name: Future}
+
+    def handle_content(name, xml_content):
+        """取得完了したソースを解析し、書き込みキューへ投入"""
+        if xml_content is None:
+            return
+
+        articles = parser.parse(xml_content)
+        if not articles:
+            return
+
+        print(f"✅ 記事取得: {name} {len(articles)}件")
+        pending[name] = writer.submit(name, articles)
+
     # 一括取得（requests + Selenium自動切り替え）
-    contents = scraper.fetch_batch(sources_dict)
+    contents = scraper.fetch_batch(sources_dict, on_result=handle_content)
 
-    # NHK ONE検索（東北ニュース取得後に実行）
+    # NHK ONE検索（東北ニュース取得後に実行）- 取得済みソースの保存と並行
     print(f"\n{'─'*60}")
     print("NHK ONE検索: 訂正記事を検索中...")
     print(f"{'─'*60}")
     nhk_one_articles = []
     try:
-        nhk_one_articles = scraper.search_nhk_one(query="失礼しました")
+        nhk_one_articles = scraper.search_nhk_one(query=get_engine().apology_marker)
         if nhk_one_articles:
             print(f"✅ NHK ONE検索: {len(nhk_one_articles)}件の訂正記事を発見")
+            pending['NHK ONE検索'] = writer.submit('NHK ONE検索', nhk_one_articles)
         else:
             print(f"ℹ️  NHK ONE検索: 訂正記事は見つかりませんでした")
     except Exception as e:
         logger.error(f"NHK ONE検索エラー: {e}")
         print(f"⚠️ NHK ONE検索エラー: {e}")
 
-    # 各ソースを処理
-    for source_config in config['sources']:
-        if not source_config.get('enabled', True):
-            continue
+    # 全バッチの保存完了を待つ
+    writer.flush()
+    writer.close()
 
-        name = source_config['name']
-        xml_content = contents.get(name)
+    # 各ソースの結果を集計
+    result_names = [source_config['name'] for source_config in config['sources']
+                    if source_config.get('enabled', True)]
+    if 'NHK ONE検索' in pending:
+        result_names.append('NHK ONE検索')
 
+    for name in result_names:
         print(f"\n{'─'*60}")
-        print(f"処理中: {name}")
+        print(f"処理結果: {name}")
         print(f"{'─'*60}")
 
-        if xml_content is None:
-            print(f"❌ 取得失敗: {name}")
-            failed_sources.append(name)
+        if name not in pending:
+            if contents.get(name) is None:
+                print(f"❌ 取得失敗: {name}")
+                failed_sources.append(name)
+            else:
+                print(f"❌ 解析失敗: {name}")
             continue
 
-        # 解析
-        articles = parser.parse(xml_content)
-        if not articles:
-            print(f"❌ 解析失敗: {name}")
+        try:
+            stats = pending[name].result()
+        except Exception as e:
+            print(f"❌ 保存失敗: {name} - {e}")
+            failed_sources.append(name)
             continue
 
-        print(f"✅ 記事取得: {len(articles)}件")
-
-        # 保存と変更検出
-        stats = storage.save_articles(name, articles)
-
         print(f"📊 結果:")
         print(f"  - 新規: {stats['new']}件")
         print(f"  - 更新: {stats['updated']}件")
@@ -142,30 +166,10 @@ def main():
         for key in ['new', 'updated', 'unchanged']:
             total_stats[key] += stats[key]
 
-    # NHK ONE検索の記事をデータベースに保存
-    if nhk_one_articles:
-        print(f"\n{'─'*60}")
-        print("NHK ONE検索結果をデータベースに保存中...")
-        print(f"{'─'*60}")
-        nhk_one_stats = storage.save_articles('NHK ONE検索', nhk_one_articles)
-
-        print(f"📊 NHK ONE検索結果:")
-        print(f"  - 新規: {nhk_one_stats['new']}件")
-        print(f"  - 更新: {nhk_one_stats['updated']}件")
-        print(f"  - 変更なし: {nhk_one_stats['unchanged']}件")
-
-        # 訂正の追加・削除を収集
-        for title, keywords in nhk_one_stats.get('correction_added', []):
-            all_correction_added.append(('NHK ONE検索', title, keywords))
-            print(f"  🔴 訂正追加: {title} [キーワード: {keywords}]")
-
-        for title, keywords in nhk_one_stats.get('correction_removed', []):
-            all_correction_removed.append(('NHK ONE検索', title, keywords))
-            print(f"  ⚠️  訂正削除: {title} [以前のキーワード: {keywords}]")
-
-        # 統計集計
-        for key in ['new', 'updated', 'unchanged']:
-            total_stats[key] += nhk_one_stats[key]
+    writer_summary = writer.summary()
+    logger.info(f"書き込みスレッド: {writer_summary['batches']}バッチ, {writer_summary['articles']}件, "
+                f"保存合計{writer_summary['total_sec']:.2f}秒, 最大{writer_summary['max_sec']:.2f}秒, "
+                f"最大待機{writer_summary['max_wait_sec']:.2f}秒")
 
     # 全体サマリー
     print(f"\n{'='*60}")
@@ -179,72 +183,101 @@ def main():
     if all_correction_removed:
         print(f"⚠️  訂正削除: {len(all_correction_removed)}件")
 
+    # コールドストレージ退避（古い記事を月別アーカイブDBへ移動）
+    cold_config = config.get('cold_storage', {})
+    if cold_config.get('enabled', False):
+        print(f"\n{'─'*60}")
+        print("コールドストレージ退避中...")
+        print(f"{'─'*60}")
+        try:
+            cold_stats = ColdStorage(
+                config['database']['path'],
+                horizon_days=cold_config.get('horizon_days', 30)
+            ).archive_old_articles()
+            print(f"✅ 退避: 記事{cold_stats['articles']}件, 変更{cold_stats['changes']}件")
+        except Exception as e:
+            print(f"⚠️ コールドストレージ退避エラー: {e}")
+            logger.warning(f"コールドストレージ退避失敗: {e}")
+
+    # 前回のサイト生成から新着記事・変更がなければ、変更レポート・スナップショット作成・サイト生成を省略（デプロイも不要）
+    # 変更レポート（changes_<日時>.html）は無変更の判定の入力なので、判定より前に書き出さない
+    site_unchanged = False
+    try:
+        site_unchanged = is_noop(config['database']['path'])
+    except Exception as e:
+        logger.warning(f"無変更判定失敗（サイトを生成します）: {e}")
+
     # HTMLレポート生成
     print(f"\n{'─'*60}")
     print("HTMLレポート生成中...")
     print(f"{'─'*60}")
 
     hours = config['report'].get('hours', 24)
-    changes = storage.get_recent_changes(hours=hours)
+    if site_unchanged:
+        print("ℹ️  前回の生成から新着記事・変更がないため、変更レポートを省略")
+    else:
+        changes = storage.get_recent_changes(hours=hours)
 
-    if changes:
-        output_dir = Path(config['report']['output_dir'])
-        output_dir.mkdir(parents=True, exist_ok=True)
+        if changes:
+            output_dir = Path(config['report']['output_dir'])
+            output_dir.mkdir(parents=True, exist_ok=True)
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_path = output_dir / f'changes_{timestamp}.html'
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            output_path = output_dir / f'changes_{timestamp}.html'
 
-        visualizer.generate_html_report(changes, str(output_path), hours=hours)
+            visualizer.generate_html_report(changes, str(output_path), hours=hours)
 
-        print(f"✅ HTMLレポート: {output_path.absolute()}")
-        print(f"📊 変更件数: {len(changes)}件（過去{hours}時間）")
-    else:
-        print(f"ℹ️  過去{hours}時間に変更はありませんでした")
+            print(f"✅ HTMLレポート: {output_path.absolute()}")
+            print(f"📊 変更件数: {len(changes)}件（過去{hours}時間）")
+        else:
+            print(f"ℹ️  過去{hours}時間に変更はありませんでした")
 
     # JSONエクスポート
     print(f"\n{'─'*60}")
     print("データエクスポート中...")
     print(f"{'─'*60}")
 
-    export_path = f"data/export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    storage.export_to_json(export_path)
-    print(f"✅ JSONエクスポート: {Path(export_path).absolute()}")
-
-    # 全変更履歴ビューアー生成
-    print(f"\n{'─'*60}")
-    print("全変更履歴ビューアー生成中...")
-    print(f"{'─'*60}")
-
-    try:
-        import generate_history
-        generate_history.main()
-    except Exception as e:
-        print(f"⚠️ 履歴ビューアー生成エラー: {e}")
-        logger.warning(f"履歴ビューアー生成失敗: {e}")
-
-    # 記事アーカイブビューアー生成
-    print(f"\n{'─'*60}")
-    print("記事アーカイブビューアー生成中...")
-    print(f"{'─'*60}")
+    export_config = config.get('export', {})
+    export_dir = export_config.get('dir', 'data/exports')
+    if export_config.get('mode', 'incremental') == 'full':
+        export_path = f"data/export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        storage.export_to_json(export_path)
+        print(f"✅ JSONエクスポート: {Path(export_path).absolute()}")
+    else:
+        export_stats = storage.export_incremental(export_dir)
+        print(f"✅ 増分エクスポート: {export_stats['path'].absolute()}"
+              f"（記事{export_stats['articles']}件, 変更{export_stats['changes']}件）")
+    ArticleStorage.cleanup_exports(export_dir, retention_days=export_config.get('retention_days', 30))
 
-    try:
-        import generate_archive
-        generate_archive.main()
-    except Exception as e:
-        print(f"⚠️ アーカイブビューアー生成エラー: {e}")
-        logger.warning(f"アーカイブビューアー生成失敗: {e}")
+    if site_unchanged:
+        print("\n⏭️  前回の生成から新着記事・変更がないため、サイト生成を省略")
+    else:
+        # サイト生成用スナップショット（生成中も次の取得がDBへ書き込めるように）
+        snapshot_path = None
+        try:
+            snapshot_path = create_snapshot(config['database']['path'])
+            print(f"\n📸 スナップショット: {snapshot_path}")
+        except Exception as e:
+            print(f"⚠️ スナップショット作成エラー（ライブDBから生成します）: {e}")
+            logger.warning(f"スナップショット作成失敗: {e}")
+
+        # サイト生成（変更履歴・アーカイブ・おことわり・ポータルを1プロセスで生成、データの読み込みは1回）
+        print(f"\n{'─'*60}")
+        print("サイト生成中...")
+        print(f"{'─'*60}")
 
-    # ポータルページ生成
-    print(f"\n{'─'*60}")
-    print("ポータルページ生成中...")
-    print(f"{'─'*60}")
+        try:
+            results = build_site(snapshot_path or config['database']['path'])
+            print_timings(results)
+            site_unchanged = is_noop_build(results)
+            # ページはデータAPIを fetch() で読み込むため、file:// では表示されない
+            print("🌐 確認: python3 -m http.server -d reports → http://localhost:8000/")
+        except Exception as e:
+            print(f"⚠️ サイト生成エラー: {e}")
+            logger.warning(f"サイト生成失敗: {e}")
 
-    try:
-        import generate_portal
-        generate_portal.generate_portal_html()
-    except Exception as e:
-        print(f"⚠️ ポータルページ生成エラー: {e}")
-        logger.warning(f"ポータルページ生成失敗: {e}")
+        if snapshot_path:
+            snapshot_path.unlink(missing_ok=True)
 
     # 訂正の追加・削除を通知
     for source, title, keywords in all_correction_added:
@@ -266,5 +299,8 @@ def main():
     print(f"実行完了: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*60}")
 
+    # サイトに変更がなければ run_and_deploy.sh がデプロイを省略できるよう、専用の終了コードを返す
+    return NOOP_EXIT_CODE if site_unchanged else 0
+
 if __name__ == '__main__':
-    main()
+    raise SystemExit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+HTMLページの逐次書き出し
+
+生成スクリプトはページ全体を1つの文字列に連結せず、ヘッダー・カード・フッターの順に
+PageWriter へ書き込む。書き込んだ内容はバッファ付きで一時ファイルへ流し、
+最後まで書けたら出力ファイルと置き換える（途中で失敗した場合は前回の出力が残る）。
+"""
+import os
+from pathlib import Path
+from typing import Iterable
+
+# 書き込みバッファのサイズ
+DEFAULT_BUFFER_SIZE = 256 * 1024
+
+
+class PageWriter:
+    """出力ファイルへHTMLを順に書き出す（ページ全体をメモリに持たない）"""
+
+    def __init__(self, path, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tmp_path = self.path.with_name(f'.{self.path.name}.tmp')
+        self.chars = 0
+        self._file = open(self.tmp_path, 'w', encoding='utf-8', buffering=buffer_size)
+
+    def write(self, text: str):
+        """HTML断片を書き込む"""
+        self._file.write(text)
+        self.chars += len(text)
+
+    def write_all(self, chunks: Iterable[str]):
+        """HTML断片を順に書き込む（カードの一覧・テンプレートのストリームなど）"""
+        for chunk in chunks:
+            self.write(chunk)
+
+    def close(self):
+        """書き込みを終えて出力ファイルと置き換える"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """書きかけの一時ファイルを削除（出力ファイルは変更しない）"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
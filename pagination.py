@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+変更履歴・アーカイブのページ分割
+
+全件を1つのHTMLに出力せず、月ごと・1ページの件数上限ごとのページ（シャード）に分ける。
+URLは月とページ番号で決まる（例: history/2025-08.html, history/2025-08-2.html）。
+月内のページには古い順（ID順）に詰めるので、新しい項目が増えても過去のページの内容は動かない。
+各ページの内容のハッシュ（shard_digest）をビルドマニフェストに記録し、
+その月・ページの項目が変わった時だけ生成し直す（build_site.py）。
+ページ送り・月別一覧は templates/partials/pager.html で描画する（スタイルは templates/assets/pager.css）。
+"""
+import json
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from site_templates import get_macro
+
+# 1ページの最大件数
+DEFAULT_PAGE_SIZE = 500
+
+# 日時が記録されていない項目の月
+UNKNOWN_MONTH = 'unknown'
+
+
+class Shard(NamedTuple):
+    """1ページ分の項目"""
+    path: str       # reports/ からの相対パス（例: history/2025-08-2.html）
+    month: str      # 'YYYY-MM'
+    page: int       # 月内のページ番号（1から）
+    pages: int      # その月のページ数
+    items: list     # 表示順（元の並び順）
+
+
+def month_of(timestamp: Optional[str]) -> str:
+    """ISO形式の日時の月（'YYYY-MM'）"""
+    return timestamp[:7] if timestamp else UNKNOWN_MONTH
+
+
+def month_label(month: str) -> str:
+    """'2025-08' → '2025年08月'"""
+    if month == UNKNOWN_MONTH:
+        return '日時不明'
+    year, mon = month.split('-')
+    return f"{year}年{mon}月"
+
+
+def shard_path(directory: str, month: str, page: int) -> str:
+    """シャードの相対パス（月の1ページ目は月名のみ）"""
+    name = month if page == 1 else f"{month}-{page}"
+    return f"{directory}/{name}.html"
+
+
+def plan_shards(items: list, directory: str, month_key: Callable, order_key: Callable,
+                page_size: int = DEFAULT_PAGE_SIZE) -> List[Shard]:
+    """
+    項目を月・ページに分割
+
+    Args:
+        items: 表示順に並んだ項目
+        directory: 出力先ディレクトリ（reports/ からの相対）
+        month_key: 項目の月（'YYYY-MM'）
+        order_key: ページへの割り当てに使う、追加順に増える値（ID）
+        page_size: 1ページの最大件数
+
+    Returns:
+        新しい月・新しいページから順のシャード（各ページ内の項目は元の表示順）
+    """
+    by_month: Dict[str, list] = {}
+    for item in items:
+        by_month.setdefault(month_key(item), []).append(item)
+
+    shards = []
+    for month in sorted(by_month, reverse=True):
+        month_items = by_month[month]
+        ordered = sorted(month_items, key=order_key)
+        page_of = {order_key(item): index // page_size + 1 for index, item in enumerate(ordered)}
+        pages = (len(month_items) + page_size - 1) // page_size
+        for page in range(pages, 0, -1):
+            page_items = [item for item in month_items if page_of[order_key(item)] == page]
+            shards.append(Shard(shard_path(directory, month, page), month, page, pages, page_items))
+    return shards
+
+
+def shard_digest(items: list) -> str:
+    """ページの項目（sqlite3.Rowの全カラム）のハッシュ"""
+    payload = json.dumps([tuple(item) for item in items], ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def neighbours(shards: List[Shard], index: int) -> Dict[str, Optional[str]]:
+    """前後のページ（newer: 1つ新しいページ, older: 1つ古いページ）のパス"""
+    return {
+        'newer': shards[index - 1].path if index > 0 else None,
+        'older': shards[index + 1].path if index + 1 < len(shards) else None,
+    }
+
+
+def shard_title(shard: Shard) -> str:
+    """'2025年08月' / '2025年08月（2/3ページ）'"""
+    title = month_label(shard.month)
+    if shard.pages > 1:
+        title += f"（{shard.page}/{shard.pages}ページ）"
+    return title
+
+
+def render_pager(shards: List[Shard], index: int, index_page: str, root: str = '../') -> str:
+    """シャードの前後ページへのナビゲーション"""
+    links = neighbours(shards, index)
+    pager = get_macro('partials/pager.html', 'pager')
+    return pager(links['newer'], links['older'], index_page, shard_title(shards[index]), root)
+
+
+def render_month_index(shards: List[Shard], root: str = '', breakdown: Optional[Callable] = None) -> str:
+    """
+    月別のページ一覧
+
+    Args:
+        shards: plan_shards() の結果
+        root: シャードへのリンクの接頭辞
+        breakdown: 月の項目から内訳のHTMLを作る関数（任意）
+    """
+    by_month: Dict[str, List[Shard]] = {}
+    for shard in shards:
+        by_month.setdefault(shard.month, []).append(shard)
+
+    months = []
+    for month, month_shards in by_month.items():
+        month_shards = sorted(month_shards, key=lambda shard: shard.page)
+        first = month_shards[0]
+        pages = [(shard.page, f"{root}{shard.path}") for shard in month_shards] if len(month_shards) > 1 else []
+        extra = breakdown([item for shard in month_shards for item in shard.items], f"{root}{first.path}") \
+            if breakdown else ''
+        months.append({
+            'label': month_label(month),
+            'href': f"{root}{first.path}",
+            'count': sum(len(shard.items) for shard in month_shards),
+            'pages': pages,
+            'extra': extra,
+        })
+
+    return get_macro('partials/pager.html', 'month_index')(months)
+
+
+def remove_stale_shards(reports_dir: Path, directory: str, shards: List[Shard]) -> List[str]:
+    """現在の分割にないシャードのファイルを削除（ページ数の変更など）"""
+    keep = {shard.path for shard in shards}
+    removed = []
+    for path in sorted((Path(reports_dir) / directory).glob('*.html')):
+        relative = f"{directory}/{path.name}"
+        if relative not in keep:
+            path.unlink()
+            removed.append(relative)
+    return removed
@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+"""
+出力の最小化と事前圧縮（サイト生成の後処理）
+
+reports/ 以下の生成物のうち、HTML・CSS・JavaScript は空白・コメントを取り除いて置き換え（最小化）、
+HTML・CSS・JavaScript・JSON（データAPI）は圧縮済みの版を隣に書き出す。
+
+    reports/history.html        最小化したページ
+    reports/history.html.gz     gzip（最大圧縮。更新時刻を含めないので、内容が同じなら同じバイト列）
+    reports/history.html.br     Brotli（brotli モジュールがあるときだけ。pip install brotli）
+
+最小化は表示を変えない範囲に限る。
+    HTML: タグの間・テキストの連続する空白を1文字にし、コメントを取り除く。
+          <pre>・<textarea> と、CSSで white-space: pre / pre-wrap / pre-line を指定したクラスの要素
+          （差分表示など）の中はそのまま。<script>・<style> の中は JavaScript・CSS として最小化する。
+    CSS:  コメント・不要な空白・ブロック末尾の ; を取り除く（文字列の中はそのまま）。
+    JavaScript: コメント・行頭の字下げ・不要な空白を取り除く。改行は自動セミコロン挿入に
+          影響しうる位置では残す。文字列・テンプレートリテラル・正規表現リテラルの中はそのまま。
+
+git で管理しているファイル（reports/weekly/ の週次レポートなど、コミット済みの成果物）は置き換えず、
+最小化した内容は圧縮版にだけ書き出す（生成のたびに作業ツリーを変更しない）。
+
+ファイルごとに、処理後の内容のハッシュを data/cache/precompress.json に記録し、
+内容が前回の処理後と同じ（生成し直されていない）ファイルは読み込んでハッシュを確かめるだけで省略する。
+元のファイルがなくなった圧縮版は削除する。
+
+使用方法:
+    python3 precompress.py                 # reports/ を処理（変更のあったファイルのみ）
+    python3 precompress.py --force         # 全ファイルを処理し直す
+    python3 precompress.py --no-minify     # 圧縮版の書き出しのみ
+"""
+import os
+import re
+import gzip
+import json
+import time
+import hashlib
+import logging
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+try:
+    import brotli
+except ImportError:
+    # Brotliは任意（なければ .gz のみ書き出す）
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# プロジェクトルート
+PROJECT_ROOT = Path(__file__).parent
+
+REPORTS_DIR = PROJECT_ROOT / 'reports'
+DEFAULT_STATE_PATH = PROJECT_ROOT / 'data' / 'cache' / 'precompress.json'
+
+# 状態の形式・最小化の方法（変えたら上げる。記録を破棄して全ファイルを処理し直す）
+STATE_VERSION = 1
+
+# 処理するファイル（拡張子 → 種類）。JSONはデータAPIの出力（すでに詰めて書き出している）で、圧縮のみ
+FILE_TYPES = {'.html': 'HTML', '.css': 'CSS', '.js': 'JS', '.json': 'JSON'}
+MINIFIERS = ('HTML', 'CSS', 'JS')
+
+GZIP_LEVEL = 9
+# 11（最大）は 9 より数%小さいだけで数十倍遅い（大きな月別ページを生成し直すたびに数十秒かかる）
+BROTLI_QUALITY = 9
+
+# ============================================================
+# CSS
+# ============================================================
+
+_CSS_COMMENT = re.compile(r'/\*.*?\*/|("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')', re.S)
+_CSS_STRING = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+# 前後の空白を取り除いてよい記号（+ ~ - は calc() の中で空白が必要なので含めない。: は後ろだけ）
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*|(:)\s+')
+_CSS_WHITE_SPACE_PRE = re.compile(r'([^{}]+)\{[^{}]*white-space\s*:\s*pre(?:-wrap|-line)?\b[^{}]*\}', re.I)
+
+
+def _strip_css_comments(source: str) -> str:
+    return _CSS_COMMENT.sub(lambda m: m.group(1) or ' ', source)
+
+
+def minify_css(source: str) -> str:
+    """CSSの最小化（コメントと不要な空白を取り除く。文字列はそのまま）"""
+    # 分割すると奇数番目が文字列
+    parts = _CSS_STRING.split(_strip_css_comments(source))
+    for i in range(0, len(parts), 2):
+        code = re.sub(r'\s+', ' ', parts[i])
+        parts[i] = _CSS_PUNCTUATION.sub(lambda m: m.group(1) or m.group(2), code)
+    return ''.join(parts).replace(';}', '}').strip()
+
+
+def white_space_classes(css: str) -> Set[str]:
+    """white-space: pre / pre-wrap / pre-line を指定したクラス（HTMLの最小化で空白を残す要素）"""
+    classes = set()
+    for match in _CSS_WHITE_SPACE_PRE.finditer(_strip_css_comments(css)):
+        classes.update(re.findall(r'\.([A-Za-z_][\w-]*)', match.group(1)))
+    return classes
+
+
+# ============================================================
+# JavaScript
+# ============================================================
+
+_JS_WORD = re.compile(r'[A-Za-z0-9_$\u0080-\uffff]')
+# 直後の / が正規表現リテラルの始まりになるキーワード
+_JS_REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+                      'case', 'do', 'else', 'yield', 'await'}
+# 直後の / が正規表現リテラルの始まりになる記号
+_JS_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+# 改行を取り除いても自動セミコロン挿入に影響しない直前・直後の記号
+_JS_NEWLINE_AFTER = set('{;,([')
+_JS_NEWLINE_BEFORE = set('})]')
+
+
+def _is_word(char: str) -> bool:
+    return bool(char) and bool(_JS_WORD.match(char))
+
+
+def _js_separator(whitespace: str, last: str, next_char: str) -> str:
+    """トークンの間の空白を、意味を変えない最短の区切りにする"""
+    if not whitespace or not last:
+        return ''
+    if '\n' in whitespace:
+        if last in _JS_NEWLINE_AFTER or next_char in _JS_NEWLINE_BEFORE:
+            return ''
+        return '\n'
+    if _is_word(last) and _is_word(next_char):
+        return ' '
+    # 「a - -b」「a + +b」「/ /」「1 .toString()」は詰めると別のトークンになる
+    if (last in '+-' and next_char == last) or (last == '/' and next_char in '/*') or (last.isdigit() and next_char == '.'):
+        return ' '
+    return ''
+
+
+def _skip_quoted(source: str, i: int, quote: str) -> int:
+    """文字列リテラルの終わりの次の位置（i は開始の引用符の位置）"""
+    n = len(source)
+    i += 1
+    while i < n:
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == quote or char == '\n':
+            return i + 1
+        i += 1
+    return n
+
+
+def _skip_regex(source: str, i: int) -> int:
+    """正規表現リテラル（フラグを含む）の終わりの次の位置"""
+    n = len(source)
+    i += 1
+    in_class = False
+    while i < n:
+        char = source[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '\n':
+            return i
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '/':
+            i += 1
+            while i < n and source[i].isalpha():
+                i += 1
+            return i
+        i += 1
+    return n
+
+
+def minify_js(source: str) -> str:
+    """JavaScriptの最小化（コメント・字下げ・不要な空白を取り除く。リテラルの中はそのまま）"""
+    out = []
+    n = len(source)
+    i = 0
+    last = ''          # 最後に出力した文字（空白以外）
+    last_word = ''     # 最後に出力した識別子・キーワード
+    whitespace = ''    # 出力を保留している空白（コメントを含む）
+    braces = 0
+    templates = []     # テンプレートリテラルの ${ } の開始時の括弧の深さ
+    in_template = False
+
+    def emit(text: str):
+        nonlocal last, whitespace
+        out.append(_js_separator(whitespace, last, text[0]) + text)
+        whitespace = ''
+        last = text[-1]
+
+    while i < n:
+        if in_template:
+            # テンプレートリテラル: ` か ${ まではそのまま
+            start = i
+            while i < n:
+                char = source[i]
+                if char == '\\':
+                    i += 2
+                    continue
+                if char == '`':
+                    i += 1
+                    in_template = False
+                    break
+                if char == '$' and source.startswith('${', i):
+                    i += 2
+                    templates.append(braces)
+                    braces += 1
+                    in_template = False
+                    break
+                i += 1
+            out.append(source[start:i])
+            last = source[i - 1]
+            last_word = ''
+            continue
+
+        char = source[i]
+        if char in ' \t\r\n\f\v':
+            whitespace += char
+            i += 1
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            end = n if end < 0 else end
+            whitespace += ' '
+            i = end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            whitespace += '\n' if '\n' in source[i:end] else ' '
+            i = end
+        elif char in '\'"':
+            end = _skip_quoted(source, i, char)
+            emit(source[i:end])
+            last_word = ''
+            i = end
+        elif char == '`':
+            emit('`')
+            in_template = True
+            last_word = ''
+            i += 1
+        elif char == '/' and (not last or last in _JS_REGEX_AFTER or last_word in _JS_REGEX_KEYWORDS):
+            end = _skip_regex(source, i)
+            emit(source[i:end])
+            # フラグのない正規表現の後も識別子と同じ扱い（「/a/ in x」を詰めない。続く / は除算）
+            last = 'a'
+            last_word = ''
+            i = end
+        elif _is_word(char):
+            end = i + 1
+            while end < n and _is_word(source[end]):
+                end += 1
+            last_word = source[i:end]
+            emit(last_word)
+            i = end
+        else:
+            if char == '{':
+                braces += 1
+            elif char == '}':
+                braces -= 1
+                if templates and braces == templates[-1]:
+                    # ${ } の終わり: テンプレートリテラルの続き
+                    templates.pop()
+                    emit('}')
+                    in_template = True
+                    last_word = ''
+                    i += 1
+                    continue
+            emit(char)
+            last_word = ''
+            i += 1
+    return ''.join(out)
+
+
+# ============================================================
+# HTML
+# ============================================================
+
+_HTML_TOKEN = re.compile(r'<!--.*?-->|<(script|style|pre|textarea)\b[^>]*>.*?</\1\s*>|<[^>]+>', re.S | re.I)
+_HTML_RAW = re.compile(r'(<(script|style)\b[^>]*>)(.*?)(</\2\s*>)', re.S | re.I)
+_HTML_TAG = re.compile(r'<(/?)([A-Za-z][\w:-]*)([^>]*)>', re.S)
+_HTML_SPACES = re.compile(r'[ \t\r\n\f]+')   # HTMLの空白（全角空白・ノーブレークスペースは含めない）
+_HTML_VOID = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+_HTML_CLASS = re.compile(r'\bclass\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.I)
+_HTML_STYLE_PRE = re.compile(r'\bstyle\s*=\s*["\'][^"\']*white-space\s*:\s*pre', re.I)
+
+
+def _collapse(text: str) -> str:
+    return _HTML_SPACES.sub(lambda m: '\n' if '\n' in m.group(0) else ' ', text)
+
+
+def _preserves_space(attributes: str, classes: Set[str]) -> bool:
+    if _HTML_STYLE_PRE.search(attributes):
+        return True
+    match = _HTML_CLASS.search(attributes)
+    if not match:
+        return False
+    return bool(classes.intersection((match.group(1) or match.group(2) or match.group(3) or '').split()))
+
+
+def _minify_raw(match) -> str:
+    """<script>・<style> の中身（外部スクリプト・JSON以外）を最小化"""
+    open_tag, name, body, close_tag = match.group(1), match.group(2).lower(), match.group(3), match.group(4)
+    if not body.strip():
+        return open_tag + close_tag
+    if name == 'style':
+        return open_tag + minify_css(body) + close_tag
+    script_type = re.search(r'\btype\s*=\s*["\']?([^"\'\s>]+)', open_tag, re.I)
+    if script_type and script_type.group(1).lower() not in ('text/javascript', 'module', 'application/javascript'):
+        return match.group(0)
+    return open_tag + minify_js(body) + close_tag
+
+
+def minify_html(source: str, white_space_pre: Optional[Set[str]] = None) -> str:
+    """
+    HTMLの最小化（空白を詰め、コメントを取り除く）
+
+    white_space_pre: 中の空白を残す要素のクラス（サイトのCSSで white-space: pre などを指定したもの）。
+                     ページ内の <style> で指定したクラスは自動で加える。
+    """
+    classes = set(white_space_pre or ())
+    for match in _HTML_RAW.finditer(source):
+        if match.group(2).lower() == 'style':
+            classes |= white_space_classes(match.group(3))
+    out = []
+    stack = []  # 開いている要素の (タグ名, 空白を残すか)
+    position = 0
+    for match in _HTML_TOKEN.finditer(source):
+        preserve = bool(stack) and stack[-1][1]
+        text = source[position:match.start()]
+        out.append(text if preserve else _collapse(text))
+        token = match.group(0)
+        position = match.end()
+        if token.startswith('<!--'):
+            # 条件付きコメント（<!--[if ...]>）と、空白を残す要素の中はそのまま
+            if preserve or token.startswith('<!--[if'):
+                out.append(token)
+            continue
+        if match.group(1):
+            name = match.group(1).lower()
+            raw = _HTML_RAW.match(token)
+            if name in ('script', 'style') and raw and not preserve:
+                out.append(_minify_raw(raw))
+            else:
+                out.append(token)
+            continue
+        tag = _HTML_TAG.match(token)
+        out.append(token)
+        if not tag:
+            continue
+        closing, name, attributes = tag.group(1), tag.group(2).lower(), tag.group(3)
+        if closing:
+            # 対応する開始タグまで閉じる（閉じ忘れの要素もここで閉じる）
+            for depth in range(len(stack) - 1, -1, -1):
+                if stack[depth][0] == name:
+                    del stack[depth:]
+                    break
+        elif name not in _HTML_VOID and not attributes.rstrip().endswith('/'):
+            stack.append((name, preserve or _preserves_space(attributes, classes)))
+    preserve = bool(stack) and stack[-1][1]
+    tail = source[position:]
+    out.append(tail if preserve else _collapse(tail))
+    return ''.join(out).strip() + '\n'
+
+
+# ============================================================
+# 後処理
+# ============================================================
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _replace_bytes(path: Path, data: bytes):
+    """一時ファイル経由で置き換え（途中で失敗しても元のファイルが残る）"""
+    tmp_path = path.with_name(f'.{path.name}.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _compressed_exists(path: Path, record: Dict) -> bool:
+    """記録した圧縮版がすべて残っているか（小さくならず書き出さなかったものは記録していない）"""
+    return all(path.with_name(f'{path.name}.{suffix}').exists() for suffix in ('gz', 'br') if suffix in record)
+
+
+class Precompressor:
+    """reports/ 以下の生成物の最小化と圧縮版の書き出し（状態は data/cache/precompress.json）"""
+
+    def __init__(self, reports_dir=REPORTS_DIR, state_path=DEFAULT_STATE_PATH, minify: bool = True):
+        self.reports_dir = Path(reports_dir)
+        self.state_path = Path(state_path)
+        self.minify = minify
+        self.files = {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            # 最小化の有無・Brotliの有無が前回と違えば全ファイルを処理し直す
+            if (state.get('version') == STATE_VERSION and state.get('minify') == minify
+                    and state.get('brotli') == (brotli is not None)):
+                self.files = state['files']
+        except (OSError, ValueError, KeyError):
+            pass
+        self._white_space_pre = None
+        self._tracked = None
+
+    @property
+    def tracked(self) -> Set[str]:
+        """git で管理しているファイル（reports/ からの相対パス。置き換えない）"""
+        if self._tracked is None:
+            try:
+                output = subprocess.run(
+                    ['git', 'ls-files', '-z', '--', '.'], cwd=self.reports_dir,
+                    capture_output=True, check=True,
+                ).stdout
+                self._tracked = {name for name in output.decode('utf-8').split('\0') if name}
+            except (OSError, subprocess.CalledProcessError):
+                # gitがない・リポジトリの外（デプロイ先で実行した場合など）
+                self._tracked = set()
+        return self._tracked
+
+    @property
+    def white_space_pre(self) -> Set[str]:
+        """サイトのCSS（アセット）で空白を残すクラス"""
+        if self._white_space_pre is None:
+            self._white_space_pre = set()
+            for path in self.reports_dir.rglob('*.css'):
+                self._white_space_pre |= white_space_classes(path.read_text(encoding='utf-8', errors='ignore'))
+        return self._white_space_pre
+
+    def _minified(self, kind: str, data: bytes) -> bytes:
+        text = data.decode('utf-8')
+        if kind == 'HTML':
+            text = minify_html(text, self.white_space_pre)
+        elif kind == 'CSS':
+            text = minify_css(text) + '\n'
+        else:
+            text = minify_js(text).strip() + '\n'
+        return text.encode('utf-8')
+
+    def process(self, path: Path, force: bool = False) -> Dict:
+        """1ファイルを処理（前回の処理後から変わっていなければ省略）。サイズの記録を返す"""
+        relative = path.relative_to(self.reports_dir).as_posix()
+        kind = FILE_TYPES[path.suffix]
+        data = path.read_bytes()
+        record = self.files.get(relative)
+        if not force and record and record['digest'] == _digest(data) and _compressed_exists(path, record):
+            return {**record, 'kind': kind, 'skipped': True}
+
+        original = len(data)
+        body = self._minified(kind, data) if self.minify and kind in MINIFIERS else data
+        if body != data and relative not in self.tracked:
+            _replace_bytes(path, body)
+            data = body
+        digest = _digest(data)
+        if not force and record and record['digest'] == digest and _compressed_exists(path, record):
+            # 生成し直したが最小化すると前回と同じ（圧縮版はそのまま使える）
+            return {**record, 'kind': kind, 'skipped': True}
+        # digest: 置き換え後（gitで管理しているファイルは元のまま）の内容のハッシュ
+        record = {'digest': digest, 'original': original, 'minified': len(body)}
+        data = body
+
+        compressed = {'gz': gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)}
+        if brotli is not None:
+            compressed['br'] = brotli.compress(data, quality=BROTLI_QUALITY)
+        for suffix, body in compressed.items():
+            sibling = path.with_name(f'{path.name}.{suffix}')
+            if len(body) < len(data):
+                _replace_bytes(sibling, body)
+                record[suffix] = len(body)
+            else:
+                # 圧縮しても小さくならない（ごく小さいファイル）
+                sibling.unlink(missing_ok=True)
+        self.files[relative] = record
+        return {**record, 'kind': kind, 'skipped': False}
+
+    def run(self, force: bool = False) -> Dict:
+        """
+        reports/ 以下の全ファイルを処理
+
+        Returns:
+            {'files': 件数, 'processed': 処理した件数, 'removed': 削除した圧縮版の数,
+             'elapsed_sec': 所要時間, 'by_kind': {種類: {'files', 'original', 'minified', 'gz', 'br'}}}
+        """
+        started_at = time.perf_counter()
+        by_kind = {}
+        processed = 0
+        seen = set()
+        for path in sorted(self.reports_dir.rglob('*')):
+            if path.suffix not in FILE_TYPES or path.name.startswith('.') or not path.is_file():
+                continue
+            result = self.process(path, force)
+            seen.add(path.relative_to(self.reports_dir).as_posix())
+            processed += not result['skipped']
+            totals = by_kind.setdefault(result['kind'], {'files': 0, 'original': 0, 'minified': 0, 'gz': 0, 'br': 0})
+            totals['files'] += 1
+            for key in ('original', 'minified'):
+                totals[key] += result[key]
+            for key in ('gz', 'br'):
+                totals[key] += result.get(key, result['minified'])
+
+        # 元のファイルがなくなった圧縮版と記録を削除
+        removed = 0
+        for suffix in ('gz', 'br'):
+            for sibling in self.reports_dir.rglob(f'*.{suffix}'):
+                if sibling.with_suffix('').suffix in FILE_TYPES and not sibling.with_suffix('').exists():
+                    sibling.unlink()
+                    removed += 1
+        for relative in set(self.files) - seen:
+            del self.files[relative]
+
+        self._save()
+        return {'files': len(seen), 'processed': processed, 'removed': removed,
+                'elapsed_sec': time.perf_counter() - started_at, 'by_kind': by_kind}
+
+    def _save(self):
+        """一時ファイル経由で置き換え"""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': STATE_VERSION, 'minify': self.minify, 'brotli': brotli is not None,
+                       'files': self.files}, f, ensure_ascii=False)
+        tmp_path.replace(self.state_path)
+
+
+def precompress(reports_dir=REPORTS_DIR, force: bool = False, minify: bool = True,
+                state_path=DEFAULT_STATE_PATH) -> Dict:
+    """reports/ の最小化と圧縮版の書き出し（Precompressor.run）"""
+    return Precompressor(reports_dir, state_path, minify).run(force)
+
+
+def _size(value: int) -> str:
+    return f"{value / 1024 / 1024:.1f}MB" if value >= 1024 * 1024 else f"{value / 1024:.1f}KB"
+
+
+def print_report(result: Dict):
+    """種類ごとのサイズと圧縮率を表示"""
+    print(f"\n🗜️  最小化・事前圧縮: {result['files']}ファイル中{result['processed']}ファイルを処理"
+          f"（{result['elapsed_sec']:.2f}秒）")
+    if brotli is None:
+        print("   ※ brotli モジュールがないため .br は書き出していません（pip install brotli）")
+    for kind, totals in sorted(result['by_kind'].items()):
+        original = totals['original'] or 1
+        line = f"   {kind}: {totals['files']}件 {_size(totals['original'])}"
+        if kind in MINIFIERS:
+            line += f" → 最小化 {_size(totals['minified'])} ({totals['minified'] / original:.0%})"
+        line += f" → gzip {_size(totals['gz'])} ({totals['gz'] / original:.0%})"
+        if brotli is not None:
+            line += f" / brotli {_size(totals['br'])} ({totals['br'] / original:.0%})"
+        print(line)
+    if result['removed']:
+        print(f"   元のファイルがなくなった圧縮版を削除: {result['removed']}件")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='生成物の最小化と事前圧縮（.gz / .br）')
+    parser.add_argument('--dir', type=str, default=str(REPORTS_DIR), help='処理するディレクトリ（既定: reports/）')
+    parser.add_argument('--force', action='store_true', help='前回から変わっていないファイルも処理し直す')
+    parser.add_argument('--no-minify', action='store_true', help='最小化せず、圧縮版だけを書き出す')
+    args = parser.parse_args()
+
+    print_report(precompress(args.dir, force=args.force, minify=not args.no_minify))
+
+
+if __name__ == '__main__':
+    main()
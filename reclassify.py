@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+訂正判定の再分類
+
+config.yamlの訂正ルール（correction_rules）を変更した後、保存済みの
+articles.has_correction / correction_keywords と changes.has_correction / correction_keywords を
+現在のルールで判定し直す。
+
+履歴をrowid順のチャンクで読み出し、プロセスプールで並列に判定して、
+値が変わった行だけをチャンク単位のトランザクションで書き戻す。
+進捗はチャンクごとにチェックポイントファイルへ記録するので、中断しても続きから再開できる
+（チェックポイントはルールのフィンガープリントと紐づけ、ルールが変わると最初からやり直す）。
+
+再分類の対象:
+    articles                        : description
+    changes (description_added/changed): new_value（その時点の説明文）
+    ※ title_changed / correction_removed / new の変更行は保存時の判定方法が異なるため対象外
+    correction_events は再分類後に説明文の変遷から作り直す
+
+使用方法:
+    python3 reclassify.py                      # ホットDBを再分類
+    python3 reclassify.py --include-archives   # 月別アーカイブDBも再分類
+    python3 reclassify.py --workers 4 --chunk-size 5000
+    python3 reclassify.py --restart            # チェックポイントを無視して最初から
+    python3 reclassify.py --dry-run            # 書き込まずに件数だけ確認
+"""
+import os
+import json
+import time
+import sqlite3
+import argparse
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from correction_rules import CorrectionRuleEngine, get_engine
+from cold_storage import default_archive_dir, list_archives
+from storage import ArticleStorage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_PATH = 'data/reclassify_state.json'
+
+# テーブルごとの再分類対象（判定するテキストのカラムと、対象行の条件）
+RECLASSIFY_TARGETS = {
+    'articles': {
+        'text_column': 'description',
+        'condition': '1',
+    },
+    'changes': {
+        'text_column': 'new_value',
+        'condition': "change_type IN ('description_added', 'description_changed')",
+    },
+}
+
+# ワーカープロセスごとのエンジン（initializerで一度だけコンパイル）
+_worker_engine: Optional[CorrectionRuleEngine] = None
+
+
+def _init_worker(rules: List[Dict], notice_marker: str, apology_marker: str):
+    """ワーカープロセス初期化: 親プロセスと同じルールでエンジンを作成"""
+    global _worker_engine
+    _worker_engine = CorrectionRuleEngine(
+        [{'id': rule_id, 'keywords': keywords} for rule_id, keywords in rules],
+        notice_marker=notice_marker,
+        apology_marker=apology_marker,
+    )
+
+
+def classify_chunk(rows: List[Tuple]) -> List[Tuple[int, int, Optional[str]]]:
+    """
+    チャンク内の行を判定し、値が変わる行だけを返す
+
+    Args:
+        rows: [(rowid, text, has_correction, correction_keywords), ...]
+
+    Returns:
+        [(rowid, has_correction, correction_keywords), ...]
+    """
+    updates = []
+    for rowid, text, old_has_correction, old_keywords in rows:
+        has_correction, keywords = _worker_engine.detect(text or '')
+        keywords_str = ','.join(keywords) if keywords else None
+        new_has_correction = 1 if has_correction else 0
+        if new_has_correction != (old_has_correction or 0) or keywords_str != old_keywords:
+            updates.append((rowid, new_has_correction, keywords_str))
+    return updates
+
+
+class Reclassifier:
+    """保存済みの訂正判定を現在のルールで再分類する"""
+
+    def __init__(self, engine: Optional[CorrectionRuleEngine] = None, workers: Optional[int] = None,
+                 chunk_size: int = 2000, state_path: str = DEFAULT_STATE_PATH, dry_run: bool = False):
+        """
+        Args:
+            engine: 判定に使うエンジン（既定: config.yamlの共有エンジン）
+            workers: ワーカープロセス数（既定: CPU数）
+            chunk_size: 1チャンク（=1トランザクション）の行数
+            state_path: チェックポイントファイル
+            dry_run: Trueなら書き込まない（チェックポイントも更新しない）
+        """
+        self.engine = engine or get_engine()
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.state_path = Path(state_path)
+        self.dry_run = dry_run
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict:
+        """チェックポイントを読み込む（ルールが変わっていれば破棄）"""
+        state = {'fingerprint': self.engine.fingerprint, 'progress': {}}
+        if self.state_path.exists():
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('fingerprint') == self.engine.fingerprint:
+                state.update(saved)
+            else:
+                logger.info("訂正ルールが変更されているため、チェックポイントを破棄して最初から再分類します")
+        return state
+
+    def _save_state(self):
+        """チェックポイントを書き込む（一時ファイル経由で置き換え）"""
+        if self.dry_run:
+            return
+        self.state['updated_at'] = datetime.now().isoformat()
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        tmp_path.replace(self.state_path)
+
+    def reset(self):
+        """チェックポイントを消去"""
+        self.state['progress'] = {}
+        self._save_state()
+
+    def _progress_key(self, db_path, table: str) -> str:
+        return f'{Path(db_path).resolve()}:{table}'
+
+    def reclassify_db(self, db_path, pool: ProcessPoolExecutor) -> Dict[str, Dict]:
+        """1つのDBの全対象テーブルを再分類"""
+        conn = sqlite3.connect(db_path)
+        results = {}
+        try:
+            existing_tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for table in RECLASSIFY_TARGETS:
+                if table in existing_tables:
+                    results[table] = self._reclassify_table(conn, db_path, table, pool)
+
+            # 訂正イベントは説明文の変遷から導出しているので、判定が変わった後に作り直す
+            # （中断後の再開でも必ず実行されるよう、更新件数にかかわらず行う）
+            if not self.dry_run and 'correction_events' in existing_tables:
+                with conn:
+                    count = ArticleStorage.rebuild_correction_events(conn, self.engine)
+                logger.info(f"再分類: {db_path} correction_eventsを再構築 ({count}件)")
+        finally:
+            conn.close()
+        return results
+
+    def _reclassify_table(self, conn: sqlite3.Connection, db_path, table: str,
+                          pool: ProcessPoolExecutor) -> Dict:
+        """
+        テーブルをrowid順のチャンクで再分類
+
+        読み出しはワーカー数の2倍までのチャンクを先行させ、結果は投入順に書き戻す
+        （チェックポイントが常に「そこまでの全行が処理済み」を表すようにするため）。
+        """
+        target = RECLASSIFY_TARGETS[table]
+        key = self._progress_key(db_path, table)
+        last_rowid = self.state['progress'].get(key, 0)
+        stats = {'scanned': 0, 'updated': 0, 'elapsed_sec': 0.0, 'resumed_from': last_rowid}
+
+        query = f'''
+            SELECT rowid, {target['text_column']}, has_correction, correction_keywords
+            FROM {table}
+            WHERE rowid > ? AND {target['condition']}
+            ORDER BY rowid
+            LIMIT ?
+        '''
+
+        started_at = time.perf_counter()
+        pending = deque()
+        read_rowid = last_rowid
+        exhausted = False
+
+        while pending or not exhausted:
+            # 先読み: ワーカーが空かないようにチャンクを投入
+            while not exhausted and len(pending) < self.workers * 2:
+                rows = conn.execute(query, (read_rowid, self.chunk_size)).fetchall()
+                if not rows:
+                    exhausted = True
+                    break
+                read_rowid = rows[-1][0]
+                pending.append((read_rowid, len(rows), pool.submit(classify_chunk, rows)))
+
+            if not pending:
+                break
+
+            chunk_last_rowid, chunk_rows, future = pending.popleft()
+            updates = future.result()
+
+            if not self.dry_run:
+                with conn:
+                    conn.executemany(
+                        f'UPDATE {table} SET has_correction = ?, correction_keywords = ? WHERE rowid = ?',
+                        [(has_correction, keywords, rowid) for rowid, has_correction, keywords in updates]
+                    )
+                self.state['progress'][key] = chunk_last_rowid
+                self._save_state()
+
+            stats['scanned'] += chunk_rows
+            stats['updated'] += len(updates)
+
+        stats['elapsed_sec'] = time.perf_counter() - started_at
+        rate = stats['scanned'] / stats['elapsed_sec'] if stats['elapsed_sec'] > 0 else 0
+        logger.info(f"再分類: {db_path} {table} - {stats['scanned']}行を判定, {stats['updated']}行を更新 "
+                    f"({stats['elapsed_sec']:.2f}秒, {rate:.0f}行/秒)")
+        return stats
+
+    def run(self, db_paths: List) -> Dict[str, Dict[str, Dict]]:
+        """
+        複数のDBを再分類
+
+        Returns:
+            {DBパス: {テーブル名: {'scanned', 'updated', 'elapsed_sec', 'resumed_from'}}}
+        """
+        results = {}
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.engine.rules, self.engine.notice_marker, self.engine.apology_marker),
+        ) as pool:
+            for db_path in db_paths:
+                results[str(db_path)] = self.reclassify_db(db_path, pool)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='保存済みの訂正判定を現在のルールで再分類')
+    parser.add_argument('--db', type=str, help='ホットDBのパス（既定: config.yaml）')
+    parser.add_argument('--include-archives', action='store_true', help='月別アーカイブDBも再分類')
+    parser.add_argument('--workers', type=int, help='ワーカープロセス数（既定: CPU数）')
+    parser.add_argument('--chunk-size', type=int, default=2000, help='1トランザクションあたりの行数')
+    parser.add_argument('--state', type=str, default=DEFAULT_STATE_PATH, help='チェックポイントファイル')
+    parser.add_argument('--restart', action='store_true', help='チェックポイントを無視して最初から')
+    parser.add_argument('--dry-run', action='store_true', help='書き込まずに更新件数だけを表示')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.db:
+        db_path = args.db
+    else:
+        import yaml
+        with open('config.yaml', 'r', encoding='utf-8') as f:
+            db_path = yaml.safe_load(f)['database']['path']
+
+    db_paths = [Path(db_path)]
+    if args.include_archives:
+        db_paths += list_archives(default_archive_dir(db_path))
+
+    reclassifier = Reclassifier(workers=args.workers, chunk_size=args.chunk_size,
+                                state_path=args.state, dry_run=args.dry_run)
+    if args.restart:
+        reclassifier.reset()
+
+    print("="*60)
+    print("訂正判定の再分類")
+    print("="*60)
+    print(f"\nルール: {[rule_id for rule_id, _ in reclassifier.engine.rules]} (fingerprint: {reclassifier.engine.fingerprint})")
+    print(f"対象DB: {len(db_paths)}件, ワーカー: {reclassifier.workers}, チャンク: {reclassifier.chunk_size}行")
+    if args.dry_run:
+        print("⚠️  ドライラン: 書き込みは行いません")
+
+    started_at = time.perf_counter()
+    results = reclassifier.run(db_paths)
+    elapsed = time.perf_counter() - started_at
+
+    total_scanned = 0
+    total_updated = 0
+    print()
+    for db, tables in results.items():
+        for table, stats in tables.items():
+            total_scanned += stats['scanned']
+            total_updated += stats['updated']
+            resumed = f", rowid {stats['resumed_from']} から再開" if stats['resumed_from'] else ''
+            print(f"  {Path(db).name} {table}: 判定{stats['scanned']}行, 更新{stats['updated']}行{resumed}")
+
+    rate = total_scanned / elapsed if elapsed > 0 else 0
+    print(f"\n✅ 合計: 判定{total_scanned}行, 更新{total_updated}行 ({elapsed:.2f}秒, {rate:.0f}行/秒)")
+    print("\n" + "="*60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+記事の版（article_revisions）の参照
+
+記事ごとの版は ArticleStorage.save_articles が変更を記録するたびに追加する
+（各版はタイトル・説明文と有効期間 valid_from〜valid_to を持つ）。
+ここでは版の一覧と、任意の時点の記事の状態をインデックス経由で取得する。
+月別アーカイブDB（cold_storage.py）に退避した記事も all_article_revisions ビューで参照できる。
+
+使用方法:
+    python3 revisions.py --article-id 123                       # 版の一覧
+    python3 revisions.py --article-id 123 --at 2025-08-01T12:00  # その時点の状態
+    python3 revisions.py --at 2025-08-01T12:00                   # その時点の全記事数
+"""
+import sqlite3
+import argparse
+from typing import Dict, Iterator, List, Optional
+
+from cold_storage import connect_with_archives
+
+REVISION_COLUMNS = 'article_id, revision, change_id, title, description, valid_from, valid_to'
+
+
+def _to_dict(cursor, row) -> Dict:
+    return {col[0]: value for col, value in zip(cursor.description, row)}
+
+
+def get_revisions(conn: sqlite3.Connection, article_id: int, table: str = 'article_revisions') -> List[Dict]:
+    """記事の全版（古い順）"""
+    cursor = conn.execute(f'''
+        SELECT {REVISION_COLUMNS} FROM {table}
+        WHERE article_id = ?
+        ORDER BY revision
+    ''', (article_id,))
+    return [_to_dict(cursor, row) for row in cursor.fetchall()]
+
+
+def get_state_at(conn: sqlite3.Connection, article_id: int, at: str,
+                 table: str = 'article_revisions') -> Optional[Dict]:
+    """
+    指定時点の記事の版
+
+    (article_id, valid_from) のインデックスで、at以前に始まった最新の版を1件だけ読む。
+
+    Returns:
+        版（その時点でまだ記事が取得されていなければNone）
+    """
+    cursor = conn.execute(f'''
+        SELECT {REVISION_COLUMNS} FROM {table}
+        WHERE article_id = ? AND valid_from <= ?
+        ORDER BY valid_from DESC, revision DESC
+        LIMIT 1
+    ''', (article_id, at))
+    row = cursor.fetchone()
+    return _to_dict(cursor, row) if row else None
+
+
+def iter_states_at(conn: sqlite3.Connection, at: str, table: str = 'article_revisions') -> Iterator[Dict]:
+    """指定時点で有効だった全記事の版（エクスポート等で時点指定のデータを作る用）"""
+    cursor = conn.execute(f'''
+        SELECT {REVISION_COLUMNS} FROM {table}
+        WHERE valid_from <= ? AND (valid_to IS NULL OR valid_to > ?)
+        ORDER BY article_id
+    ''', (at, at))
+    while True:
+        rows = cursor.fetchmany(500)
+        if not rows:
+            break
+        for row in rows:
+            yield _to_dict(cursor, row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='記事の版の一覧・時点指定の参照')
+    parser.add_argument('--db', type=str, default='data/articles.db', help='DB（スナップショット可）のパス')
+    parser.add_argument('--article-id', type=int, help='記事ID')
+    parser.add_argument('--at', type=str, help='時点（ISO形式）')
+    args = parser.parse_args()
+
+    conn = connect_with_archives(args.db)
+    table = 'all_article_revisions'
+
+    if args.article_id and args.at:
+        state = get_state_at(conn, args.article_id, args.at, table)
+        if state is None:
+            print(f"記事{args.article_id}は {args.at} の時点でまだ取得されていません")
+        else:
+            print(f"記事{args.article_id} 第{state['revision']}版 ({state['valid_from']}〜{state['valid_to'] or '現在'})")
+            print(f"タイトル: {state['title']}")
+            print(f"説明文: {state['description']}")
+    elif args.article_id:
+        for revision in get_revisions(conn, args.article_id, table):
+            print(f"第{revision['revision']}版 {revision['valid_from']}〜{revision['valid_to'] or '現在'}: {revision['title']}")
+    elif args.at:
+        count = sum(1 for _ in iter_states_at(conn, args.at, table))
+        print(f"{args.at} の時点の記事: {count}件")
+    else:
+        parser.error('--article-id または --at を指定してください')
+
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -22,61 +22,33 @@ echo "========================================" | tee -a "$LOG_FILE"
 echo "" | tee -a "$LOG_FILE"
 echo "📡 記事収集中..." | tee -a "$LOG_FILE"
 /usr/bin/python3 main_hybrid.py >> "$LOG_FILE" 2>&1
-if [ $? -eq 0 ]; then
+STATUS=$?
+# 終了コード3: 前回から新着記事・変更がなく、サイトを生成していない（build_site.NOOP_EXIT_CODE）
+NOOP_EXIT_CODE=3
+if [ $STATUS -eq 0 ] || [ $STATUS -eq $NOOP_EXIT_CODE ]; then
     echo "✅ 記事収集完了" | tee -a "$LOG_FILE"
 else
     echo "❌ 記事収集エラー" | tee -a "$LOG_FILE"
     exit 1
 fi
 
-# 2. ポータルページ生成
-echo "" | tee -a "$LOG_FILE"
-echo "🎨 ポータルページ生成中..." | tee -a "$LOG_FILE"
-/usr/bin/python3 generate_portal.py >> "$LOG_FILE" 2>&1
-if [ $? -eq 0 ]; then
-    echo "✅ ポータルページ生成完了" | tee -a "$LOG_FILE"
-else
-    echo "❌ ポータルページ生成エラー" | tee -a "$LOG_FILE"
-fi
-
-# 3. 変更履歴ページ生成
-echo "" | tee -a "$LOG_FILE"
-echo "🎨 変更履歴ページ生成中..." | tee -a "$LOG_FILE"
-/usr/bin/python3 generate_history.py >> "$LOG_FILE" 2>&1
-if [ $? -eq 0 ]; then
-    echo "✅ 変更履歴ページ生成完了" | tee -a "$LOG_FILE"
-else
-    echo "❌ 変更履歴ページ生成エラー" | tee -a "$LOG_FILE"
-fi
-
-# 4. アーカイブページ生成
-echo "" | tee -a "$LOG_FILE"
-echo "🎨 アーカイブページ生成中..." | tee -a "$LOG_FILE"
-/usr/bin/python3 generate_archive.py >> "$LOG_FILE" 2>&1
-if [ $? -eq 0 ]; then
-    echo "✅ アーカイブページ生成完了" | tee -a "$LOG_FILE"
-else
-    echo "❌ アーカイブページ生成エラー" | tee -a "$LOG_FILE"
-fi
-
-# 5. おことわりページ生成
-echo "" | tee -a "$LOG_FILE"
-echo "🎨 おことわりページ生成中..." | tee -a "$LOG_FILE"
-/usr/bin/python3 generate_corrections.py >> "$LOG_FILE" 2>&1
-if [ $? -eq 0 ]; then
-    echo "✅ おことわりページ生成完了" | tee -a "$LOG_FILE"
-else
-    echo "❌ おことわりページ生成エラー" | tee -a "$LOG_FILE"
-fi
+# 2. サイト生成
+# main_hybrid.py がスナップショットから全ページ（ポータル・変更履歴・アーカイブ・おことわり）を
+# build_site.py で1回だけ生成済みなので、ここでは再生成しない
+# （手動で再生成する場合: python3 build_site.py --db <スナップショット>）
 
-# 6. Netlifyへデプロイ
+# 3. Netlifyへデプロイ（サイトに変更がなければ省略）
 echo "" | tee -a "$LOG_FILE"
-echo "🚀 Netlifyへデプロイ中..." | tee -a "$LOG_FILE"
-netlify deploy --prod --dir=reports >> "$LOG_FILE" 2>&1
-if [ $? -eq 0 ]; then
-    echo "✅ デプロイ完了: https://nhk-news-tracker.netlify.app" | tee -a "$LOG_FILE"
+if [ $STATUS -eq $NOOP_EXIT_CODE ]; then
+    echo "⏭️  新着記事・変更がないため、デプロイを省略" | tee -a "$LOG_FILE"
 else
-    echo "❌ デプロイエラー" | tee -a "$LOG_FILE"
+    echo "🚀 Netlifyへデプロイ中..." | tee -a "$LOG_FILE"
+    netlify deploy --prod --dir=reports >> "$LOG_FILE" 2>&1
+    if [ $? -eq 0 ]; then
+        echo "✅ デプロイ完了: https://nhk-news-tracker.netlify.app" | tee -a "$LOG_FILE"
+    else
+        echo "❌ デプロイエラー" | tee -a "$LOG_FILE"
+    fi
 fi
 
 echo "" | tee -a "$LOG_FILE"
@@ -6,13 +6,14 @@ JWT認証エラー自動リカバリー対応
 """
 import requests
 import undetected_chromedriver as uc
-from typing import Optional, Dict
+from typing import Optional, Dict, Callable
 import logging
 import time
 import os
 from pathlib import Path
 from setup_consent_auto import setup_with_auto_consent
 from notifier import MacNotifier
+from correction_rules import get_engine
 
 logger = logging.getLogger(__name__)
 
@@ -171,12 +172,15 @@ class NhkRssScraperHybrid:
         else:
             return self._fetch_with_requests(url)
 
-    def fetch_batch(self, urls: Dict[str, str]) -> Dict[str, Optional[str]]:
+    def fetch_batch(self, urls: Dict[str, str],
+                    on_result: Optional[Callable[[str, Optional[str]], None]] = None) -> Dict[str, Optional[str]]:
         """
         複数URL一括取得（最適化版）
 
         Args:
             urls: {'name': 'url', ...}
+            on_result: ソースごとの取得完了時に呼ばれるコールバック(name, content)
+                       （残りのソース取得中に解析・保存を進めるため）
 
         Returns:
             {'name': 'content', ...}
@@ -191,6 +195,8 @@ class NhkRssScraperHybrid:
             logger.info(f"取得中 (requests): {name}")
             content = self._fetch_with_requests(url)
             results[name] = content
+            if on_result:
+                on_result(name, content)
             time.sleep(0.5)  # 控えめな待機
 
         # Seleniumが必要なURLを処理（低速）
@@ -287,18 +293,22 @@ class NhkRssScraperHybrid:
                         logger.error(f"エラー: {name} - {e}")
                         results[name] = None
 
+                    finally:
+                        if on_result:
+                            on_result(name, results.get(name))
+
             finally:
                 if driver:
                     driver.quit()
 
         return results
 
-    def search_nhk_one(self, query: str = "失礼しました", driver=None) -> list:
+    def search_nhk_one(self, query: Optional[str] = None, driver=None) -> list:
         """
         NHK ONE検索で訂正記事を検索し、記事データを取得
 
         Args:
-            query: 検索キーワード（デフォルト: 失礼しました）
+            query: 検索キーワード（デフォルト: 訂正ルールのおことわり定型文「失礼しました」）
             driver: 既存のSeleniumドライバー（Noneの場合は新規作成）
 
         Returns:
@@ -308,6 +318,10 @@ class NhkRssScraperHybrid:
         import re
         from datetime import datetime
 
+        correction_rules = get_engine()
+        if query is None:
+            query = correction_rules.apology_marker
+
         # URLエンコード
         encoded_query = quote(query)
         search_url = f"https://www.web.nhk/search?query={encoded_query}&modeOfItem=news&period=all&hasVideo=false"
@@ -533,8 +547,8 @@ class NhkRssScraperHybrid:
                         if title and description:
                             # 「失礼しました」または訂正キーワードが含まれているか確認
                             has_query = query in title or query in description
-                            has_correction = '※' in description or '※' in title
-                            logger.info(f"  ✓ '{query}'含む: {has_query}, '※'含む: {has_correction}")
+                            has_correction = correction_rules.has_marker(description) or correction_rules.has_marker(title)
+                            logger.info(f"  ✓ '{query}'含む: {has_query}, 訂正マーカー含む: {has_correction}")
 
                             if has_query or has_correction:
                                 article = {
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+アーカイブ検索用のバイグラム転置インデックス
+
+記事のタイトル・説明文を文字バイグラム（隣り合う2文字）に分け、バイグラムごとに記事IDの一覧を作る。
+ページ（archive.html）は検索語のバイグラムを含むシャードだけを取得し、記事IDの一覧の積集合を求める。
+積集合はバイグラムをすべて含む候補なので（「東京都」で「京都…東京」も該当する）、ページは候補の表示用データ
+（記事ID 1000件ごとのブロック）を新しい順に取得し、タイトル・説明文に検索語そのものが含まれる記事だけを残す。
+
+    api/search/index.json        シャードの一覧（data_api.ShardWriter）
+    api/search/grams/<N>.json    バケットNのバイグラム → 記事ID（昇順・差分で符号化。空のバケットは書き出さない）
+    api/search/docs/<N>.json     記事ID N*1000〜 の表示用データ（説明文は全文）
+
+バイグラムのバケットは (1文字目の符号位置 * 31 + 2文字目の符号位置) % BUCKETS（ページ側の templates/assets/search_client.js と同じ計算）。
+インデックスの状態（記事ごとの内容のハッシュと転置リスト）は data/cache/search_index.db に保存し、
+タイトル・説明文が変わった記事の分だけ更新する。バケットごとの更新回数をシャードのハッシュに使うので、
+書き出すのは転置リストが変わったバケットだけになる。
+"""
+import re
+import sqlite3
+import uuid
+import hashlib
+import logging
+import unicodedata
+from pathlib import Path
+from typing import Callable, Dict, List, Set
+
+from data_api import ShardWriter, code_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_PATH = Path(__file__).parent / 'data' / 'cache' / 'search_index.db'
+
+# バイグラムのバケット数（シャード数）と、表示用データの1ブロックの記事数
+BUCKETS = 1024
+DOC_BLOCK = 1000
+
+# 正規化・分割の方法（変えたら上げる。保存済みの状態を破棄して作り直す）
+TOKENIZER_VERSION = 1
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text: str) -> str:
+    """NFKC正規化・小文字化（全角英数字・半角カナの表記ゆれを吸収）"""
+    return unicodedata.normalize('NFKC', text or '').lower()
+
+
+def bigrams(text: str) -> Set[str]:
+    """正規化したテキストの文字バイグラム（空白をまたぐものは含めない）"""
+    grams = set()
+    for run in _WHITESPACE.split(normalize(text)):
+        grams.update(run[i:i + 2] for i in range(len(run) - 1))
+    return grams
+
+
+def bucket_of(gram: str) -> int:
+    """バイグラムのバケット（ページ側のJavaScriptと同じ計算）"""
+    return (ord(gram[0]) * 31 + ord(gram[1])) % BUCKETS
+
+
+def document_text(article) -> str:
+    return f"{article['title'] or ''}\n{article['description'] or ''}"
+
+
+def _text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _delta_encode(ids: List[int]) -> List[int]:
+    """昇順のIDを先頭からの差分に（JSONを小さくする）"""
+    encoded = []
+    previous = 0
+    for article_id in ids:
+        encoded.append(article_id - previous)
+        previous = article_id
+    return encoded
+
+
+class SearchIndex:
+    """転置インデックスの状態（SQLite）"""
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS documents (article_id INTEGER PRIMARY KEY, digest TEXT NOT NULL)')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS postings (
+                bigram TEXT NOT NULL,
+                article_id INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                PRIMARY KEY (bigram, article_id)
+            ) WITHOUT ROWID
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_postings_bucket ON postings(bucket)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_postings_article ON postings(article_id)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS buckets (bucket INTEGER PRIMARY KEY, generation INTEGER NOT NULL)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT)')
+
+        version = f'{TOKENIZER_VERSION}:{BUCKETS}'
+        row = self.conn.execute("SELECT value FROM index_meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != version:
+            if row is not None:
+                logger.info(f"検索インデックスの形式変更のため作り直し: {row[0]} → {version}")
+            self.conn.execute('DELETE FROM documents')
+            self.conn.execute('DELETE FROM postings')
+            self.conn.execute('DELETE FROM buckets')
+            self.conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES ('version', ?)", (version,))
+            # 作り直すたびに変える（更新回数が以前の状態と重なってもシャードのハッシュが一致しないように）
+            self.conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES ('epoch', ?)",
+                              (uuid.uuid4().hex,))
+        self.conn.commit()
+        self.epoch = self.conn.execute("SELECT value FROM index_meta WHERE key = 'epoch'").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _replace(self, article_id: int, grams: Set[str], touched: Set[int]):
+        """記事のバイグラムを置き換え（増減したバイグラムのバケットだけを touched に加える）"""
+        old = {row[0] for row in self.conn.execute('SELECT bigram FROM postings WHERE article_id = ?', (article_id,))}
+        removed = old - grams
+        added = grams - old
+        self.conn.executemany('DELETE FROM postings WHERE bigram = ? AND article_id = ?',
+                              [(gram, article_id) for gram in removed])
+        self.conn.executemany('INSERT INTO postings (bigram, article_id, bucket) VALUES (?, ?, ?)',
+                              [(gram, article_id, bucket_of(gram)) for gram in added])
+        touched.update(bucket_of(gram) for gram in removed | added)
+
+    def update(self, articles) -> Set[int]:
+        """
+        記事の一覧に合わせて転置リストを更新（タイトル・説明文が変わった記事・増えた記事・消えた記事のみ）
+
+        転置リストが変わったバケットの更新回数を同じトランザクションで増やす。
+
+        Returns:
+            転置リストが変わったバケット
+        """
+        known = dict(self.conn.execute('SELECT article_id, digest FROM documents'))
+        touched: Set[int] = set()
+        updated = 0
+        for article in articles:
+            text = document_text(article)
+            digest = _text_digest(text)
+            article_id = article['id']
+            if known.pop(article_id, None) == digest:
+                continue
+            self._replace(article_id, bigrams(text), touched)
+            self.conn.execute('INSERT OR REPLACE INTO documents (article_id, digest) VALUES (?, ?)',
+                              (article_id, digest))
+            updated += 1
+
+        # 一覧から消えた記事（DBから削除された記事）
+        for article_id in known:
+            self._replace(article_id, set(), touched)
+            self.conn.execute('DELETE FROM documents WHERE article_id = ?', (article_id,))
+
+        self.conn.executemany(
+            'INSERT INTO buckets (bucket, generation) VALUES (?, 1) '
+            'ON CONFLICT(bucket) DO UPDATE SET generation = generation + 1',
+            [(bucket,) for bucket in touched]
+        )
+        self.conn.commit()
+        if updated or known:
+            logger.info(f"検索インデックス: {updated}件を更新、{len(known)}件を削除、{len(touched)}バケットに影響")
+        return touched
+
+    def generations(self) -> Dict[int, int]:
+        """バケット → 更新回数"""
+        return dict(self.conn.execute('SELECT bucket, generation FROM buckets'))
+
+    def nonempty_buckets(self) -> List[int]:
+        """バイグラムが1つ以上あるバケット"""
+        return [row[0] for row in self.conn.execute('SELECT DISTINCT bucket FROM postings ORDER BY bucket')]
+
+    def bucket_postings(self, bucket: int) -> Dict[str, List[int]]:
+        """バケットのバイグラム → 記事ID（昇順）"""
+        postings: Dict[str, List[int]] = {}
+        for gram, article_id in self.conn.execute(
+            'SELECT bigram, article_id FROM postings WHERE bucket = ? ORDER BY bigram, article_id', (bucket,)
+        ):
+            postings.setdefault(gram, []).append(article_id)
+        return postings
+
+
+def write_search_index(reports_dir, articles, doc_records: Callable[[list], list],
+                       state_path=DEFAULT_STATE_PATH) -> str:
+    """
+    検索インデックスのシャードを更新
+
+    Args:
+        reports_dir: 出力先（reports/）
+        articles: 全記事
+        doc_records: 記事 → 検索結果の表示用レコード（generate_archive.article_records など。
+                     ページは候補の記事のタイトル・説明文に検索語が含まれるかを確かめるので、説明文は全文を含める）
+        state_path: インデックスの状態の保存先
+
+    Returns:
+        ページから参照する api/search/index.json のURL
+    """
+    api = ShardWriter(reports_dir, 'search', code_version(TOKENIZER_VERSION, BUCKETS, DOC_BLOCK, files=[__file__]))
+    with SearchIndex(state_path) as index:
+        index.update(articles)
+        generations = index.generations()
+        # 空のバケットは書き出さない（ページ側は一覧にないバケットを空として扱う）
+        for bucket in index.nonempty_buckets():
+            # シャードのハッシュは転置リストの代わりに (状態のID, 更新回数) から作る（変わっていなければ読み込まない）
+            api.add(f'grams/{bucket}', [(index.epoch, generations.get(bucket, 0))],
+                    lambda rows, bucket=bucket: {gram: _delta_encode(ids)
+                                                 for gram, ids in index.bucket_postings(bucket).items()})
+
+    # 表示用データ（記事IDのブロックごと。最終確認日時などが変わったブロックだけ書き出す）
+    blocks: Dict[int, list] = {}
+    for article in articles:
+        blocks.setdefault(article['id'] // DOC_BLOCK, []).append(article)
+    for block in sorted(blocks):
+        api.add(f'docs/{block}', blocks[block],
+                lambda rows: {str(record['id']): record for record in doc_records(rows)})
+
+    return api.finish(buckets=BUCKETS, doc_block=DOC_BLOCK)
+
+
+def main():
+    import argparse
+    from cold_storage import connect_with_archives
+    from generate_archive import fetch_all_articles
+
+    parser = argparse.ArgumentParser(description='アーカイブ検索インデックスの検索（動作確認用）')
+    parser.add_argument('query', help='検索語（2文字以上）')
+    parser.add_argument('--db', type=str, default='data/articles.db', help='DB（スナップショット可）のパス')
+    args = parser.parse_args()
+
+    conn = connect_with_archives(args.db)
+    articles = {article['id']: article for article in fetch_all_articles(conn)}
+    conn.close()
+
+    grams = bigrams(args.query)
+    if not grams:
+        parser.error('検索語は2文字以上にしてください')
+    with SearchIndex() as index:
+        index.update(articles.values())
+        ids = None
+        for gram in grams:
+            found = set(index.bucket_postings(bucket_of(gram)).get(gram, []))
+            ids = found if ids is None else ids & found
+    # バイグラムをすべて含む候補から、検索語そのものを含む記事だけを残す（ページと同じ判定）
+    query = args.query.lower()
+    ids = {article_id for article_id in ids
+           if query in f"{articles[article_id]['title']} {articles[article_id]['description'] or ''}".lower()}
+    for article_id in sorted(ids, reverse=True)[:20]:
+        print(f"{article_id}: {articles[article_id]['title']}")
+    print(f"{len(ids)}件")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+ページテンプレート（Jinja2）
+
+全ページ（変更履歴・アーカイブ・おことわり・ポータル・変更レポート・週次レポート）は templates/ のテンプレートで描画する。
+
+    templates/<ページ>.html            ページ本体
+    templates/partials/                共通部品（<head>のメタ情報・グローバルナビ・ヘッダー・カード・ページ送り）
+    templates/assets/                  スタイル・スクリプト（ページには埋め込まず、アセットとして参照する）
+
+テンプレートのコンパイル結果（バイトコード）は data/cache/templates/ に保存し、次のプロセス
+（カード描画のワーカーを含む）はテンプレートを解析せずに読み込む。テンプレートを編集すると
+内容のハッシュが変わるので、次回の読み込み時に自動でコンパイルし直す。
+
+アセット（templates/assets/ のスタイル・スクリプト）は、ページから {{ asset('assets/<名前>') }} で参照する。
+描画した内容のハッシュを付けた名前（例: assets/history.3f2a9c1d07.css）で reports/assets/ に書き出し、
+ページにはその相対パスを出力する。内容が変わると名前も変わるので、ブラウザ・CDNには無期限に
+キャッシュさせてよい（netlify.toml の /assets/* の Cache-Control）。同じ名前のファイルがあれば書き出さない。
+
+使用方法:
+    python3 site_templates.py compile     # 全テンプレートを事前にコンパイル（バイトコードを保存）
+    python3 site_templates.py list        # テンプレートの一覧
+    python3 site_templates.py assets      # 全アセットを reports/assets/ に書き出し、どのページも参照しない古い版を削除
+"""
+import os
+import re
+import hashlib
+import argparse
+import logging
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, pass_context
+
+from page_writer import PageWriter
+
+logger = logging.getLogger(__name__)
+
+# プロジェクトルート
+PROJECT_ROOT = Path(__file__).parent
+
+TEMPLATE_DIR = PROJECT_ROOT / 'templates'
+BYTECODE_CACHE_DIR = PROJECT_ROOT / 'data' / 'cache' / 'templates'
+
+# アセットの書き出し先（reports/ からの相対パス。テンプレート側の名前 assets/<名前> と同じ）
+ASSETS_DIR_NAME = 'assets'
+ASSETS_DIR = PROJECT_ROOT / 'reports' / ASSETS_DIR_NAME
+# 書き出したアセットの名前（<元の名前>.<ハッシュ>.<拡張子>）
+ASSET_FILE_PATTERN = re.compile(r'^(?P<stem>.+)\.(?P<digest>[0-9a-f]{10})(?P<suffix>\.(?:css|js))$')
+
+# このプロセスで書き出し（または既存を確認）済みのアセットのパス
+_published_assets = set()
+
+
+def format_datetime(value, fmt: str = '%Y年%m月%d日 %H:%M') -> str:
+    """ISO形式の日時を表示用に整形（テンプレートのフィルター。日時として読めない値はそのまま表示）"""
+    try:
+        return datetime.fromisoformat(value).strftime(fmt)
+    except (TypeError, ValueError):
+        return value
+
+
+@lru_cache(maxsize=None)
+def get_environment() -> Environment:
+    """テンプレートの環境（プロセスごとに1つ。読み込んだテンプレートはプロセス内で再利用する）"""
+    BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    env = Environment(
+        loader=FileSystemLoader(str(TEMPLATE_DIR)),
+        bytecode_cache=FileSystemBytecodeCache(str(BYTECODE_CACHE_DIR)),
+        # ブロックタグの行はインデントごと出力しない
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+        # 1回の生成の間にテンプレートは変わらない
+        auto_reload=False,
+    )
+    env.filters['format_datetime'] = format_datetime
+    env.globals['asset'] = asset
+    return env
+
+
+def get_template(name: str):
+    """テンプレートを取得（初回はバイトコードのキャッシュから読み込む）"""
+    return get_environment().get_template(name)
+
+
+def get_macro(name: str, macro: str) -> Callable[..., str]:
+    """テンプレートのマクロ（カードなど、ページ以外から描画する部品）"""
+    return getattr(get_template(name).module, macro)
+
+
+def render(name: str, **context) -> str:
+    """テンプレートを文字列に描画"""
+    return get_template(name).render(**context)
+
+
+@lru_cache(maxsize=None)
+def asset_content(name: str) -> str:
+    """アセットの内容（テンプレートとして描画。先頭の {# #} の説明は出力されない）"""
+    return get_template(name).render()
+
+
+@lru_cache(maxsize=None)
+def asset_filename(name: str) -> str:
+    """内容のハッシュを付けたアセットのファイル名（assets/history.css → history.3f2a9c1d07.css）"""
+    digest = hashlib.sha256(asset_content(name).encode('utf-8')).hexdigest()[:10]
+    stem, suffix = os.path.splitext(os.path.basename(name))
+    return f'{stem}.{digest}{suffix}'
+
+
+def publish_asset(name: str, assets_dir=ASSETS_DIR) -> str:
+    """アセットを書き出す（同じ内容のファイルがあれば書き出さない）。ファイル名を返す"""
+    filename = asset_filename(name)
+    path = Path(assets_dir) / filename
+    if path not in _published_assets:
+        if not path.exists():
+            with PageWriter(path) as out:
+                out.write(asset_content(name))
+            logger.debug(f"アセットを書き出し: {path}")
+        _published_assets.add(path)
+    return filename
+
+
+@pass_context
+def asset(context, name: str) -> str:
+    """
+    テンプレートから参照するアセットのURL（ページからの相対パス）
+
+    root（reports/ への相対パスの接頭辞）と assets_dir（書き出し先。render_page が設定する）は
+    描画中のページの値を使う。
+    """
+    root = context.get('root') or ''
+    assets_dir = context.get('assets_dir') or ASSETS_DIR
+    return f'{root}{ASSETS_DIR_NAME}/{publish_asset(name, assets_dir)}'
+
+
+def list_assets() -> List[str]:
+    return [name for name in list_templates() if name.startswith(ASSETS_DIR_NAME + '/')]
+
+
+def publish_assets(assets_dir=ASSETS_DIR) -> Dict[str, int]:
+    """
+    全アセットを書き出す（内容が変わったものだけ新しい名前で書き出す）
+
+    Returns:
+        {'assets': アセット数, 'written': 書き出した数}
+    """
+    assets_dir = Path(assets_dir)
+    existing = set(assets_dir.glob('*')) if assets_dir.exists() else set()
+    current = {assets_dir / publish_asset(name, assets_dir) for name in list_assets()}
+    return {'assets': len(current), 'written': len(current - existing)}
+
+
+def prune_assets(reports_dir=ASSETS_DIR.parent) -> int:
+    """
+    使われなくなった版のアセットを削除（現在の版と、reports/ 以下のいずれかのページが参照している版は残す）
+
+    過去の変更レポート（changes_*.html）などは生成し直さないので、参照を調べてから削除する。
+    """
+    reports_dir = Path(reports_dir)
+    assets_dir = reports_dir / ASSETS_DIR_NAME
+    if not assets_dir.exists():
+        return 0
+    keep = {asset_filename(name) for name in list_assets()}
+    reference = re.compile(ASSETS_DIR_NAME + r'/([^"\'/]+\.(?:css|js))')
+    for page in reports_dir.rglob('*.html'):
+        keep.update(reference.findall(page.read_text(encoding='utf-8', errors='ignore')))
+    pruned = 0
+    for path in assets_dir.iterdir():
+        if ASSET_FILE_PATTERN.match(path.name) and path.name not in keep:
+            path.unlink()
+            _published_assets.discard(path)
+            pruned += 1
+    return pruned
+
+
+def render_page(name: str, output_path, **context):
+    """
+    テンプレートを描画しながら出力ファイルへ書き出す（ページ全体をメモリに持たない）
+
+    参照したアセットは出力先から root（既定: 同じディレクトリ）をたどった assets/ に書き出す。
+    """
+    output_path = Path(output_path)
+    context.setdefault('assets_dir', Path(os.path.normpath(output_path.parent / (context.get('root') or '.') / ASSETS_DIR_NAME)))
+    with PageWriter(output_path) as page:
+        page.write_all(get_template(name).generate(**context))
+
+
+def template_path(name: str) -> Path:
+    """テンプレートのファイルのパス（ビルドマニフェスト・データAPIのバージョンに使う）"""
+    return TEMPLATE_DIR / name
+
+
+def list_templates() -> List[str]:
+    return get_environment().list_templates(extensions=['html', 'css', 'js'])
+
+
+def templates_digest() -> str:
+    """全テンプレートの内容のハッシュ"""
+    digest = hashlib.sha256()
+    for name in list_templates():
+        digest.update(name.encode('utf-8'))
+        digest.update(template_path(name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def precompile() -> int:
+    """全テンプレートを読み込んでバイトコードを保存（保存済みで変更がなければ読み込むだけ）"""
+    names = list_templates()
+    for name in names:
+        get_template(name)
+    return len(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ページテンプレートの管理')
+    parser.add_argument('command', choices=['compile', 'list', 'assets'],
+                        help='compile: 事前コンパイル, list: 一覧, assets: アセットの書き出し')
+    args = parser.parse_args()
+
+    if args.command == 'assets':
+        result = publish_assets()
+        pruned = prune_assets()
+        print(f"✅ アセット {result['assets']}個（書き出し{result['written']}個, 削除{pruned}個）: {ASSETS_DIR}")
+        return
+
+    if args.command == 'list':
+        for name in list_templates():
+            print(name)
+        return
+
+    started_at = time.perf_counter()
+    count = precompile()
+    print(f"✅ {count}個のテンプレートをコンパイルしました（{time.perf_counter() - started_at:.3f}秒）: {BYTECODE_CACHE_DIR}")
+
+
+if __name__ == '__main__':
+    main()
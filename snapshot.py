@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+読み取り用スナップショット
+
+SQLiteのオンラインバックアップAPIでホットDBを一時ファイルへ複製し、
+サイト生成はその凍結済みコピーから行う（次の取得サイクルと並行実行できる）。
+スナップショットには取得時点のデータバージョンを snapshot_meta テーブルに記録する。
+
+使用方法:
+    python3 snapshot.py                 # スナップショットを作成してパスを出力
+    python3 snapshot.py --keep 3        # 作成後、古いスナップショットを3件まで残して削除
+"""
+import os
+import json
+import sqlite3
+import argparse
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+from datetime import datetime
+
+from cold_storage import default_archive_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_DIR = 'data/snapshots'
+
+
+def get_data_version(conn: sqlite3.Connection) -> Dict:
+    """
+    DBのデータバージョン（高水位マーク）を取得
+
+    記事・変更ともにIDは単調増加（AUTOINCREMENT）なので、最大IDが同じなら
+    新規記事・変更は発生していない。
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'articles'")
+    row = cursor.fetchone()
+    articles_max_id = row[0] if row else 0
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'")
+    row = cursor.fetchone()
+    changes_max_id = row[0] if row else 0
+    return {'articles_max_id': articles_max_id, 'changes_max_id': changes_max_id}
+
+
+def create_snapshot(db_path: str = 'data/articles.db', snapshot_dir: str = DEFAULT_SNAPSHOT_DIR) -> Path:
+    """
+    ホットDBのスナップショットを作成
+
+    バックアップAPIは読み取りトランザクション内で全ページを複製するため、
+    取得処理の書き込み中でも一貫した時点のコピーになる（WALモードでは書き込みを妨げない）。
+
+    Returns:
+        スナップショットファイルのパス
+    """
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    taken_at = datetime.now()
+    snapshot_path = snapshot_dir / f"snapshot_{taken_at.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.db"
+    tmp_path = snapshot_path.with_suffix('.db.tmp')
+
+    src = sqlite3.connect(db_path)
+    dst = sqlite3.connect(tmp_path)
+    try:
+        src.backup(dst)
+        # 読み取り専用のコピーなので-wal/-shmを残さないジャーナルモードにする
+        dst.execute('PRAGMA journal_mode=DELETE')
+
+        # バックアップ後の複製から測ることで、記録するバージョンと内容が必ず一致する
+        data_version = get_data_version(dst)
+        dst.execute('CREATE TABLE IF NOT EXISTS snapshot_meta (key TEXT PRIMARY KEY, value TEXT)')
+        dst.executemany('INSERT OR REPLACE INTO snapshot_meta (key, value) VALUES (?, ?)', [
+            ('taken_at', taken_at.isoformat()),
+            ('source_db', str(Path(db_path).resolve())),
+            ('archive_dir', str(default_archive_dir(Path(db_path).resolve()))),
+            ('data_version', json.dumps(data_version)),
+        ])
+        dst.commit()
+    finally:
+        dst.close()
+        src.close()
+
+    os.replace(tmp_path, snapshot_path)
+    logger.info(f"スナップショット作成: {snapshot_path} ({data_version})")
+    return snapshot_path
+
+
+def read_snapshot_meta(db_path) -> Optional[Dict]:
+    """スナップショットのメタ情報を取得（通常のDBならNone）"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute('SELECT key, value FROM snapshot_meta').fetchall()
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+
+    meta = dict(rows)
+    if 'data_version' in meta:
+        meta['data_version'] = json.loads(meta['data_version'])
+    return meta
+
+
+def cleanup_snapshots(snapshot_dir: str = DEFAULT_SNAPSHOT_DIR, keep: int = 3) -> int:
+    """古いスナップショットを削除（新しい順にkeep件を残す）"""
+    snapshots = sorted(Path(snapshot_dir).glob('snapshot_*.db'), reverse=True)
+    removed = 0
+    for path in snapshots[keep:]:
+        path.unlink()
+        removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='サイト生成用のDBスナップショットを作成')
+    parser.add_argument('--db', type=str, default='data/articles.db', help='ホットDBのパス')
+    parser.add_argument('--dir', type=str, default=DEFAULT_SNAPSHOT_DIR, help='スナップショットの保存先')
+    parser.add_argument('--keep', type=int, help='作成後に残すスナップショット数')
+    args = parser.parse_args()
+
+    snapshot_path = create_snapshot(args.db, args.dir)
+    if args.keep:
+        cleanup_snapshots(args.dir, keep=args.keep)
+
+    # シェルスクリプトから受け取れるようにパスのみを出力
+    print(snapshot_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,6 +2,7 @@
 """
 データ蓄積機能（JSON/SQLite）
 """
+import gzip
 import json
 import sqlite3
 from pathlib import Path
@@ -9,6 +10,9 @@ from typing import List, Dict, Optional
 from datetime import datetime
 import logging
 
+from correction_rules import CorrectionRuleEngine, get_engine
+from text_diff import compute_change_diff, encode_opcodes, needs_diff
+
 logger = logging.getLogger(__name__)
 
 class ArticleStorage:
@@ -25,6 +29,9 @@ class ArticleStorage:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
+        # WALモード: サイト生成やスナップショットの読み取りが取得中の書き込みを妨げない
+        cursor.execute('PRAGMA journal_mode=WAL')
+
         # articlesテーブル作成
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS articles (
@@ -54,7 +61,8 @@ class ArticleStorage:
                 detected_at TEXT NOT NULL,
                 change_summary TEXT,
                 has_correction INTEGER DEFAULT 0,
-                correction_keywords TEXT
+                correction_keywords TEXT,
+                article_id INTEGER REFERENCES articles(id)
             )
         ''')
 
@@ -63,6 +71,8 @@ class ArticleStorage:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_link ON articles(link)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_changes_source ON changes(source)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_changes_detected_at ON changes(detected_at)')
+        # 最終確認日時の最大値（サイト生成の入力判定）・アーカイブページの並び順用
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_last_seen ON articles(last_seen)')
 
         # マイグレーション: 既存DBに訂正カラムを追加（articles）
         try:
@@ -96,11 +106,181 @@ class ArticleStorage:
         except sqlite3.OperationalError:
             pass
 
+        # マイグレーション: changesに記事IDの外部キーを追加し、既存行を(source, link)から埋める
+        try:
+            cursor.execute("ALTER TABLE changes ADD COLUMN article_id INTEGER REFERENCES articles(id)")
+            logger.info("マイグレーション: changesにarticle_idカラムを追加")
+        except sqlite3.OperationalError:
+            pass
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_changes_article_id ON changes(article_id)')
+
+        cursor.execute('''
+            UPDATE changes SET article_id = (
+                SELECT a.id FROM articles a
+                WHERE a.source = changes.source AND a.link = changes.link
+            )
+            WHERE article_id IS NULL
+        ''')
+        if cursor.rowcount > 0:
+            logger.info(f"マイグレーション: changes.article_idを{cursor.rowcount}件補完")
+
+        # correction_eventsテーブル作成（訂正の出現・削除の記録）
+        # change_id: 訂正が現れた変更行（初回取得時から訂正があった記事はNULL）
+        # removed_at / removed_change_id: 訂正が削除された日時と correction_removed の変更行
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'correction_events'")
+        events_table_exists = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS correction_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                article_id INTEGER NOT NULL REFERENCES articles(id),
+                change_id INTEGER REFERENCES changes(id),
+                rule_id TEXT NOT NULL,
+                keywords TEXT,
+                detected_at TEXT NOT NULL,
+                removed_at TEXT,
+                removed_change_id INTEGER REFERENCES changes(id),
+                excerpt TEXT
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_correction_events_detected_at ON correction_events(detected_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_correction_events_removed_at ON correction_events(removed_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_correction_events_article_id ON correction_events(article_id)')
+
+        # マイグレーション: 既存の変更履歴から訂正イベントを復元
+        if not events_table_exists:
+            count = self.rebuild_correction_events(conn)
+            if count > 0:
+                logger.info(f"マイグレーション: correction_eventsを{count}件作成")
+
+        # change_diffsテーブル作成（変更記録時に計算した表示用差分、text_diff.py参照）
+        # title: タイトル重複の除去に使ったタイトル（記事タイトルが後で変わった場合は表示側で再計算）
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_diffs'")
+        diffs_table_exists = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS change_diffs (
+                change_id INTEGER PRIMARY KEY REFERENCES changes(id),
+                article_id INTEGER REFERENCES articles(id),
+                algorithm TEXT NOT NULL,
+                title TEXT,
+                has_correction_keywords INTEGER DEFAULT 0,
+                old_text TEXT,
+                new_text TEXT,
+                opcodes TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_change_diffs_article_id ON change_diffs(article_id)')
+
+        # マイグレーション: 既存の変更の差分を計算
+        if not diffs_table_exists:
+            count = self.backfill_change_diffs(conn)
+            if count > 0:
+                logger.info(f"マイグレーション: change_diffsを{count}件作成")
+
+        # article_revisionsテーブル作成（記事の版: 各時点のタイトル・説明文と有効期間）
+        # change_id: その版を作った変更（初版は'new'の変更行）
+        # valid_to: 次の版に置き換わった日時（現在の版はNULL）
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'article_revisions'")
+        revisions_table_exists = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_revisions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                article_id INTEGER NOT NULL REFERENCES articles(id),
+                revision INTEGER NOT NULL,
+                change_id INTEGER REFERENCES changes(id),
+                title TEXT,
+                description TEXT,
+                valid_from TEXT NOT NULL,
+                valid_to TEXT,
+                UNIQUE(article_id, revision)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_article_revisions_valid_from ON article_revisions(article_id, valid_from)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_article_revisions_valid_to ON article_revisions(article_id, valid_to)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_article_revisions_change_id ON article_revisions(change_id)')
+
+        # マイグレーション: 既存の変更履歴から版を復元
+        if not revisions_table_exists:
+            count = self.rebuild_article_revisions(conn)
+            if count > 0:
+                logger.info(f"マイグレーション: article_revisionsを{count}件作成")
+
         conn.commit()
         conn.close()
 
         logger.info(f"データベース初期化完了: {self.db_path}")
 
+    @staticmethod
+    def rebuild_correction_events(conn: sqlite3.Connection, engine: Optional[CorrectionRuleEngine] = None) -> int:
+        """
+        記事と変更履歴からcorrection_eventsを作り直す
+
+        説明文の変遷（最初の説明文 → description_added/changed の new_value）を記事ごとにたどり、
+        訂正が現れた変更・消えた変更をイベントとして記録する。
+        初回の説明文は最初の説明文変更の old_value（変更がなければ現在の説明文）。
+        訂正ルールの変更後（reclassify.py）にも使う。
+
+        Args:
+            conn: DB接続
+            engine: 判定に使うエンジン（既定: config.yamlの共有エンジン。reclassify.py は再分類と同じエンジンを渡す）
+
+        Returns:
+            作成したイベント数
+        """
+        engine = engine or get_engine()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM correction_events')
+
+        # 記事ごとの説明文変更（訂正削除の変更行も対応付けのため含める）
+        history: Dict[int, List[tuple]] = {}
+        for row in cursor.execute('''
+            SELECT article_id, id, change_type, old_value, new_value, detected_at
+            FROM changes
+            WHERE article_id IS NOT NULL
+              AND change_type IN ('description_added', 'description_changed', 'correction_removed')
+            ORDER BY article_id, id
+        ''').fetchall():
+            history.setdefault(row[0], []).append(row[1:])
+
+        events = []
+        for article_id, description, first_seen in cursor.execute(
+            'SELECT id, description, first_seen FROM articles ORDER BY id'
+        ).fetchall():
+            changes = history.get(article_id, [])
+            initial = changes[0][2] if changes else description
+
+            open_event = None
+            matches = engine.match(initial)
+            if matches:
+                open_event = [article_id, None, matches[0].rule_id, ','.join(matches[0].keywords),
+                              first_seen, None, None, engine.excerpt(initial)]
+
+            for change_id, change_type, old_value, new_value, detected_at in changes:
+                if change_type == 'correction_removed':
+                    # 直前の説明文変更で閉じたイベントに削除の変更行を対応付ける
+                    if events and events[-1][0] == article_id and events[-1][5] == detected_at:
+                        events[-1][6] = change_id
+                    continue
+
+                matches = engine.match(new_value)
+                if matches and open_event is None:
+                    open_event = [article_id, change_id, matches[0].rule_id, ','.join(matches[0].keywords),
+                                  detected_at, None, None, engine.excerpt(new_value)]
+                elif not matches and open_event is not None:
+                    open_event[5] = detected_at
+                    events.append(open_event)
+                    open_event = None
+
+            if open_event is not None:
+                events.append(open_event)
+
+        cursor.executemany('''
+            INSERT INTO correction_events
+                (article_id, change_id, rule_id, keywords, detected_at, removed_at, removed_change_id, excerpt)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', events)
+        return len(events)
+
     def detect_correction(self, text: str) -> tuple[bool, list[str]]:
         """
         訂正キーワードを検出
@@ -111,27 +291,146 @@ class ArticleStorage:
         Returns:
             (has_correction, found_keywords): 訂正が含まれるか、検出されたキーワードリスト
         """
-        if not text:
-            return False, []
+        # ルールはconfig.yamlのcorrection_rules（既定: ※+当初+掲載 / ※+失礼しました）
+        return get_engine().detect(text)
 
-        # ※（全角）は必須
-        if '※' not in text:
-            return False, []
+    @staticmethod
+    def rebuild_article_revisions(conn: sqlite3.Connection) -> int:
+        """
+        記事と変更履歴からarticle_revisionsを作り直す
 
-        found = ['※']
+        初版のタイトルは'new'の変更行、説明文は最初の説明文変更の old_value（変更がなければ現在の値）。
+        以降、タイトル変更・説明文変更ごとに版を追加する（タイトル変更時の説明文は保存されていた値のまま）。
 
-        # パターン1: ※ + 「当初」+ 「掲載」（3つすべて）
-        if '当初' in text and '掲載' in text:
-            found.extend(['当初', '掲載'])
-            return True, found
+        Returns:
+            作成した版の数
+        """
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM article_revisions')
+
+        history: Dict[int, List[tuple]] = {}
+        for row in cursor.execute('''
+            SELECT article_id, id, change_type, old_value, new_value, detected_at
+            FROM changes
+            WHERE article_id IS NOT NULL
+              AND change_type IN ('new', 'title_changed', 'description_added', 'description_changed')
+            ORDER BY article_id, id
+        ''').fetchall():
+            history.setdefault(row[0], []).append(row[1:])
+
+        revisions = []
+        for article_id, title, description, first_seen in cursor.execute(
+            'SELECT id, title, description, first_seen FROM articles ORDER BY id'
+        ).fetchall():
+            changes = history.get(article_id, [])
+            new_change = next((c for c in changes if c[1] == 'new'), None)
+            first_title = next((c[2] for c in changes if c[1] == 'title_changed'), title)
+            first_description = next((c[2] for c in changes if c[1] in ('description_added', 'description_changed')),
+                                     description)
+
+            current = [article_id, 1, new_change[0] if new_change else None,
+                       new_change[3] if new_change else first_title, first_description, first_seen, None]
+            for change_id, change_type, old_value, new_value, detected_at in changes:
+                if change_type == 'new':
+                    continue
+                next_title = new_value if change_type == 'title_changed' else current[3]
+                next_description = new_value if change_type != 'title_changed' else current[4]
+                if current[1] > 1 and current[5] == detected_at:
+                    # 同じ取得での2回目の変更は長さ0の版を作らずに置き換える（_add_revisionと同じ）
+                    current[2:5] = [change_id, next_title, next_description]
+                    continue
+                current[6] = detected_at
+                revisions.append(current)
+                current = [article_id, current[1] + 1, change_id, next_title, next_description, detected_at, None]
+            revisions.append(current)
+
+        cursor.executemany('''
+            INSERT INTO article_revisions (article_id, revision, change_id, title, description, valid_from, valid_to)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', revisions)
+        return len(revisions)
+
+    @staticmethod
+    def _add_revision(cursor, article_id: int, change_id: int, title: str, description: Optional[str], now: str):
+        """
+        記事の新しい版を追加（現在の版はnowで終了）
 
-        # パターン2: ※ + 「失礼しました」
-        if '失礼しました' in text:
-            found.append('失礼しました')
-            return True, found
+        同じ取得で同じ記事が2回現れた場合（現在の版もnowに始まった場合）は、長さ0の版を残さずに
+        現在の版を置き換える（初版は'new'の変更行の版なので置き換えない）。
+        """
+        current = cursor.execute('''
+            SELECT id, revision, valid_from FROM article_revisions
+            WHERE article_id = ? AND valid_to IS NULL
+        ''', (article_id,)).fetchone()
+        if current is not None and current[1] > 1 and current[2] == now:
+            cursor.execute('''
+                UPDATE article_revisions SET change_id = ?, title = ?, description = ?
+                WHERE id = ?
+            ''', (change_id, title, description, current[0]))
+            return
+        cursor.execute('''
+            UPDATE article_revisions SET valid_to = ?
+            WHERE article_id = ? AND valid_to IS NULL
+        ''', (now, article_id))
+        cursor.execute('SELECT COALESCE(MAX(revision), 0) + 1 FROM article_revisions WHERE article_id = ?',
+                       (article_id,))
+        revision = cursor.fetchone()[0]
+        cursor.execute('''
+            INSERT INTO article_revisions (article_id, revision, change_id, title, description, valid_from)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (article_id, revision, change_id, title, description, now))
+
+    @staticmethod
+    def backfill_change_diffs(conn: sqlite3.Connection) -> int:
+        """
+        差分が保存されていない変更の差分を計算して保存
 
-        # ※はあるが、訂正パターンに該当しない
-        return False, []
+        タイトル重複の除去には記事の現在のタイトルを使う（表示側と同じ）。
+
+        Returns:
+            作成した差分数
+        """
+        cursor = conn.cursor()
+        rows = cursor.execute('''
+            SELECT c.id, c.article_id, c.change_type, c.old_value, c.new_value, a.title
+            FROM changes c
+            LEFT JOIN articles a ON a.id = c.article_id
+            LEFT JOIN change_diffs d ON d.change_id = c.id
+            WHERE d.change_id IS NULL
+        ''').fetchall()
+
+        count = 0
+        for change_id, article_id, change_type, old_value, new_value, title in rows:
+            if not needs_diff(change_type, old_value):
+                continue
+            # タイトル重複の除去は説明文の変更のみ
+            diff_title = title if change_type == 'description_changed' else ''
+            ArticleStorage._save_change_diff(cursor, change_id, article_id, old_value, new_value, diff_title)
+            count += 1
+        return count
+
+    @staticmethod
+    def _save_change_diff(cursor, change_id: int, article_id: int, old_value: Optional[str],
+                          new_value: Optional[str], title: Optional[str]):
+        """変更の表示用差分を計算してchange_diffsに保存"""
+        diff = compute_change_diff(old_value, new_value, title)
+        cursor.execute('''
+            INSERT OR REPLACE INTO change_diffs
+                (change_id, article_id, algorithm, title, has_correction_keywords, old_text, new_text, opcodes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (change_id, article_id, diff.algorithm, diff.title, 1 if diff.has_correction_keywords else 0,
+              diff.old_text, diff.new_text, encode_opcodes(diff.opcodes)))
+
+    def _open_correction_event(self, cursor, article_id: int, change_id: Optional[int],
+                               keywords_str: str, detected_at: str, description: str):
+        """訂正の出現をcorrection_eventsに記録"""
+        engine = get_engine()
+        rule_ids = engine.rules_for_keywords(keywords_str)
+        cursor.execute('''
+            INSERT INTO correction_events (article_id, change_id, rule_id, keywords, detected_at, excerpt)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (article_id, change_id, rule_ids[0] if rule_ids else '', keywords_str, detected_at,
+              engine.excerpt(description)))
 
     def save_articles(self, source: str, articles: List[Dict[str, str]]) -> Dict:
         """
@@ -165,7 +464,7 @@ class ArticleStorage:
 
             # 既存記事チェック
             cursor.execute('''
-                SELECT title, description, has_correction FROM articles
+                SELECT id, title, description FROM articles
                 WHERE source = ? AND link = ?
             ''', (source, article['link']))
 
@@ -178,22 +477,25 @@ class ArticleStorage:
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (source, article['link'], article['title'], article['description'],
                       article['pubDate'], now, now, 1 if has_correction else 0, keywords_str))
+                article_id = cursor.lastrowid
 
                 # 変更履歴記録
                 cursor.execute('''
-                    INSERT INTO changes (source, link, change_type, new_value, detected_at)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (source, article['link'], 'new', article['title'], now))
+                    INSERT INTO changes (article_id, source, link, change_type, new_value, detected_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (article_id, source, article['link'], 'new', article['title'], now))
+                self._add_revision(cursor, article_id, cursor.lastrowid, article['title'], article['description'], now)
 
                 stats['new'] += 1
                 if has_correction:
+                    self._open_correction_event(cursor, article_id, None, keywords_str, now, article['description'])
                     logger.info(f"🔴 新規記事（訂正あり）: {article['title']} [キーワード: {keywords_str}]")
                     stats['correction_added'].append((article['title'], keywords_str))
                 else:
                     logger.info(f"新規記事: {article['title']}")
 
             else:
-                old_title, old_desc, old_has_correction = existing
+                article_id, old_title, old_desc = existing
 
                 # タイトル変更チェック
                 if old_title != article['title']:
@@ -206,13 +508,17 @@ class ArticleStorage:
 
                     cursor.execute('''
                         UPDATE articles SET title = ?, last_seen = ?, has_correction = ?, correction_keywords = ?
-                        WHERE source = ? AND link = ?
-                    ''', (article['title'], now, 1 if has_correction else 0, keywords_str, source, article['link']))
+                        WHERE id = ?
+                    ''', (article['title'], now, 1 if has_correction else 0, keywords_str, article_id))
 
                     cursor.execute('''
-                        INSERT INTO changes (source, link, change_type, old_value, new_value, detected_at, change_summary, has_correction, correction_keywords)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (source, article['link'], 'title_changed', old_title, article['title'], now, change_summary, 1 if has_correction else 0, keywords_str))
+                        INSERT INTO changes (article_id, source, link, change_type, old_value, new_value, detected_at, change_summary, has_correction, correction_keywords)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (article_id, source, article['link'], 'title_changed', old_title, article['title'], now, change_summary, 1 if has_correction else 0, keywords_str))
+                    change_id = cursor.lastrowid
+                    self._save_change_diff(cursor, change_id, article_id, old_title, article['title'], '')
+                    # タイトル変更時は説明文を更新しないので、版の説明文は保存済みの値のまま
+                    self._add_revision(cursor, article_id, change_id, article['title'], old_desc, now)
 
                     stats['updated'] += 1
                     logger.info(f"タイトル変更: {old_title} → {article['title']}")
@@ -228,29 +534,45 @@ class ArticleStorage:
 
                     cursor.execute('''
                         UPDATE articles SET description = ?, last_seen = ?, has_correction = ?, correction_keywords = ?
-                        WHERE source = ? AND link = ?
-                    ''', (article['description'], now, 1 if has_correction else 0, keywords_str, source, article['link']))
+                        WHERE id = ?
+                    ''', (article['description'], now, 1 if has_correction else 0, keywords_str, article_id))
 
                     # 変更タイプを判定（空からの追加は「追記」、それ以外は「変更」）
                     change_type = 'description_added' if not old_desc else 'description_changed'
 
                     cursor.execute('''
-                        INSERT INTO changes (source, link, change_type, old_value, new_value, detected_at, change_summary, has_correction, correction_keywords)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (source, article['link'], change_type, old_desc, article['description'], now, change_summary, 1 if has_correction else 0, keywords_str))
-
-                    # 訂正の追加・削除を検出
-                    if not old_has_correction and has_correction:
+                        INSERT INTO changes (article_id, source, link, change_type, old_value, new_value, detected_at, change_summary, has_correction, correction_keywords)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (article_id, source, article['link'], change_type, old_desc, article['description'], now, change_summary, 1 if has_correction else 0, keywords_str))
+                    change_id = cursor.lastrowid
+                    self._add_revision(cursor, article_id, change_id, article['title'], article['description'], now)
+                    if needs_diff(change_type, old_desc):
+                        self._save_change_diff(cursor, change_id, article_id, old_desc, article['description'], article['title'])
+
+                    # 訂正の追加・削除を検出（記事の has_correction はタイトル変更時にも書き換わるので、
+                    # 開いている（削除されていない）訂正イベントの有無で判定する）
+                    open_event = cursor.execute(
+                        'SELECT 1 FROM correction_events WHERE article_id = ? AND removed_at IS NULL LIMIT 1',
+                        (article_id,)
+                    ).fetchone() is not None
+                    if not open_event and has_correction:
+                        self._open_correction_event(cursor, article_id, change_id, keywords_str, now, article['description'])
                         logger.info(f"🔴 訂正追加: {article['title']} [キーワード: {keywords_str}]")
                         stats['correction_added'].append((article['title'], keywords_str))
-                    elif old_has_correction and not has_correction:
+                    elif open_event and not has_correction:
                         logger.info(f"⚠️  訂正削除: {article['title']} (以前のキーワード: {keywords_str})")
                         stats['correction_removed'].append((article['title'], keywords_str))
                         # 訂正削除を記録
                         cursor.execute('''
-                            INSERT INTO changes (source, link, change_type, old_value, new_value, detected_at, change_summary, has_correction, correction_keywords)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (source, article['link'], 'correction_removed', old_desc, article['description'], now, "訂正が削除されました", 0, keywords_str))
+                            INSERT INTO changes (article_id, source, link, change_type, old_value, new_value, detected_at, change_summary, has_correction, correction_keywords)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', (article_id, source, article['link'], 'correction_removed', old_desc, article['description'], now, "訂正が削除されました", 0, keywords_str))
+                        removed_change_id = cursor.lastrowid
+                        self._save_change_diff(cursor, removed_change_id, article_id, old_desc, article['description'], '')
+                        cursor.execute('''
+                            UPDATE correction_events SET removed_at = ?, removed_change_id = ?
+                            WHERE article_id = ? AND removed_at IS NULL
+                        ''', (now, removed_change_id, article_id))
 
                     stats['updated'] += 1
                     logger.info(f"説明文変更: {article['title']}")
@@ -259,8 +581,8 @@ class ArticleStorage:
                     # 変更なし - last_seenのみ更新
                     cursor.execute('''
                         UPDATE articles SET last_seen = ?
-                        WHERE source = ? AND link = ?
-                    ''', (now, source, article['link']))
+                        WHERE id = ?
+                    ''', (now, article_id))
 
                     stats['unchanged'] += 1
 
@@ -308,33 +630,121 @@ class ArticleStorage:
         conn.close()
         return changes
 
+    def _iter_rows(self, cursor, query: str, params: tuple = (), batch_size: int = 500):
+        """クエリ結果を辞書として逐次返す（全件をメモリに載せない）"""
+        cursor.execute(query, params)
+        columns = [col[0] for col in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(columns, row))
+
     def export_to_json(self, output_path: str):
-        """全データをJSONエクスポート"""
+        """全データをJSONエクスポート（行を読みながら逐次書き込む）"""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
-        # 記事取得
-        cursor.execute('SELECT * FROM articles ORDER BY first_seen DESC')
-        articles = [dict(zip([col[0] for col in cursor.description], row))
-                   for row in cursor.fetchall()]
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write('{"articles": [')
+            for i, article in enumerate(self._iter_rows(cursor, 'SELECT * FROM articles ORDER BY first_seen DESC')):
+                f.write(('\n' if i == 0 else ',\n') + json.dumps(article, ensure_ascii=False))
+
+            f.write('],\n"changes": [')
+            for i, change in enumerate(self._iter_rows(cursor, 'SELECT * FROM changes ORDER BY detected_at DESC LIMIT 1000')):
+                f.write(('\n' if i == 0 else ',\n') + json.dumps(change, ensure_ascii=False))
 
-        # 変更履歴取得
-        cursor.execute('SELECT * FROM changes ORDER BY detected_at DESC LIMIT 1000')
-        changes = [dict(zip([col[0] for col in cursor.description], row))
-                  for row in cursor.fetchall()]
+            f.write('],\n"exported_at": ' + json.dumps(datetime.now().isoformat()) + '}\n')
 
         conn.close()
 
-        data = {
-            'articles': articles,
-            'changes': changes,
-            'exported_at': datetime.now().isoformat(),
-        }
+        logger.info(f"JSONエクスポート完了: {output_path}")
 
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+    def export_incremental(self, export_dir: str = 'data/exports') -> Dict:
+        """
+        前回エクスポート以降に追加された記事・変更をNDJSON(gzip)ファイルへ書き出す
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        ウォーターマーク（記事rowid・変更idの最大値）を export_dir/export_state.json に保存し、
+        それより新しい行だけを export_a<記事rowid>_c<変更id>.ndjson.gz（開始時のウォーターマーク）に書き出す。
+        一時ファイルに書いてから置き換えるので、ウォーターマーク更新前に中断した場合も
+        次回は同じ名前のファイルを書き直すだけで、同じ行が2回出力されることはない。
+        既存記事の更新は変更行（changes）として記録される。
 
-        logger.info(f"JSONエクスポート完了: {output_path}")
+        Returns:
+            {'articles': 書き出した記事数, 'changes': 書き出した変更数, 'path': 出力先}
+        """
+        export_dir = Path(export_dir)
+        export_dir.mkdir(parents=True, exist_ok=True)
+        state_path = export_dir / 'export_state.json'
+
+        state = {'articles_rowid': 0, 'changes_id': 0}
+        if state_path.exists():
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state.update(json.load(f))
+
+        output_path = export_dir / f"export_a{state['articles_rowid']}_c{state['changes_id']}.ndjson.gz"
+        partial_path = output_path.with_name(output_path.name + '.tmp')
+        stats = {'articles': 0, 'changes': 0, 'path': output_path}
+
+        conn = sqlite3.connect(self.db_path)
+        conn.isolation_level = None
+        cursor = conn.cursor()
+
+        # 記事と変更を同じ時点で読むため、読み取りトランザクション内で処理する
+        cursor.execute('BEGIN')
+        try:
+            with gzip.open(partial_path, 'wt', encoding='utf-8') as f:
+                for article in self._iter_rows(cursor, 'SELECT * FROM articles WHERE id > ? ORDER BY id',
+                                               (state['articles_rowid'],)):
+                    f.write(json.dumps({'type': 'article', **article}, ensure_ascii=False) + '\n')
+                    state['articles_rowid'] = article['id']
+                    stats['articles'] += 1
+
+                for change in self._iter_rows(cursor, 'SELECT * FROM changes WHERE id > ? ORDER BY id',
+                                              (state['changes_id'],)):
+                    f.write(json.dumps({'type': 'change', **change}, ensure_ascii=False) + '\n')
+                    state['changes_id'] = change['id']
+                    stats['changes'] += 1
+        finally:
+            cursor.execute('COMMIT')
+            conn.close()
+
+        # 書き込み完了後にファイルを置き換え、ウォーターマークを更新
+        # （中断時は次回同じウォーターマークから同じ名前のファイルへ書き直す）
+        partial_path.replace(output_path)
+        state['exported_at'] = datetime.now().isoformat()
+        tmp_path = state_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        tmp_path.replace(state_path)
+
+        logger.info(f"増分エクスポート完了: {output_path} (記事{stats['articles']}件, 変更{stats['changes']}件)")
+        return stats
+
+    @staticmethod
+    def cleanup_exports(export_dir: str = 'data/exports', retention_days: int = 30,
+                        legacy_dir: str = 'data') -> int:
+        """
+        保持期間を過ぎたエクスポートを削除
+
+        対象: export_dir内の増分NDJSONファイルと、legacy_dir内の旧形式フルダンプ（export_*.json）
+
+        Returns:
+            削除したファイル数
+        """
+        cutoff = datetime.now().timestamp() - retention_days * 86400
+        candidates = list(Path(export_dir).glob('export_*.ndjson.gz')) + list(Path(legacy_dir).glob('export_[0-9]*.json'))
+
+        removed = 0
+        for path in candidates:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+
+        if removed:
+            logger.info(f"古いエクスポートを削除: {removed}件")
+        return removed
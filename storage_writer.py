@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+ライトビハインド書き込みスレッド
+
+取得・解析した記事バッチを有界キューで単一の書き込みスレッドへ渡し、
+次のソースの取得・解析とDB保存（変更検出・AI分析を含む）を並行させる。
+"""
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future, wait
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# キュー終了の合図
+_STOP = object()
+
+
+class StorageWriter:
+    """ArticleStorageへの書き込みを専用スレッドで直列実行する"""
+
+    def __init__(self, storage, max_pending: int = 4):
+        """
+        Args:
+            storage: ArticleStorage
+            max_pending: 未処理バッチの上限（超えるとsubmitがブロックする）
+        """
+        self.storage = storage
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name='storage-writer', daemon=True)
+        self._submitted: List[Future] = []
+        self.metrics: List[Dict] = []
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def submit(self, source: str, articles: List[Dict[str, str]]) -> Future:
+        """
+        記事バッチを書き込みキューへ追加
+
+        キューが満杯の場合は空きができるまでブロックする（バックプレッシャー）。
+
+        Returns:
+            save_articlesの結果（stats）を返すFuture
+        """
+        future = Future()
+        self._submitted.append(future)
+        self._queue.put((source, articles, future, time.perf_counter()))
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> List[Future]:
+        """
+        投入済みの全バッチの保存完了を待つ
+
+        Returns:
+            投入順のFutureリスト（各バッチのstatsまたは例外を保持）
+        """
+        wait(self._submitted, timeout=timeout)
+        return list(self._submitted)
+
+    def close(self):
+        """キューを閉じて書き込みスレッドを終了"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def summary(self) -> Dict:
+        """バッチごとの書き込みレイテンシ集計"""
+        if not self.metrics:
+            return {'batches': 0, 'articles': 0, 'total_sec': 0.0, 'max_sec': 0.0, 'max_wait_sec': 0.0}
+        return {
+            'batches': len(self.metrics),
+            'articles': sum(m['articles'] for m in self.metrics),
+            'total_sec': sum(m['commit_sec'] for m in self.metrics),
+            'max_sec': max(m['commit_sec'] for m in self.metrics),
+            'max_wait_sec': max(m['wait_sec'] for m in self.metrics),
+        }
+
+    def _run(self):
+        """書き込みスレッド本体"""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                break
+
+            source, articles, future, enqueued_at = item
+            started_at = time.perf_counter()
+            stats, error = None, None
+            try:
+                stats = self.storage.save_articles(source, articles)
+            except Exception as e:
+                logger.error(f"書き込みエラー: {source} - {e}")
+                error = e
+            finished_at = time.perf_counter()
+
+            # メトリクスを記録してから完了を通知する（flush直後のsummaryに含めるため）
+            self.metrics.append({
+                'source': source,
+                'articles': len(articles),
+                'wait_sec': started_at - enqueued_at,
+                'commit_sec': finished_at - started_at,
+            })
+            logger.info(f"書き込み完了: {source} ({len(articles)}件, "
+                        f"待機{started_at - enqueued_at:.3f}秒, 保存{finished_at - started_at:.3f}秒)")
+
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(stats)
+            self._queue.task_done()
@@ -0,0 +1,24 @@
+{# データAPIのシャードを読み込むページ共通のスクリプト
+   formatTimestamp: ISO形式の日時 → 「2025年08月01日 12:00」、escapeHtml: テキストのエスケープ
+   loadErrorMessage: 読み込み失敗の表示（file:// で開いた場合は HTTP で配信するよう案内を添える） #}
+        function formatTimestamp(value) {
+            if (!value) return '';
+            return value.slice(0, 4) + '年' + value.slice(5, 7) + '月' + value.slice(8, 10) + '日 ' + value.slice(11, 16);
+        }
+
+        function escapeHtml(value) {
+            return String(value === null || value === undefined ? '' : value)
+                .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+        }
+
+        async function fetchJson(url) {
+            const response = await fetch(url);
+            if (!response.ok) throw new Error(url + ': ' + response.status);
+            return response.json();
+        }
+
+        function loadErrorMessage(message) {
+            if (location.protocol !== 'file:') return message;
+            return message + '<br>ファイルを直接開くとデータを読み込めません。'
+                + '<code>python3 -m http.server -d reports</code> で配信し、http://localhost:8000/ から開いてください。';
+        }
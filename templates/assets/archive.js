@@ -0,0 +1,84 @@
+{# アーカイブ: ページに埋め込んだ項目の絞り込み・検索のスクリプト #}
+        const searchBox = document.getElementById('searchBox');
+        const sourceFilters = document.querySelectorAll('.source-filter');
+        const typeFilters = document.querySelectorAll('.type-filter');
+        const articles = document.querySelectorAll('.article-card');
+        const resultCount = document.getElementById('resultCount');
+
+        let currentSource = 'all';
+        let currentType = 'all';
+        let currentSearch = '';
+
+        function filterArticles() {
+            let visibleCount = 0;
+
+            articles.forEach(article => {
+                const articleSource = article.getAttribute('data-source');
+                const hasChanged = article.getAttribute('data-changed') === '1';
+                const hasCorrection = article.getAttribute('data-correction') === '1';
+                const searchText = article.getAttribute('data-search').toLowerCase();
+
+                // ソースフィルター
+                const sourceMatch = currentSource === 'all' || articleSource === currentSource;
+
+                // タイプフィルター
+                let typeMatch = true;
+                if (currentType === 'changed') {
+                    typeMatch = hasChanged;
+                } else if (currentType === 'correction') {
+                    typeMatch = hasCorrection;
+                }
+
+                // 検索フィルター
+                const searchMatch = currentSearch === '' || searchText.includes(currentSearch);
+
+                // すべての条件を満たす場合のみ表示
+                if (sourceMatch && typeMatch && searchMatch) {
+                    article.style.display = 'block';
+                    visibleCount++;
+                } else {
+                    article.style.display = 'none';
+                }
+            });
+
+            resultCount.textContent = visibleCount;
+        }
+
+        // 検索ボックス
+        searchBox.addEventListener('input', (e) => {
+            currentSearch = e.target.value.toLowerCase();
+            filterArticles();
+        });
+
+        // ソースフィルター
+        sourceFilters.forEach(btn => {
+            btn.addEventListener('click', () => {
+                sourceFilters.forEach(b => b.classList.remove('active'));
+                btn.classList.add('active');
+                currentSource = btn.getAttribute('data-source');
+                filterArticles();
+            });
+        });
+
+        // タイプフィルター
+        typeFilters.forEach(btn => {
+            btn.addEventListener('click', () => {
+                typeFilters.forEach(b => b.classList.remove('active'));
+                btn.classList.add('active');
+                currentType = btn.getAttribute('data-type');
+                filterArticles();
+            });
+        });
+
+        // 月別一覧のソース別リンク（#source=ソース名）から開いた場合はそのソースで絞り込む
+        const hashSource = decodeURIComponent(window.location.hash.replace(/^#source=/, ''));
+        sourceFilters.forEach(btn => {
+            if (window.location.hash.startsWith('#source=') && btn.getAttribute('data-source') === hashSource) {
+                sourceFilters.forEach(b => b.classList.remove('active'));
+                btn.classList.add('active');
+                currentSource = hashSource;
+            }
+        });
+
+        // 初期表示
+        filterArticles();
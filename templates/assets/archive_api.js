@@ -0,0 +1,169 @@
+{# アーカイブ: データAPIから読み込んで表示するスクリプト #}
+        // 選択中の月（・ソース）のシャードだけをデータAPIから読み込んで表示する
+        // 2文字以上の検索語は全期間を検索インデックスで検索し、一致した記事の新しい順に最大MAX_SEARCH_RESULTS件を表示する
+        const API_BASE = API_INDEX.split('?')[0].replace(/index\.json$/, '');
+        const SEARCH_BASE = SEARCH_INDEX.split('?')[0].replace(/index\.json$/, '');
+        const MAX_SEARCH_RESULTS = 500;
+        const searchInfo = document.getElementById('searchInfo');
+        const searchBox = document.getElementById('searchBox');
+        const sourceFilters = document.querySelectorAll('.source-filter');
+        const typeFilters = document.querySelectorAll('.type-filter');
+        const monthSelect = document.getElementById('monthSelect');
+        const container = document.getElementById('articlesContainer');
+        const resultCount = document.getElementById('resultCount');
+
+        let currentSource = 'all';
+        let currentType = 'all';
+        let currentSearch = '';
+        let articleShards = [];
+        let renderToken = 0;
+        const shardCache = {};
+
+        function loadShard(entry) {
+            if (!shardCache[entry.key]) {
+                shardCache[entry.key] = fetchJson(API_BASE + entry.key + '.json?v=' + entry.digest);
+            }
+            return shardCache[entry.key];
+        }
+
+        function renderArticle(article) {
+            let html = `
+            <div class="article-card">
+                <div class="article-header">
+                    <span class="article-source">${escapeHtml(article.source)}</span>
+                    <div class="article-meta">
+                        <div>初回確認: ${formatTimestamp(article.first_seen)}</div>
+                        <div>最終確認: ${formatTimestamp(article.last_seen)}</div>
+                    </div>
+                </div>
+
+                <div class="article-title">${escapeHtml(article.title)}</div>
+                <a href="${escapeHtml(article.url)}" class="article-link" target="_blank">→ 元記事を読む（NHK）</a>
+`;
+            if (article.summary !== null) {
+                html += `                <div class="article-badges"><span class="badge badge-correction">🔴 おことわり: ${escapeHtml(article.keywords)}</span></div>
+                <div class="change-diff">
+                    <div class="diff-new">【引用】訂正部分:
+${article.summary}</div>
+                    <div style="margin-top: 10px; text-align: right;">
+                        <a href="${escapeHtml(article.url)}" target="_blank" style="color: #667eea; text-decoration: none; font-weight: bold;">→ 元記事を読む（NHK）</a>
+                    </div>
+                </div>
+`;
+            } else {
+                const description = article.description || '';
+                html += `                <div class="article-description" style="color: #718096; font-style: italic; font-size: 0.95em;">
+                    <strong>【引用】</strong> ${escapeHtml(description.slice(0, 150))}${description.length > 150 ? '...' : ''}
+                </div>
+
+                <div class="article-badges">
+                    ${article.change_count > 0 ? `<span class="badge badge-changed">変更 ${article.change_count}回</span>` : ''}
+                </div>
+`;
+            }
+            return html + `            </div>
+`;
+        }
+
+        function matchesFilters(article) {
+            if (currentSource !== 'all' && article.source !== currentSource) return false;
+            if (currentType === 'changed' && !(article.change_count > 0)) return false;
+            if (currentType === 'correction' && !article.correction) return false;
+            return true;
+        }
+
+        function matchesSearch(article) {
+            if (currentSearch === '') return true;
+            return (article.title + ' ' + (article.description || '')).toLowerCase().includes(currentSearch);
+        }
+
+        function matches(article) {
+            return matchesFilters(article) && matchesSearch(article);
+        }
+
+        async function searchArticles(token) {
+            const result = await searchDocs(currentSearch, matchesSearch, MAX_SEARCH_RESULTS);
+            if (token !== renderToken) return null;
+            if (!result.complete) {
+                searchInfo.textContent = `（全期間から検索: ${MAX_SEARCH_RESULTS}件以上が一致、新しい${MAX_SEARCH_RESULTS}件を表示）`;
+            } else {
+                searchInfo.textContent = `（全期間から検索: ${result.total}件が一致` +
+                    (result.total > MAX_SEARCH_RESULTS ? `、新しい${MAX_SEARCH_RESULTS}件を表示）` : '）');
+            }
+            return result.docs.filter(matchesFilters);
+        }
+
+        async function render() {
+            const token = ++renderToken;
+            let items;
+            if (SEARCH_INDEX && queryBigrams(currentSearch).length > 0) {
+                items = await searchArticles(token);
+            } else {
+                const entries = articleShards.filter(entry =>
+                    entry.month === monthSelect.value && (currentSource === 'all' || entry.source === currentSource));
+                const shards = await Promise.all(entries.map(loadShard));
+                searchInfo.textContent = '';
+                items = [].concat(...shards)
+                    .filter(matches)
+                    .sort((a, b) => (b.last_seen || '').localeCompare(a.last_seen || ''));
+            }
+            if (items === null || token !== renderToken) return;
+
+            container.innerHTML = items.length
+                ? items.map(renderArticle).join('')
+                : '<div class="no-results">条件に一致する記事はありません。</div>';
+            resultCount.textContent = items.length;
+        }
+
+        let searchTimer = null;
+        searchBox.addEventListener('input', (e) => {
+            currentSearch = e.target.value.toLowerCase();
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(render, 200);
+        });
+
+        sourceFilters.forEach(btn => {
+            btn.addEventListener('click', () => {
+                sourceFilters.forEach(b => b.classList.remove('active'));
+                btn.classList.add('active');
+                currentSource = btn.getAttribute('data-source');
+                render();
+            });
+        });
+
+        typeFilters.forEach(btn => {
+            btn.addEventListener('click', () => {
+                typeFilters.forEach(b => b.classList.remove('active'));
+                btn.classList.add('active');
+                currentType = btn.getAttribute('data-type');
+                render();
+            });
+        });
+
+        monthSelect.addEventListener('change', render);
+
+        // #source=ソース名 で開いた場合はそのソースで絞り込む
+        if (window.location.hash.startsWith('#source=')) {
+            const hashSource = decodeURIComponent(window.location.hash.replace(/^#source=/, ''));
+            sourceFilters.forEach(btn => {
+                if (btn.getAttribute('data-source') === hashSource) {
+                    sourceFilters.forEach(b => b.classList.remove('active'));
+                    btn.classList.add('active');
+                    currentSource = hashSource;
+                }
+            });
+        }
+
+        fetchJson(API_INDEX)
+            .then(index => {
+                articleShards = index.shards;
+                const months = [...new Set(articleShards.map(entry => entry.month))].sort().reverse();
+                monthSelect.innerHTML = months.map(month =>
+                    `<option value="${month}">${month.replace('-', '年')}月</option>`).join('');
+                monthSelect.value = months.length ? months[0] : '';
+                return render();
+            })
+            .catch(err => {
+                console.log('Data API error:', err);
+                container.innerHTML = '<div class="no-results">' + loadErrorMessage('記事を読み込めませんでした。月別一覧から各月のページを開けます。') + '</div>';
+            });
@@ -0,0 +1,52 @@
+{# おことわり: ページに埋め込んだ項目の絞り込み・検索のスクリプト #}
+        const searchBox = document.getElementById('searchBox');
+        const sourceFilters = document.querySelectorAll('.source-filter');
+        const articles = document.querySelectorAll('.article-card');
+        const resultCount = document.getElementById('resultCount');
+
+        let currentSource = 'all';
+        let currentSearch = '';
+
+        function filterArticles() {
+            let visibleCount = 0;
+
+            articles.forEach(article => {
+                const articleSource = article.getAttribute('data-source');
+                const searchText = article.getAttribute('data-search').toLowerCase();
+
+                // ソースフィルター
+                const sourceMatch = currentSource === 'all' || articleSource === currentSource;
+
+                // 検索フィルター
+                const searchMatch = currentSearch === '' || searchText.includes(currentSearch);
+
+                // すべての条件を満たす場合のみ表示
+                if (sourceMatch && searchMatch) {
+                    article.style.display = 'block';
+                    visibleCount++;
+                } else {
+                    article.style.display = 'none';
+                }
+            });
+
+            resultCount.textContent = visibleCount;
+        }
+
+        // 検索ボックス
+        searchBox.addEventListener('input', (e) => {
+            currentSearch = e.target.value.toLowerCase();
+            filterArticles();
+        });
+
+        // ソースフィルター
+        sourceFilters.forEach(btn => {
+            btn.addEventListener('click', () => {
+                sourceFilters.forEach(b => b.classList.remove('active'));
+                btn.classList.add('active');
+                currentSource = btn.getAttribute('data-source');
+                filterArticles();
+            });
+        });
+
+        // 初期表示
+        filterArticles();
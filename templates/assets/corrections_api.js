@@ -0,0 +1,76 @@
+{# おことわり: データAPIから読み込んで表示するスクリプト #}
+        // おことわり記事のシャードをデータAPIから読み込んで表示する
+        const API_BASE = API_INDEX.split('?')[0].replace(/index\.json$/, '');
+        const searchBox = document.getElementById('searchBox');
+        const sourceFilters = document.querySelectorAll('.source-filter');
+        const container = document.getElementById('articlesContainer');
+        const resultCount = document.getElementById('resultCount');
+
+        let currentSource = 'all';
+        let currentSearch = '';
+        let articles = [];
+
+        function renderArticle(article) {
+            let html = `
+            <div class="article-card">
+                <div class="article-header">
+                    <span class="article-source">${escapeHtml(article.source)}</span>
+                    <div class="article-meta">
+                        <div>初回確認: ${formatTimestamp(article.first_seen)}</div>
+                        <div>最終確認: ${formatTimestamp(article.last_seen)}</div>
+                    </div>
+                </div>
+
+                <div class="article-title">${escapeHtml(article.title)}</div>
+                <a href="${escapeHtml(article.url)}" class="article-link" target="_blank">→ 元記事を読む（NHK）</a>
+                <div class="article-badges"><span class="badge badge-correction">🔴 おことわり: ${escapeHtml(article.keywords)}</span></div>
+`;
+            if (article.summary !== null) {
+                html += `                <div class="change-diff">
+                    <div class="diff-new">【引用】おことわり部分:
+${article.summary}</div>
+                    <div style="margin-top: 10px; text-align: right;">
+                        <a href="${escapeHtml(article.url)}" target="_blank" style="color: #fc4a1a; text-decoration: none; font-weight: bold;">→ 元記事を読む（NHK）</a>
+                    </div>
+                </div>
+`;
+            }
+            return html + `            </div>
+`;
+        }
+
+        function render() {
+            const items = articles.filter(article =>
+                (currentSource === 'all' || article.source === currentSource) &&
+                (currentSearch === '' || (article.title + ' ' + (article.description || '')).toLowerCase().includes(currentSearch)));
+            container.innerHTML = items.length
+                ? items.map(renderArticle).join('')
+                : '<div class="no-results">条件に一致する記事はありません。</div>';
+            resultCount.textContent = items.length;
+        }
+
+        searchBox.addEventListener('input', (e) => {
+            currentSearch = e.target.value.toLowerCase();
+            render();
+        });
+
+        sourceFilters.forEach(btn => {
+            btn.addEventListener('click', () => {
+                sourceFilters.forEach(b => b.classList.remove('active'));
+                btn.classList.add('active');
+                currentSource = btn.getAttribute('data-source');
+                render();
+            });
+        });
+
+        fetchJson(API_INDEX)
+            .then(index => Promise.all(index.shards.map(entry =>
+                fetchJson(API_BASE + entry.key + '.json?v=' + entry.digest))))
+            .then(shards => {
+                articles = [].concat(...shards);
+                render();
+            })
+            .catch(err => {
+                console.log('Data API error:', err);
+                container.innerHTML = '<div class="no-results">' + loadErrorMessage('おことわり記事を読み込めませんでした。') + '</div>';
+            });
@@ -0,0 +1,27 @@
+{# 変更履歴: 変更の種類による絞り込みのスクリプト #}
+        let currentFilter = 'all';
+
+        function filterChanges(type) {
+            currentFilter = type;
+
+            // ボタンのアクティブ状態を更新
+            document.querySelectorAll('.filter-btn').forEach(btn => {
+                btn.classList.remove('active');
+            });
+            event.target.classList.add('active');
+
+            // カードをフィルタリング
+            const cards = document.querySelectorAll('.change-card');
+            cards.forEach(card => {
+                if (type === 'all') {
+                    card.style.display = 'block';
+                } else {
+                    const filters = card.getAttribute('data-filter');
+                    if (filters && filters.includes(type)) {
+                        card.style.display = 'block';
+                    } else {
+                        card.style.display = 'none';
+                    }
+                }
+            });
+        }
@@ -0,0 +1,45 @@
+{# 変更履歴: データAPIから読み込んで表示するスクリプト #}
+        // データAPIの日ごとのシャードを新しい順に、1回あたりLOAD_BATCH件以上になるまで読み込む
+        const API_BASE = API_INDEX.split('?')[0].replace(/index\.json$/, '');
+        const LOAD_BATCH = 100;
+        let changeShards = [];
+        let nextShard = 0;
+
+        function applyFilter(card) {
+            const filters = card.getAttribute('data-filter');
+            card.style.display = (currentFilter === 'all' || (filters && filters.includes(currentFilter))) ? 'block' : 'none';
+        }
+
+        async function loadMore() {
+            const button = document.getElementById('loadMoreBtn');
+            const container = document.getElementById('changesContainer');
+            button.disabled = true;
+            let loaded = 0;
+            while (nextShard < changeShards.length && loaded < LOAD_BATCH) {
+                const shard = changeShards[nextShard++];
+                const records = await fetchJson(API_BASE + shard.key + '.json?v=' + shard.digest);
+                const template = document.createElement('template');
+                template.innerHTML = records.map(record => record.html).join('');
+                template.content.querySelectorAll('.change-card').forEach(applyFilter);
+                container.appendChild(template.content);
+                loaded += records.length;
+            }
+            button.disabled = false;
+            button.style.display = nextShard < changeShards.length ? 'inline-block' : 'none';
+        }
+
+        document.getElementById('loadMoreBtn').addEventListener('click', loadMore);
+        fetchJson(API_INDEX)
+            .then(index => {
+                changeShards = index.shards;
+                if (changeShards.length === 0) {
+                    document.getElementById('changesContainer').innerHTML =
+                        '<div class="change-card"><div class="no-changes">まだ変更が記録されていません。</div></div>';
+                }
+                return loadMore();
+            })
+            .catch(err => {
+                console.log('Data API error:', err);
+                document.getElementById('changesContainer').innerHTML =
+                    '<div class="change-card"><div class="no-changes">' + loadErrorMessage('変更履歴を読み込めませんでした。月別一覧から各月のページを開けます。') + '</div></div>';
+            });
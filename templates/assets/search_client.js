@@ -0,0 +1,86 @@
+{# 検索インデックス（search_index.py）を引くスクリプト（アーカイブ）
+   searchIds(query): 検索語のバイグラムをすべて含む記事ID（候補）の一覧（新しい順）、loadDocs(ids): 記事IDの表示用レコード
+   searchDocs(query, matches, limit): 候補のうち matches(レコード) が真の記事（新しい順に limit 件まで） #}
+        let searchIndex = null;
+        const searchShardCache = {};
+
+        function searchShard(key) {
+            if (!searchShardCache[key]) {
+                const entry = searchIndex.entries[key];
+                searchShardCache[key] = entry
+                    ? fetchJson(SEARCH_BASE + key + '.json?v=' + entry.digest)
+                    : Promise.resolve({});
+            }
+            return searchShardCache[key];
+        }
+
+        function queryBigrams(query) {
+            const grams = new Set();
+            query.normalize('NFKC').toLowerCase().split(/\s+/).forEach(run => {
+                const chars = Array.from(run);
+                for (let i = 0; i + 1 < chars.length; i++) grams.add(chars[i] + chars[i + 1]);
+            });
+            return [...grams];
+        }
+
+        function bucketOf(gram) {
+            const chars = Array.from(gram);
+            return (chars[0].codePointAt(0) * 31 + chars[1].codePointAt(0)) % searchIndex.buckets;
+        }
+
+        function decodeIds(deltas) {
+            const ids = [];
+            let previous = 0;
+            for (const delta of deltas) {
+                previous += delta;
+                ids.push(previous);
+            }
+            return ids;
+        }
+
+        async function loadSearchIndex() {
+            if (!searchIndex) {
+                const index = await fetchJson(SEARCH_INDEX);
+                searchIndex = {buckets: index.buckets, docBlock: index.doc_block, entries: {}};
+                index.shards.forEach(entry => { searchIndex.entries[entry.key] = entry; });
+            }
+            return searchIndex;
+        }
+
+        async function searchIds(query) {
+            await loadSearchIndex();
+            const grams = queryBigrams(query);
+            const shards = await Promise.all(grams.map(gram => searchShard('grams/' + bucketOf(gram))));
+            // 記事IDの少ないバイグラムから積集合を取る
+            const lists = grams.map((gram, i) => decodeIds(shards[i][gram] || [])).sort((a, b) => a.length - b.length);
+            let ids = lists.length ? lists[0] : [];
+            for (const list of lists.slice(1)) {
+                const members = new Set(list);
+                ids = ids.filter(id => members.has(id));
+                if (ids.length === 0) break;
+            }
+            return ids.reverse();
+        }
+
+        async function loadDocs(ids) {
+            const blocks = [...new Set(ids.map(id => Math.floor(id / searchIndex.docBlock)))];
+            const docs = Object.assign({}, ...(await Promise.all(blocks.map(block => searchShard('docs/' + block)))));
+            return ids.map(id => docs[id]).filter(doc => doc);
+        }
+
+        // 候補はバイグラムをすべて含むだけ（「東京都」で「京都…東京」も候補になる）なので、
+        // 表示用レコードを新しい順にブロックごとに読み込み、本文に検索語が含まれるかを matches で確かめる。
+        // limit 件を超えたら残りのブロックは読み込まない（complete: 全候補を確かめたか）
+        async function searchDocs(query, matches, limit) {
+            const ids = await searchIds(query);
+            const docs = [];
+            let start = 0;
+            while (start < ids.length && docs.length <= limit) {
+                const block = Math.floor(ids[start] / searchIndex.docBlock);
+                let end = start;
+                while (end < ids.length && Math.floor(ids[end] / searchIndex.docBlock) === block) end++;
+                docs.push(...(await loadDocs(ids.slice(start, end))).filter(matches));
+                start = end;
+            }
+            return {docs: docs.slice(0, limit), total: docs.length, complete: start >= ids.length};
+        }
@@ -0,0 +1,16 @@
+{# アクセストラッキング（Netlify Functions の track-access。全ページ共通） #}
+    (function() {
+        try {
+            var path = window.location.pathname + window.location.search;
+            fetch('/.netlify/functions/track-access?path=' + encodeURIComponent(path), {
+                method: 'GET',
+                headers: {
+                    'Content-Type': 'application/json'
+                }
+            }).catch(function(err) {
+                console.log('Tracking skipped:', err);
+            });
+        } catch(e) {
+            console.log('Tracking error:', e);
+        }
+    })();
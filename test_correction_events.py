@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+訂正イベント（correction_events）の記録テスト
+
+取得時に記録したイベントが、記事と変更履歴から作り直したイベント（rebuild_correction_events）と
+一致するかを確かめる。タイトル変更と説明文の訂正の追加・削除が同じ取得で起きた場合を含む。
+"""
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from storage import ArticleStorage
+
+LINK = 'https://www.nhk.or.jp/shutoken-news/20250801/1000000001.html'
+BODY = '東京都内で28日、大雨の影響で道路が冠水しました。'
+CORRECTION = BODY + '※当初の掲載で、地名に誤りがありました。'
+
+# シナリオ名 → 取得ごとの（タイトル, 説明文）
+SCENARIOS = {
+    'タイトル変更と訂正の追加が同時 → 次回も同じ内容': [
+        ('大雨で道路冠水', BODY),
+        ('都内で大雨 道路冠水', CORRECTION),
+        ('都内で大雨 道路冠水', CORRECTION),
+    ],
+    'タイトル変更と訂正の削除が同時 → 次回も同じ内容': [
+        ('大雨で道路冠水', CORRECTION),
+        ('都内で大雨 道路冠水', BODY),
+        ('都内で大雨 道路冠水', BODY),
+    ],
+    '説明文だけの訂正の追加・削除': [
+        ('大雨で道路冠水', BODY),
+        ('大雨で道路冠水', CORRECTION),
+        ('大雨で道路冠水', BODY),
+    ],
+}
+
+EVENT_COLUMNS = 'article_id, change_id, rule_id, keywords, detected_at, removed_at, removed_change_id, excerpt'
+
+
+def load_events(conn: sqlite3.Connection):
+    return conn.execute(f'SELECT {EVENT_COLUMNS} FROM correction_events ORDER BY article_id, detected_at').fetchall()
+
+
+def run_scenario(fetches) -> bool:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / 'articles.db')
+        storage = ArticleStorage(db_path)
+        for title, description in fetches:
+            storage.save_articles('NHK首都圏ニュース', [
+                {'link': LINK, 'title': title, 'description': description, 'pubDate': ''}
+            ])
+
+        conn = sqlite3.connect(db_path)
+        try:
+            ingested = load_events(conn)
+            ArticleStorage.rebuild_correction_events(conn)
+            rebuilt = load_events(conn)
+        finally:
+            conn.close()
+
+    ok = ingested == rebuilt
+    print(f"  取得時: {len(ingested)}件, 作り直し: {len(rebuilt)}件")
+    if not ok:
+        for label, events in (('取得時', ingested), ('作り直し', rebuilt)):
+            for event in events:
+                print(f"    {label}: {event}")
+    return ok
+
+
+def main():
+    """テスト実行"""
+    print("=" * 60)
+    print("訂正イベントの記録テスト")
+    print("=" * 60)
+
+    failed = 0
+    for name, fetches in SCENARIOS.items():
+        print(f"\n{name}")
+        if run_scenario(fetches):
+            print("  ✅ 一致")
+        else:
+            print("  ❌ 不一致")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print("✅ すべて一致しました" if not failed else f"❌ {failed}件のシナリオで不一致")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
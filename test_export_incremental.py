@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+増分エクスポート（export_incremental）のテスト
+
+ファイルを書き出した後、ウォーターマークを更新する前に中断した場合を再現し、
+次回の実行で同じ行が重複して出力されないことを確かめる。
+"""
+import gzip
+import json
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from storage import ArticleStorage
+
+SOURCE = 'NHK首都圏ニュース'
+
+
+def article(number, title, description='東京都内で大雨の影響が出ています。'):
+    link = f'https://www.nhk.or.jp/shutoken-news/20250801/{1000000000 + number}.html'
+    return {'link': link, 'title': title, 'description': description, 'pubDate': ''}
+
+
+def exported_rows(export_dir: Path):
+    """書き出されたすべての行（種類, id）"""
+    rows = []
+    for path in sorted(export_dir.glob('export_*.ndjson.gz')):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            rows.extend((record['type'], record['id']) for record in map(json.loads, f))
+    return rows
+
+
+def main():
+    """テスト実行"""
+    print("=" * 60)
+    print("増分エクスポートのテスト（ウォーターマーク更新前の中断）")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export_dir = Path(tmp) / 'exports'
+        state_path = export_dir / 'export_state.json'
+        db_path = str(Path(tmp) / 'articles.db')
+        storage = ArticleStorage(db_path)
+
+        storage.save_articles(SOURCE, [article(1, '大雨で道路冠水'), article(2, '熱中症で搬送')])
+        storage.export_incremental(str(export_dir))
+        committed_state = state_path.read_text(encoding='utf-8')
+
+        # 2回目: ファイルは書き出したが、ウォーターマークを更新する前に中断した
+        storage.save_articles(SOURCE, [article(1, '都内で大雨 道路冠水'), article(3, '台風接近')])
+        storage.export_incremental(str(export_dir))
+        state_path.write_text(committed_state, encoding='utf-8')
+
+        # 再実行（中断後にさらに行が増えている）
+        storage.save_articles(SOURCE, [article(4, '電車の運転見合わせ')])
+        storage.export_incremental(str(export_dir))
+        # 追加の行がない実行
+        storage.export_incremental(str(export_dir))
+
+        rows = exported_rows(export_dir)
+        conn = sqlite3.connect(db_path)
+        expected = ([('article', row[0]) for row in conn.execute('SELECT id FROM articles ORDER BY id')]
+                    + [('change', row[0]) for row in conn.execute('SELECT id FROM changes ORDER BY id')])
+        conn.close()
+        leftovers = list(export_dir.glob('*.tmp'))
+
+    checks = [
+        (f"書き出した行 {len(rows)}件（重複 {len(rows) - len(set(rows))}件）", len(rows) == len(set(rows))),
+        (f"すべての記事・変更を書き出し（{len(expected)}件）", sorted(set(rows)) == expected),
+        (f"一時ファイルの残り {len(leftovers)}件", not leftovers),
+    ]
+    failed = 0
+    for label, ok in checks:
+        print(f"  {'✅' if ok else '❌'} {label}")
+        failed += not ok
+
+    print("\n" + "=" * 60)
+    print("✅ すべて成功しました" if not failed else f"❌ {failed}件失敗")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
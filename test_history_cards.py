@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+変更履歴ページのカードのテスト
+
+同じ取得（save_articles の1回の呼び出し）に同じ記事が2回現れた場合も、変更1件につき
+カードが1枚になること（記事の版との結合で行が増えないこと）を確かめる。
+"""
+import tempfile
+from pathlib import Path
+
+from cold_storage import connect_with_archives
+from generate_history import fetch_all_changes, render_change_cards
+from storage import ArticleStorage
+
+SOURCE = 'NHK首都圏ニュース'
+LINK = 'https://www.nhk.or.jp/shutoken-news/20250801/1000000001.html'
+OTHER_LINK = 'https://www.nhk.or.jp/shutoken-news/20250801/1000000002.html'
+BODY = '東京都内で28日、大雨の影響で道路が冠水しました。'
+
+
+def article(link, title, description):
+    return {'link': link, 'title': title, 'description': description, 'pubDate': ''}
+
+
+# 取得ごとの記事の一覧
+FETCHES = [
+    [article(LINK, '大雨で道路冠水', BODY), article(OTHER_LINK, '熱中症で搬送', '県内で熱中症の疑い。')],
+    # 同じ記事が1回の取得に2回（説明文が違う）
+    [article(LINK, '大雨で道路冠水', BODY + '交通に影響が出ています。'),
+     article(LINK, '大雨で道路冠水', BODY + '交通に影響が出ています。けが人はいません。'),
+     article(OTHER_LINK, '熱中症で搬送相次ぐ', '県内で熱中症の疑い。')],
+    [article(LINK, '都内で大雨 道路冠水', BODY + '交通に影響が出ています。けが人はいません。')],
+]
+
+
+def main():
+    """テスト実行"""
+    print("=" * 60)
+    print("変更履歴カードのテスト（同じ取得に同じ記事が2回）")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / 'articles.db'
+        storage = ArticleStorage(str(db_path))
+        for articles in FETCHES:
+            storage.save_articles(SOURCE, articles)
+
+        conn = connect_with_archives(db_path)
+        try:
+            expected = conn.execute('''
+                SELECT COUNT(*) FROM changes
+                WHERE change_type IN ('title_changed', 'description_changed', 'description_added', 'correction_removed')
+            ''').fetchone()[0]
+            zero_length = conn.execute(
+                'SELECT COUNT(*) FROM article_revisions WHERE revision > 1 AND valid_from = valid_to'
+            ).fetchone()[0]
+            changes = fetch_all_changes(conn)
+            ids = [change['id'] for change in changes]
+            cards = render_change_cards(changes)
+            ordered = all(change['before_change_time'] <= change['after_change_time'] for change in changes)
+            columns = 'article_id, revision, change_id, title, description, valid_from, valid_to'
+            ingested = conn.execute(f'SELECT {columns} FROM article_revisions ORDER BY article_id, revision').fetchall()
+            ArticleStorage.rebuild_article_revisions(conn)
+            rebuilt = conn.execute(f'SELECT {columns} FROM article_revisions ORDER BY article_id, revision').fetchall()
+        finally:
+            conn.close()
+
+    checks = [
+        (f"変更 {expected}件 → 行 {len(ids)}件", len(ids) == expected and len(set(ids)) == len(ids)),
+        (f"カード {len(cards)}枚", len(cards) == expected),
+        (f"長さ0の版 {zero_length}件", zero_length == 0),
+        ("変更前確認 ≦ 変更後確認", ordered),
+        (f"版: 取得時 {len(ingested)}件, 作り直し {len(rebuilt)}件", ingested == rebuilt),
+    ]
+    failed = 0
+    for label, ok in checks:
+        print(f"  {'✅' if ok else '❌'} {label}")
+        failed += not ok
+
+    print("\n" + "=" * 60)
+    print("✅ すべて成功しました" if not failed else f"❌ {failed}件失敗")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+"""
+変更差分の計算
+
+説明文・タイトルの変更差分を、変更の記録時（ArticleStorage.save_articles）に一度だけ計算して
+change_diffs テーブルに保存する。表示側（generate_history.py 等）は保存済みの差分から
+HTMLを組み立てるだけで、過去の変更について差分計算をやり直さない。
+
+保存するのは表示用に加工したテキスト（訂正部分の抜粋・タイトル重複の除去後）と、
+その間の変更区間（opcodes）のみ。一致区間はopcodesの隙間として復元する。
+
+差分はMyersのO(ND)アルゴリズム（線形空間の中間スネーク分割）で計算する。
+まずテキストを文字種の連続（漢字・ひらがな・カタカナ・数字・英字・記号）に区切ったトークン単位で差分を取り、
+置き換えられたトークンの中だけを文字単位で差分し直す（辞書は使わない）。
+共通の先頭・末尾を先に除き、最後に短すぎる一致区間を変更に吸収する意味的クリーンアップを行う。
+時間予算を超えた場合は、文単位の粗い差分に切り替える。
+"""
+import re
+import json
+import time
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from correction_rules import get_engine
+
+# 差分アルゴリズムの識別子（change_diffs.algorithm）
+# 'difflib' はSequenceMatcherで計算していた頃、'myers' は文字単位のみで計算していた頃の保存済み差分
+DIFF_ALGORITHM = 'myers-segment'
+DIFF_ALGORITHM_CHAR = 'myers'
+DIFF_ALGORITHM_FALLBACK = 'myers-sentence'
+
+# 文字単位の差分に使う時間予算（秒）。超えた場合は文単位の差分に切り替える
+DIFF_TIME_BUDGET = 0.5
+
+# 差分の操作
+DIFF_DELETE = -1
+DIFF_EQUAL = 0
+DIFF_INSERT = 1
+
+# 置き換え区間を文字単位で細分化する条件（一致する文字数 / 短い方の文字数）
+SEGMENT_REFINE_RATIO = 0.5
+
+# 文字種の連続（トークン）: 漢字（々〆〇ヶを含む）/ ひらがな / カタカナ（半角・長音を含む）/ 数字 / 英字 / 空白
+# それ以外の記号・句読点は1文字ずつ
+_SCRIPT_RUN_PATTERN = re.compile(
+    r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff々〆〇ヶ]+'
+    r'|[\u3041-\u309f]+'
+    r'|[\u30a1-\u30f5\u30f7-\u30ff\u31f0-\u31ff\uff66-\uff9f]+'
+    r'|[0-9０-９]+'
+    r'|[A-Za-zＡ-Ｚａ-ｚ]+'
+    r'|\s+'
+    r'|.',
+    re.DOTALL
+)
+
+# 差分を保存する変更タイプ（追記は差分ではなく追記内容のみを表示する）
+DIFF_CHANGE_TYPES = ('title_changed', 'description_changed', 'correction_removed')
+
+
+class ChangeDiff(NamedTuple):
+    """保存済みの変更差分"""
+    old_text: str                              # 表示用に加工した変更前テキスト
+    new_text: str                              # 表示用に加工した変更後テキスト
+    opcodes: List[Tuple[int, int, int, int]]   # 一致しない区間 (i1, i2, j1, j2)
+    has_correction_keywords: bool              # 訂正の目印を含むか（抜粋表示の切り替え）
+    title: str                                 # タイトル重複の除去に使ったタイトル
+    algorithm: str = DIFF_ALGORITHM            # 差分を計算したアルゴリズム
+
+
+class DiffTimeout(Exception):
+    """差分計算が時間予算を超えた"""
+
+
+def extract_correction_summary(text, max_length=200):
+    """※や失礼しましたを含む文をすべて抽出（著作権対応）"""
+    if not text:
+        return ''
+
+    correction_rules = get_engine()
+
+    # 文を分割
+    sentences = text.replace('。', '。\n').split('\n')
+
+    # ※を含む文と「失礼しました」を含む文を抽出
+    correction_sentences = []
+    for sentence in sentences:
+        if correction_rules.has_marker(sentence):
+            correction_sentences.append(sentence.strip())
+
+    if correction_sentences:
+        # 訂正文を結合
+        result = '\n'.join(correction_sentences)
+
+        # 長すぎる場合は各文を短縮
+        if len(result) > max_length:
+            shortened = []
+            for sent in correction_sentences:
+                if correction_rules.apology_marker in sent:
+                    # 訂正のおことわり文は全文表示
+                    shortened.append(sent)
+                elif correction_rules.notice_marker in sent:
+                    # ※を含む文は前後を含めて表示
+                    idx = sent.find(correction_rules.notice_marker)
+                    start = max(0, idx - 30)
+                    end = min(len(sent), idx + 70)
+                    excerpt = sent[start:end]
+                    if start > 0:
+                        excerpt = '...' + excerpt
+                    if end < len(sent):
+                        excerpt = excerpt + '...'
+                    shortened.append(excerpt)
+            result = '\n'.join(shortened)
+
+        return result
+    else:
+        # 訂正マーカーがない場合は先頭から
+        if len(text) > max_length:
+            return text[:max_length] + '...'
+        return text
+
+
+def remove_duplicate_title(text, title):
+    """テキストの末尾に重複しているタイトルを除去"""
+    if not text or not title:
+        return text
+
+    # タイトルを正規化
+    normalized_title = title.strip()
+    normalized_text = text.strip()
+
+    # 完全一致チェック
+    if normalized_text.endswith(normalized_title):
+        text_without_title = normalized_text[:-len(normalized_title)].rstrip('\n').rstrip()
+        return text_without_title
+
+    # 部分一致チェック（タイトルの80%以上が末尾に含まれる場合）
+    # 空白や助詞の違いを吸収
+    title_words = normalized_title.replace(' ', '').replace('　', '')
+
+    # テキストの末尾から100文字を取得して比較
+    text_end = normalized_text[-min(len(normalized_text), len(normalized_title) + 50):]
+    text_end_normalized = text_end.replace(' ', '').replace('　', '').replace('\n', '')
+
+    # タイトルの主要部分（最初の文字と最後の文字）が含まれているか
+    if title_words and len(title_words) > 3:
+        # タイトルの70%以上がテキスト末尾に含まれているか確認
+        matching_chars = sum(1 for c in title_words if c in text_end_normalized)
+        similarity = matching_chars / len(title_words)
+
+        if similarity > 0.7 and text_end_normalized.endswith(title_words[-10:]):
+            # 末尾の類似部分を探して除去
+            # 最後の改行以降を除去
+            parts = normalized_text.rsplit('\n', 1)
+            if len(parts) == 2 and len(parts[1].strip()) < len(normalized_title) + 20:
+                return parts[0].rstrip()
+
+    return text
+
+
+def needs_diff(change_type: str, old_value: Optional[str]) -> bool:
+    """差分を保存する変更か（説明文の追記・空からの変更は追記表示なので不要）"""
+    return change_type in DIFF_CHANGE_TYPES and bool(old_value)
+
+
+def _common_prefix(a: Sequence, b: Sequence) -> int:
+    """共通の先頭の長さ（スライス比較の二分探索）"""
+    if not a or not b or a[0] != b[0]:
+        return 0
+    lo, hi = 0, min(len(a), len(b))
+    mid = hi
+    start = 0
+    while lo < mid:
+        if a[start:mid] == b[start:mid]:
+            lo = mid
+            start = lo
+        else:
+            hi = mid
+        mid = (hi - lo) // 2 + lo
+    return mid
+
+
+def _common_suffix(a: Sequence, b: Sequence) -> int:
+    """共通の末尾の長さ（スライス比較の二分探索）"""
+    if not a or not b or a[-1] != b[-1]:
+        return 0
+    lo, hi = 0, min(len(a), len(b))
+    mid = hi
+    end = 0
+    while lo < mid:
+        if a[len(a) - mid:len(a) - end] == b[len(b) - mid:len(b) - end]:
+            lo = mid
+            end = lo
+        else:
+            hi = mid
+        mid = (hi - lo) // 2 + lo
+    return mid
+
+
+def _bisect(a: Sequence, b: Sequence, deadline: Optional[float]) -> Optional[Tuple[int, int]]:
+    """
+    Myersの中間スネークを前後両方向から探索し、分割点 (x, y) を返す
+
+    共通部分が全くない場合はNone（全体を置換とする）。
+    deadlineを過ぎた場合はDiffTimeoutを送出する。
+    """
+    n, m = len(a), len(b)
+    max_d = (n + m + 1) // 2
+    v_offset = max_d
+    v_length = 2 * max_d
+    v1 = [-1] * v_length
+    v2 = [-1] * v_length
+    v1[v_offset + 1] = 0
+    v2[v_offset + 1] = 0
+    delta = n - m
+    # 差が奇数なら前方向の探索で、偶数なら後方向の探索で重なりを確認する
+    front = delta % 2 != 0
+    k1start = k1end = k2start = k2end = 0
+
+    for d in range(max_d):
+        if deadline is not None and time.perf_counter() > deadline:
+            raise DiffTimeout()
+
+        # 前方向
+        for k1 in range(-d + k1start, d + 1 - k1end, 2):
+            k1_offset = v_offset + k1
+            if k1 == -d or (k1 != d and v1[k1_offset - 1] < v1[k1_offset + 1]):
+                x1 = v1[k1_offset + 1]
+            else:
+                x1 = v1[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[x1] == b[y1]:
+                x1 += 1
+                y1 += 1
+            v1[k1_offset] = x1
+            if x1 > n:
+                k1end += 2
+            elif y1 > m:
+                k1start += 2
+            elif front:
+                k2_offset = v_offset + delta - k1
+                if 0 <= k2_offset < v_length and v2[k2_offset] != -1:
+                    if x1 >= n - v2[k2_offset]:
+                        return x1, y1
+
+        # 後方向
+        for k2 in range(-d + k2start, d + 1 - k2end, 2):
+            k2_offset = v_offset + k2
+            if k2 == -d or (k2 != d and v2[k2_offset - 1] < v2[k2_offset + 1]):
+                x2 = v2[k2_offset + 1]
+            else:
+                x2 = v2[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[n - x2 - 1] == b[m - y2 - 1]:
+                x2 += 1
+                y2 += 1
+            v2[k2_offset] = x2
+            if x2 > n:
+                k2end += 2
+            elif y2 > m:
+                k2start += 2
+            elif not front:
+                k1_offset = v_offset + delta - k2
+                if 0 <= k1_offset < v_length and v1[k1_offset] != -1:
+                    x1 = v1[k1_offset]
+                    y1 = v_offset + x1 - k1_offset
+                    if x1 >= n - x2:
+                        return x1, y1
+
+    return None
+
+
+def _diff(a: Sequence, b: Sequence, deadline: Optional[float]) -> List[Tuple[int, Sequence]]:
+    """a から b への差分を [(操作, 要素列), ...] で返す（先頭・末尾の一致を除いてから中間を分割）"""
+    if a == b:
+        return [(DIFF_EQUAL, a)] if a else []
+
+    prefix = _common_prefix(a, b)
+    suffix = _common_suffix(a[prefix:], b[prefix:])
+    a_mid = a[prefix:len(a) - suffix]
+    b_mid = b[prefix:len(b) - suffix]
+
+    diffs = []
+    if prefix:
+        diffs.append((DIFF_EQUAL, a[:prefix]))
+
+    if not a_mid:
+        diffs.append((DIFF_INSERT, b_mid))
+    elif not b_mid:
+        diffs.append((DIFF_DELETE, a_mid))
+    else:
+        split = _bisect(a_mid, b_mid, deadline) if len(a_mid) > 1 or len(b_mid) > 1 else None
+        if split is None:
+            diffs.append((DIFF_DELETE, a_mid))
+            diffs.append((DIFF_INSERT, b_mid))
+        else:
+            x, y = split
+            diffs.extend(_diff(a_mid[:x], b_mid[:y], deadline))
+            diffs.extend(_diff(a_mid[x:], b_mid[y:], deadline))
+
+    if suffix:
+        diffs.append((DIFF_EQUAL, a[len(a) - suffix:]))
+    return diffs
+
+
+def _concat(parts: List[Sequence]) -> Sequence:
+    """文字列またはトークン列を連結"""
+    if isinstance(parts[0], str):
+        return ''.join(parts)
+    return [item for part in parts for item in part]
+
+
+def _merge(diffs: List[Tuple[int, Sequence]]) -> List[Tuple[int, Sequence]]:
+    """同じ操作の連続をまとめ、一致区間の間は「削除→追加」の順に並べる"""
+    merged = []
+    deleted = []
+    inserted = []
+
+    def flush():
+        if deleted:
+            merged.append((DIFF_DELETE, _concat(deleted)))
+        if inserted:
+            merged.append((DIFF_INSERT, _concat(inserted)))
+        deleted.clear()
+        inserted.clear()
+
+    for op, items in diffs:
+        if not items:
+            continue
+        if op == DIFF_DELETE:
+            deleted.append(items)
+        elif op == DIFF_INSERT:
+            inserted.append(items)
+        else:
+            flush()
+            if merged and merged[-1][0] == DIFF_EQUAL:
+                merged[-1] = (DIFF_EQUAL, merged[-1][1] + items)
+            else:
+                merged.append((DIFF_EQUAL, items))
+    flush()
+    return merged
+
+
+def _cleanup_semantic(diffs: List[Tuple[int, Sequence]]) -> List[Tuple[int, Sequence]]:
+    """
+    意味的クリーンアップ
+
+    前後の変更のどちらよりも短い一致区間（「の」「、」などの偶然の一致）を変更に吸収し、
+    細切れのハイライトを読みやすいまとまりにする。
+    """
+    diffs = list(diffs)
+    changed = False
+    equalities = []          # 一致区間の位置のスタック
+    last_equality = None
+    pointer = 0
+    # 直前の一致区間より前（1）と後（2）の変更量
+    inserted1 = deleted1 = 0
+    inserted2 = deleted2 = 0
+
+    while pointer < len(diffs):
+        op, items = diffs[pointer]
+        if op == DIFF_EQUAL:
+            equalities.append(pointer)
+            inserted1, deleted1 = inserted2, deleted2
+            inserted2 = deleted2 = 0
+            last_equality = items
+        else:
+            if op == DIFF_INSERT:
+                inserted2 += len(items)
+            else:
+                deleted2 += len(items)
+            if (last_equality and len(last_equality) <= max(inserted1, deleted1)
+                    and len(last_equality) <= max(inserted2, deleted2)):
+                # 一致区間を「削除＋追加」に置き換える
+                position = equalities.pop()
+                diffs[position] = (DIFF_DELETE, last_equality)
+                diffs.insert(position + 1, (DIFF_INSERT, last_equality))
+                # 一つ前の一致区間から再評価する
+                if equalities:
+                    equalities.pop()
+                pointer = equalities[-1] if equalities else -1
+                inserted1 = deleted1 = inserted2 = deleted2 = 0
+                last_equality = None
+                changed = True
+        pointer += 1
+
+    return _merge(diffs) if changed else diffs
+
+
+def _to_opcodes(diffs: List[Tuple[int, Sequence]], old_offsets: Optional[List[int]] = None,
+                new_offsets: Optional[List[int]] = None) -> List[Tuple[int, int, int, int]]:
+    """
+    差分を一致しない区間 (i1, i2, j1, j2) の列に変換
+
+    old_offsets / new_offsets を渡した場合は要素番号を文字オフセットに換算する（文単位の差分用）。
+    """
+    opcodes = []
+    i = j = 0
+    start = None
+    for op, items in _merge(diffs):
+        if op == DIFF_EQUAL:
+            if start is not None:
+                opcodes.append((start[0], i, start[1], j))
+                start = None
+            i += len(items)
+            j += len(items)
+        else:
+            if start is None:
+                start = (i, j)
+            if op == DIFF_DELETE:
+                i += len(items)
+            else:
+                j += len(items)
+    if start is not None:
+        opcodes.append((start[0], i, start[1], j))
+
+    if old_offsets is not None:
+        opcodes = [(old_offsets[i1], old_offsets[i2], new_offsets[j1], new_offsets[j2])
+                   for i1, i2, j1, j2 in opcodes]
+    return opcodes
+
+
+def split_sentences(text: str) -> List[str]:
+    """文単位（。と改行の直後で区切る）に分割（時間予算超過時の粗い差分用）"""
+    return [sentence for sentence in re.split(r'(?<=[。\n])', text) if sentence]
+
+
+def split_script_runs(text: str) -> List[str]:
+    """文字種の連続ごとに分割（連結すると元のテキストに戻る）"""
+    return _SCRIPT_RUN_PATTERN.findall(text)
+
+
+def _segment_diff(old_text: str, new_text: str, deadline: Optional[float]) -> List[Tuple[int, Sequence]]:
+    """
+    文字種トークン単位で差分を取り、置き換えられた区間の中だけを文字単位で差分し直す
+
+    トークン単位では「の」「量」などの偶然の一致が語の途中で拾われないため、変更箇所が細切れになりにくい。
+    置き換え区間は、文字単位の一致が短い方の SEGMENT_REFINE_RATIO 以上ある場合（「3人→5人」「小池→吉村」の
+    ような語の一部の変更）だけ文字単位の結果を使い、それ以外は語のまとまりのまま置き換えとして表示する。
+    結果は文字列単位の差分として返す。
+    """
+    token_diffs = _diff(split_script_runs(old_text), split_script_runs(new_text), deadline)
+    diffs = _cleanup_semantic(_merge([(op, ''.join(tokens)) for op, tokens in token_diffs]))
+
+    refined = []
+    index = 0
+    while index < len(diffs):
+        op, text = diffs[index]
+        if op == DIFF_DELETE and index + 1 < len(diffs) and diffs[index + 1][0] == DIFF_INSERT:
+            inserted = diffs[index + 1][1]
+            char_diffs = _cleanup_semantic(_diff(text, inserted, deadline))
+            common = sum(len(items) for char_op, items in char_diffs if char_op == DIFF_EQUAL)
+            if common >= SEGMENT_REFINE_RATIO * min(len(text), len(inserted)):
+                refined.extend(char_diffs)
+            else:
+                refined.extend(diffs[index:index + 2])
+            index += 2
+            continue
+        refined.append((op, text))
+        index += 1
+    return refined
+
+
+def _offsets(tokens: List[str]) -> List[int]:
+    """トークン番号 → 文字オフセットの対応表（末尾を含む）"""
+    offsets = [0]
+    for token in tokens:
+        offsets.append(offsets[-1] + len(token))
+    return offsets
+
+
+def compute_opcodes_with_algorithm(old_text: str, new_text: str,
+                                   time_budget: Optional[float] = DIFF_TIME_BUDGET,
+                                   segmented: bool = True) -> Tuple[List[Tuple[int, int, int, int]], str]:
+    """
+    差分のうち、一致しない区間（文字オフセット）だけを返す
+
+    Args:
+        segmented: Falseなら文字種トークンを使わず最初から文字単位で差分を取る（比較用）
+
+    Returns:
+        (opcodes, 使用したアルゴリズム)
+    """
+    deadline = time.perf_counter() + time_budget if time_budget else None
+    try:
+        if segmented:
+            diffs = _segment_diff(old_text, new_text, deadline)
+            algorithm = DIFF_ALGORITHM
+        else:
+            diffs = _diff(old_text, new_text, deadline)
+            algorithm = DIFF_ALGORITHM_CHAR
+        return _to_opcodes(_cleanup_semantic(diffs)), algorithm
+    except DiffTimeout:
+        # 文単位の差分（要素数が少ないので時間予算なしで計算する）
+        old_tokens = split_sentences(old_text)
+        new_tokens = split_sentences(new_text)
+        diffs = _diff(old_tokens, new_tokens, None)
+        return _to_opcodes(diffs, _offsets(old_tokens), _offsets(new_tokens)), DIFF_ALGORITHM_FALLBACK
+
+
+def compute_opcodes(old_text: str, new_text: str,
+                    time_budget: Optional[float] = DIFF_TIME_BUDGET) -> List[Tuple[int, int, int, int]]:
+    """文字単位の差分のうち、一致しない区間だけを返す"""
+    return compute_opcodes_with_algorithm(old_text, new_text, time_budget)[0]
+
+
+def compute_change_diff(old_value: Optional[str], new_value: Optional[str], title: Optional[str] = None) -> ChangeDiff:
+    """
+    変更前後の値から表示用の差分を計算
+
+    訂正の目印（※・失礼しました）を含む場合は訂正部分の抜粋同士、
+    それ以外は全文同士で差分を取る。どちらも末尾に重複したタイトルは除去する。
+    """
+    old_value = old_value or ''
+    new_value = new_value or ''
+    title = title or ''
+
+    correction_rules = get_engine()
+    has_correction_keywords = correction_rules.has_marker(old_value) or correction_rules.has_marker(new_value)
+
+    if has_correction_keywords:
+        # 訂正記事の場合は訂正部分を優先的に抽出（著作権対応）
+        old_text = extract_correction_summary(old_value, 200) if old_value else ''
+        new_text = extract_correction_summary(new_value, 200) if new_value else ''
+    else:
+        old_text = old_value
+        new_text = new_value
+
+    if title:
+        old_text = remove_duplicate_title(old_text, title)
+        new_text = remove_duplicate_title(new_text, title)
+
+    opcodes, algorithm = compute_opcodes_with_algorithm(old_text, new_text)
+    return ChangeDiff(old_text, new_text, opcodes, has_correction_keywords, title, algorithm)
+
+
+def is_unchanged(diff: ChangeDiff) -> bool:
+    """タイトル重複除去後に差分がなくなったか（HTMLタグ相当の文字列を除いて比較）"""
+    old_plain = re.sub(r'<[^>]+>', '', diff.old_text).strip()
+    new_plain = re.sub(r'<[^>]+>', '', diff.new_text).strip()
+    return old_plain == new_plain
+
+
+class DiffSpan(NamedTuple):
+    """片側（変更前または変更後）のテキスト上の区間"""
+    offset: int
+    length: int
+    op: int      # DIFF_EQUAL / DIFF_DELETE（変更前側）/ DIFF_INSERT（変更後側）
+
+
+def diff_spans(diff: ChangeDiff) -> Tuple[List[DiffSpan], List[DiffSpan]]:
+    """opcodesを変更前・変更後それぞれの区間列に変換"""
+    old_spans = []
+    new_spans = []
+    i = j = 0
+    for i1, i2, j1, j2 in diff.opcodes:
+        if i1 > i:
+            old_spans.append(DiffSpan(i, i1 - i, DIFF_EQUAL))
+        if j1 > j:
+            new_spans.append(DiffSpan(j, j1 - j, DIFF_EQUAL))
+        if i2 > i1:
+            old_spans.append(DiffSpan(i1, i2 - i1, DIFF_DELETE))
+        if j2 > j1:
+            new_spans.append(DiffSpan(j1, j2 - j1, DIFF_INSERT))
+        i, j = i2, j2
+    if len(diff.old_text) > i:
+        old_spans.append(DiffSpan(i, len(diff.old_text) - i, DIFF_EQUAL))
+    if len(diff.new_text) > j:
+        new_spans.append(DiffSpan(j, len(diff.new_text) - j, DIFF_EQUAL))
+    return old_spans, new_spans
+
+
+def clip_spans(spans: List[DiffSpan], start: int, end: int) -> List[DiffSpan]:
+    """区間列を [start, end) の範囲に切り詰める"""
+    clipped = []
+    for span in spans:
+        span_start = max(span.offset, start)
+        span_end = min(span.offset + span.length, end)
+        if span_start < span_end:
+            clipped.append(DiffSpan(span_start, span_end - span_start, span.op))
+    return clipped
+
+
+_SPAN_CLASSES = {
+    DIFF_DELETE: 'diff-removed',   # 削除された部分（赤背景）
+    DIFF_INSERT: 'diff-added',     # 追加された部分（緑背景）
+}
+
+
+def render_spans(text: str, spans: List[DiffSpan]) -> str:
+    """区間列からHTMLを組み立てる（変更区間をspanで囲む）"""
+    html = []
+    for span in spans:
+        chunk = text[span.offset:span.offset + span.length]
+        if span.op == DIFF_EQUAL:
+            html.append(chunk)
+        else:
+            html.append(f'<span class="{_SPAN_CLASSES[span.op]}">{chunk}</span>')
+    return ''.join(html)
+
+
+def render_char_level_diff(diff: ChangeDiff) -> Tuple[str, str]:
+    """保存済みの差分から、変更箇所をspanで囲んだ変更前・変更後のHTMLを組み立てる"""
+    old_spans, new_spans = diff_spans(diff)
+    return render_spans(diff.old_text, old_spans), render_spans(diff.new_text, new_spans)
+
+
+def render_diff_window(diff: ChangeDiff, context_chars: int = 200) -> Tuple[str, str]:
+    """
+    変更箇所の前後だけを切り出してHTMLにする（著作権対応） - 両方で同じ開始位置から表示
+
+    開始位置は最初の変更箇所の context_chars 文字前（末尾への追記のみの場合は変更前の末尾 context_chars 文字）。
+    そこから context_chars * 3 文字までを表示し、省略した側に「...」を付ける。
+    切り出しはテキスト上の区間で行うので、変更箇所の途中で切れてもspanは閉じた状態で出力される。
+    """
+    old_spans, new_spans = diff_spans(diff)
+    first_removed = next((span.offset for span in old_spans if span.op == DIFF_DELETE), None)
+    first_added = next((span.offset for span in new_spans if span.op == DIFF_INSERT), None)
+
+    if first_removed is None and first_added is None:
+        # 変更なしの場合は最初のcontext_chars文字
+        return (diff.old_text[:context_chars] + ('...' if len(diff.old_text) > context_chars else ''),
+                diff.new_text[:context_chars] + ('...' if len(diff.new_text) > context_chars else ''))
+
+    if first_removed is not None and first_added is not None:
+        # 置換の場合：両方の変更箇所のうち早い方の前後を表示
+        start = max(0, min(first_removed, first_added) - context_chars)
+    elif first_added is not None:
+        # 追加のみの場合：末尾に追加されたケース
+        start = max(0, len(diff.old_text) - context_chars)
+    else:
+        # 削除のみの場合
+        start = max(0, first_removed - context_chars)
+
+    max_len = context_chars * 3
+
+    def window(text: str, spans: List[DiffSpan]) -> str:
+        # 開始位置がテキストの外なら先頭から表示
+        window_start = start if start < len(text) else 0
+        window_end = min(len(text), window_start + max_len)
+        html = render_spans(text, clip_spans(spans, window_start, window_end))
+        if window_start > 0:
+            html = '...' + html
+        if window_end < len(text):
+            html = html + '...'
+        return html
+
+    return window(diff.old_text, old_spans), window(diff.new_text, new_spans)
+
+
+def stored_diff(row, title: Optional[str]) -> Optional[ChangeDiff]:
+    """
+    クエリ結果の行（diff_* カラム）から保存済みの差分を取り出す
+
+    保存時と表示時でタイトル重複の除去に使うタイトルが異なる場合（記事タイトルがその後変わった等）や、
+    差分が保存されていない場合はNone（呼び出し側でその場で計算する）。
+    """
+    if row['diff_opcodes'] is None or (row['diff_title'] or '') != (title or ''):
+        return None
+    return ChangeDiff(
+        row['diff_old_text'] or '',
+        row['diff_new_text'] or '',
+        decode_opcodes(row['diff_opcodes']),
+        bool(row['diff_has_correction_keywords']),
+        row['diff_title'] or '',
+    )
+
+
+def encode_opcodes(opcodes: List[Tuple[int, int, int, int]]) -> str:
+    """opcodesをchange_diffs保存用のJSONに変換"""
+    return json.dumps(opcodes, separators=(',', ':'))
+
+
+def decode_opcodes(data: str) -> List[Tuple[int, int, int, int]]:
+    """change_diffsのJSONからopcodesを復元"""
+    return [tuple(op) for op in json.loads(data)]